@@ -1,131 +1,156 @@
 import argparse
-import json
 import os
 import subprocess
 import sys
 import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from github_api import BudgetExhausted, GitHubAPI, GitHubAPIError, RecheckQueue  # noqa: E402
+
+RECHECK_DELAY_SECONDS = 5
+
+PR_FIELDS = "number mergeable url title author { login }"
+PR_DETAILS_QUERY = f"""
+query($owner: String!, $name: String!, $number: Int!) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{ {PR_FIELDS} }}
+  }}
+}}
+"""
+OPEN_PRS_QUERY = f"""
+query($owner: String!, $name: String!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequests(states: OPEN, first: 100, after: $cursor) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{ {PR_FIELDS} }}
+    }}
+  }}
+}}
+"""
 
 _open_issues_cache = {}
+_github = None
+
+
+def github():
+    global _github
+    if _github is None:
+        _github = GitHubAPI()
+    return _github
 
 
-def run_command(command):
+def run_request(method, path, params=None, body=None):
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        printable_command = " ".join(command)
-        print(f"Error running command: {printable_command}")
-        if e.stderr:
-            print(f"Stderr: {e.stderr}")
+        return github().request_json(method, path, params=params, body=body)
+    except GitHubAPIError as e:
+        print(f"Error calling GitHub API: {e}")
+        return None
+
+
+def run_graphql(repo_full_name, query, **variables):
+    owner, _, name = repo_full_name.partition("/")
+    try:
+        data = github().graphql(query, {"owner": owner, "name": name, **variables})
+    except GitHubAPIError as e:
+        print(f"Error calling GitHub API: {e}")
         return None
+    return data.get("repository") or {}
 
 
 def get_repo_full_name():
     repo = os.environ.get("GITHUB_REPOSITORY")
     if repo:
         return repo
-    output = run_command(
-        ["gh", "repo", "view", "--json", "nameWithOwner", "-q", ".nameWithOwner"]
+    result = subprocess.run(
+        ["gh", "repo", "view", "--json", "nameWithOwner", "-q", ".nameWithOwner"],
+        capture_output=True,
+        text=True,
     )
-    if output:
-        return output
+    if result.returncode == 0 and result.stdout.strip():
+        return result.stdout.strip()
     return None
 
 
-def get_pr_details(pr_number):
-    output = run_command(
-        [
-            "gh",
-            "pr",
-            "view",
-            str(pr_number),
-            "--json",
-            "number,mergeable,url,title,author",
-        ]
-    )
-    if output:
-        return json.loads(output)
+def get_pr_details(repo_full_name, pr_number):
+    repository = run_graphql(repo_full_name, PR_DETAILS_QUERY, number=int(pr_number))
+    if repository:
+        return repository.get("pullRequest")
     return None
 
 
-def list_open_prs():
-    output = run_command(
-        [
-            "gh",
-            "pr",
-            "list",
-            "--state",
-            "open",
-            "--json",
-            "number,mergeable,url,title,author",
-            "--limit",
-            "100",
-        ]
-    )
-    if output:
-        return json.loads(output)
-    return []
-
+def iter_open_prs(repo_full_name):
+    """Stream open PRs, one GraphQL page at a time."""
+    owner, _, name = repo_full_name.partition("/")
+    try:
+        yield from github().graphql_nodes(
+            OPEN_PRS_QUERY, {"owner": owner, "name": name}, ("repository", "pullRequests")
+        )
+    except GitHubAPIError as e:
+        print(f"Error calling GitHub API: {e}")
 
-def list_open_issues(repo_full_name, force_refresh=False):
-    if not force_refresh and repo_full_name in _open_issues_cache:
-        return _open_issues_cache[repo_full_name]
 
-    output = run_command(
-        ["gh", "api", f"repos/{repo_full_name}/issues?state=open&per_page=100"]
-    )
-    if output:
-        issues = json.loads(output)
-        _open_issues_cache[repo_full_name] = issues
-        return issues
-    return []
+def iter_open_issues(repo_full_name):
+    """Stream open issues (not PRs), following ``Link`` headers page by page."""
+    try:
+        for issue in github().paginate(f"repos/{repo_full_name}/issues", params={"state": "open"}):
+            if "pull_request" not in issue:
+                yield issue
+    except GitHubAPIError as e:
+        print(f"Error calling GitHub API: {e}")
 
 
 def find_existing_conflict_issue(repo_full_name, title_search, force_refresh=False):
-    for issue in list_open_issues(repo_full_name, force_refresh=force_refresh):
-        if "pull_request" in issue:
-            continue
+    """Return the open issue titled ``title_search``, stopping at the first match.
+
+    Titles seen on the way are remembered, so later lookups in the same run
+    only fetch pages that have not been read yet.
+    """
+    known = _open_issues_cache.setdefault(repo_full_name, {"titles": {}, "issues": None})
+    if force_refresh:
+        known["titles"].clear()
+        known["issues"] = None
+    elif title_search in known["titles"]:
+        return known["titles"][title_search]
+
+    if known["issues"] is None:
+        known["issues"] = iter_open_issues(repo_full_name)
+    for issue in known["issues"]:
+        number = str(issue["number"])
+        known["titles"].setdefault(issue.get("title"), number)
         if issue.get("title") == title_search:
-            return str(issue["number"])
+            return number
     return None
 
 
 def create_conflict_issue(repo_full_name, title, body):
-    output = run_command(
-        [
-            "gh",
-            "api",
-            f"repos/{repo_full_name}/issues",
-            "-X",
-            "POST",
-            "-f",
-            f"title={title}",
-            "-f",
-            f"body={body}",
-            "-q",
-            ".number",
-        ]
+    created = run_request(
+        "POST", f"repos/{repo_full_name}/issues", body={"title": title, "body": body}
     )
-    if output:
-        return output.strip()
+    if created and created.get("number"):
+        return str(created["number"])
     return None
 
 
+def trigger_jules_workflow(repo_full_name, issue_number):
+    repository = run_request("GET", f"repos/{repo_full_name}") or {}
+    ref = repository.get("default_branch") or "main"
+    try:
+        github().post(
+            f"repos/{repo_full_name}/actions/workflows/run-agent.yml/dispatches",
+            {"ref": ref, "inputs": {"issue_number": str(issue_number)}},
+        )
+    except GitHubAPIError as e:
+        print(f"Error calling GitHub API: {e}")
+        return False
+    return True
+
+
 def check_and_report_conflict(pr, repo_full_name):
     number = pr["number"]
     mergeable = pr["mergeable"]
 
-    if mergeable == "UNKNOWN":
-        print(f"PR #{number} mergeable status is UNKNOWN. Retrying in 5 seconds...")
-        time.sleep(5)
-        updated_pr = get_pr_details(number)
-        if updated_pr:
-            mergeable = updated_pr["mergeable"]
-            print(f"PR #{number} updated status: {mergeable}")
-        else:
-            print(f"Failed to refresh PR #{number}")
-            return
-
     if mergeable != "CONFLICTING":
         print(f"PR #{number} is {mergeable}. Skipping.")
         return
@@ -162,18 +187,56 @@ def check_and_report_conflict(pr, repo_full_name):
             print(f"ERROR: Failed to create or find issue for PR #{number}")
             return
 
-    trigger_result = run_command(
-        ["gh", "workflow", "run", "run-agent.yml", "-f", f"issue_number={issue_number}"]
-    )
-    if trigger_result is None:
+    if not trigger_jules_workflow(repo_full_name, issue_number):
         print(f"Warning: Failed to trigger Jules workflow for issue #{issue_number}")
     else:
         print(f"Successfully triggered Jules workflow for issue #{issue_number}")
 
 
+def check_prs(prs, repo_full_name, rechecks):
+    """Check PRs in order; PRs whose status is UNKNOWN are re-polled together at the end.
+
+    Yields each PR number once it is fully checked.
+    """
+    for pr in prs:
+        if pr["mergeable"] == "UNKNOWN" and rechecks.park(pr["number"], pr):
+            print(f"PR #{pr['number']} mergeable status is UNKNOWN. Re-checking after the other PRs...")
+        else:
+            check_and_report_conflict(pr, repo_full_name)
+        yield pr["number"]
+
+    while len(rechecks):
+        batch = rechecks.next_batch()
+        try:
+            states = github().mergeable_states(repo_full_name, [number for number, _, _ in batch])
+        except GitHubAPIError as e:
+            print(f"Error calling GitHub API: {e}")
+            states = {}
+        except BudgetExhausted:
+            for number, pr, attempt in batch:
+                rechecks.park(number, pr, attempt)
+            raise
+        for index, (number, pr, attempt) in enumerate(batch):
+            mergeable = states.get(number, "UNKNOWN")
+            if mergeable == "UNKNOWN" and rechecks.park(number, pr, attempt + 1):
+                continue
+            print(f"PR #{number} updated status: {mergeable}")
+            try:
+                check_and_report_conflict({**pr, "mergeable": mergeable}, repo_full_name)
+            except BudgetExhausted:
+                for unfinished, payload, _ in batch[index:]:
+                    rechecks.park(unfinished, payload)
+                raise
+
+
 def main():
     parser = argparse.ArgumentParser(description="Detect merge conflicts in PRs.")
     parser.add_argument("--pr-number", type=int, help="Specific PR number to check")
+    parser.add_argument(
+        "--resume-after",
+        type=int,
+        help="Skip PRs up to and including this number (cursor printed by a run that ran out of API budget)",
+    )
     args = parser.parse_args()
 
     repo_full_name = get_repo_full_name()
@@ -181,18 +244,35 @@ def main():
         print("Could not determine repository name.")
         sys.exit(1)
 
-    if args.pr_number:
-        print(f"Checking specific PR #{args.pr_number}...")
-        pr = get_pr_details(args.pr_number)
-        if pr:
-            check_and_report_conflict(pr, repo_full_name)
+    checked = 0
+    last_checked = args.resume_after
+    rechecks = RecheckQueue(delay=RECHECK_DELAY_SECONDS, attempts=1)
+    try:
+        if args.pr_number:
+            print(f"Checking specific PR #{args.pr_number}...")
+            pr = get_pr_details(repo_full_name, args.pr_number)
+            if not pr:
+                print(f"Could not find PR #{args.pr_number}")
+                sys.exit(1)
+            prs = [pr]
         else:
-            print(f"Could not find PR #{args.pr_number}")
-            sys.exit(1)
-    else:
-        print("Checking all open PRs...")
-        for pr in list_open_prs():
-            check_and_report_conflict(pr, repo_full_name)
+            print("Checking all open PRs...")
+            prs = sorted(iter_open_prs(repo_full_name), key=lambda pr: pr["number"])
+            if last_checked is not None:
+                prs = [pr for pr in prs if pr["number"] > last_checked]
+        for number in check_prs(prs, repo_full_name, rechecks):
+            checked += 1
+            last_checked = number
+    except BudgetExhausted as e:
+        print(f"Stopping early: {e}")
+        # PRs still waiting for a re-check were never finished.
+        pending = rechecks.pending()
+        if pending and (last_checked is None or last_checked >= pending[0]):
+            last_checked = pending[0] - 1
+        print(f"API budget exhausted; rerun with --resume-after {last_checked or 0}")
+    finally:
+        print(f"Summary: checked={checked}, {github().cache_summary()}")
+        github().close()
 
 
 if __name__ == "__main__":
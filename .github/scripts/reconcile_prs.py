@@ -1,12 +1,28 @@
 import argparse
+import hashlib
+import io
 import json
 import os
 import re
 import subprocess
 import sys
-import time
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from github_api import (  # noqa: E402
+    DEFAULT_POOL_SIZE,
+    BudgetExhausted,
+    GitHubAPI,
+    GitHubAPIError,
+    RecheckQueue,
+    write_json_atomic,
+)
 
 PASSING_CHECK_STATES = {"SUCCESS", "PASS", "SKIPPED", "SKIP", "NEUTRAL"}
 WAITING_CHECK_STATES = {"PENDING", "QUEUED", "IN_PROGRESS", "WAITING", "REQUESTED"}
@@ -17,6 +33,97 @@ CI_FAILURE_TITLE_PATTERN = re.compile(r"^CI Failure: PR #(\d+)$")
 MERGE_CONFLICT_TITLE_PATTERN = re.compile(r"^Merge Conflict: PR #(\d+)$")
 GENERIC_AUTOMATION_TITLE_PATTERN = re.compile(r"^PR Automation: PR #(\d+) requires attention$")
 QUEUE_RETRY_INTERVAL = timedelta(hours=1)
+WORKERS_ENV = "RECONCILE_WORKERS"
+DEFAULT_WORKERS = 4
+STATE_FILE_ENV = "RECONCILE_STATE_FILE"
+# Even an unchanged PR is looked at again after this long.
+STATE_MAX_AGE = timedelta(hours=6)
+DECISION_WAITING = "waiting"
+DECISION_ISSUE_EXISTS = "issue_exists"
+SKIPPABLE_DECISIONS = {DECISION_WAITING, DECISION_ISSUE_EXISTS}
+# Event actions that can change whether a PR is ready to merge; a ``status``
+# event counts unless it is still pending.
+EVENT_ACTIONS = {
+    "pull_request": {"opened", "reopened", "synchronize", "ready_for_review", "closed"},
+    "check_suite": {"completed"},
+    "check_run": {"completed"},
+    "workflow_run": {"completed"},
+}
+PR_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      number
+      title
+      url
+      mergeable
+      isDraft
+      state
+      headRefOid
+      baseRefOid
+    }
+  }
+}
+"""
+# Re-runs leave superseded check runs in the rollup; the workflow name and
+# start time let get_pr_checks keep only the newest run of each check.
+ROLLUP_CONTEXT_FIELDS = """
+pageInfo { hasNextPage endCursor }
+nodes {
+  __typename
+  ... on CheckRun {
+    name status conclusion detailsUrl startedAt completedAt
+    checkSuite { workflowRun { workflow { name } } }
+  }
+  ... on StatusContext { context state targetUrl createdAt }
+}
+"""
+PR_CHECKS_QUERY = f"""
+query($owner: String!, $name: String!, $number: Int!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{
+      statusCheckRollup {{
+        contexts(first: 100, after: $cursor) {{ {ROLLUP_CONTEXT_FIELDS} }}
+      }}
+    }}
+  }}
+}}
+"""
+PR_SNAPSHOT_PAGE_SIZE = 50
+OPEN_PRS_QUERY = f"""
+query($owner: String!, $name: String!, $pageSize: Int!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequests(states: OPEN, first: $pageSize, after: $cursor, orderBy: {{field: CREATED_AT, direction: ASC}}) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{
+        number
+        title
+        url
+        mergeable
+        isDraft
+        state
+        headRefOid
+        baseRefOid
+        statusCheckRollup {{
+          contexts(first: 100) {{ {ROLLUP_CONTEXT_FIELDS} }}
+        }}
+      }}
+    }}
+  }}
+}}
+"""
+# Newest comments first, so the latest queue marker is on the first page.
+ISSUE_COMMENTS_FIELDS = (
+    "comments(last: 100, before: $cursor) { pageInfo { hasPreviousPage startCursor } nodes { body createdAt } }"
+)
+ISSUE_COMMENTS_QUERY = f"""
+query($owner: String!, $name: String!, $number: Int!, $cursor: String) {{
+  repository(owner: $owner, name: $name) {{
+    issue(number: $number) {{ {ISSUE_COMMENTS_FIELDS} }}
+  }}
+}}
+"""
+ISSUE_STATE_BATCH_SIZE = 25
 
 
 @dataclass
@@ -27,6 +134,13 @@ class ReconcileStats:
     issues_closed: int = 0
     sessions_triggered: int = 0
     errors: int = 0
+    unchanged: int = 0
+    budget_exhausted: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, name: str, count: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
 
 
 @dataclass
@@ -49,102 +163,231 @@ class IssueJulesState:
         return current_time - self.last_queue_comment_at >= QUEUE_RETRY_INTERVAL
 
 
+class ReconcileState:
+    """Per-PR fingerprints and decisions from earlier runs, persisted as JSON.
+
+    The file is carried between full passes by its own Actions cache entry.
+    Skipping is best-effort: a missing or unreadable file just means every
+    PR is evaluated, as in a pass without state.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.prs: dict[int, dict] = {}
+        # Open PRs seen by the last full pass; None until one has been saved.
+        self.open_prs: set[int] | None = None
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        self.prs = {int(number): entry for number, entry in (data.get("prs") or {}).items()}
+        if data.get("open_prs") is not None:
+            self.open_prs = {int(number) for number in data["open_prs"]}
+
+    def is_unchanged(self, pr_number: int, fingerprint: dict, now: datetime | None = None):
+        """Whether the last decision for this PR still stands."""
+        with self._lock:
+            entry = self.prs.get(pr_number)
+        if not entry or entry.get("decision") not in SKIPPABLE_DECISIONS or entry.get("fingerprint") != fingerprint:
+            return False
+        recheck_after = parse_github_timestamp(entry.get("recheck_after"))
+        current_time = now or datetime.now(timezone.utc)
+        return recheck_after is not None and current_time < recheck_after
+
+    def record(self, pr_number: int, fingerprint: dict, decision: str, recheck_after: datetime):
+        with self._lock:
+            self.prs[pr_number] = {
+                "fingerprint": fingerprint,
+                "decision": decision,
+                "recheck_after": recheck_after.isoformat(),
+            }
+
+    def forget(self, pr_number: int):
+        with self._lock:
+            self.prs.pop(pr_number, None)
+
+    def set_open_prs(self, pr_numbers):
+        """Remember which PRs are open and drop entries for the rest."""
+        with self._lock:
+            self.open_prs = set(pr_numbers)
+            self.prs = {number: entry for number, entry in self.prs.items() if number in self.open_prs}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            open_prs = sorted(self.open_prs) if self.open_prs is not None else None
+            data = {"open_prs": open_prs, "prs": {str(number): entry for number, entry in self.prs.items()}}
+        try:
+            write_json_atomic(self.path, data)
+        except OSError as exc:
+            print(f"Warning: could not write reconcile state: {exc}")
+
+
+class IssueIndex:
+    """Open issues indexed by title and by the PR they track.
+
+    Built in one pass when the issue list loads, then kept current by
+    ``add``/``remove`` so lookups never rescan issue bodies.
+    """
+
+    def __init__(self, issues=()):
+        self.issues: dict[int, dict] = {}
+        self._by_title: dict[str, list[int]] = {}
+        self._by_pr: dict[int, list[int]] = {}
+        for issue in issues:
+            self.add(issue)
+
+    def add(self, issue: dict):
+        issue_number = int(issue["number"])
+        self.issues[issue_number] = issue
+        self._by_title.setdefault(str(issue.get("title", "")), []).append(issue_number)
+        for pr_number in pr_numbers_for_issue(issue):
+            self._by_pr.setdefault(pr_number, []).append(issue_number)
+
+    def remove(self, issue_number: int):
+        issue = self.issues.pop(issue_number, None)
+        if issue is None:
+            return
+        self._discard(self._by_title, str(issue.get("title", "")), issue_number)
+        for pr_number in pr_numbers_for_issue(issue):
+            self._discard(self._by_pr, pr_number, issue_number)
+
+    @staticmethod
+    def _discard(index: dict, key, issue_number: int):
+        numbers = index.get(key, [])
+        if issue_number in numbers:
+            numbers.remove(issue_number)
+        if not numbers:
+            index.pop(key, None)
+
+    def find_by_title(self, title: str):
+        numbers = self._by_title.get(title)
+        return numbers[0] if numbers else None
+
+    def issue_numbers_for_pr(self, pr_number: int):
+        return sorted(set(self._by_pr.get(pr_number, [])))
+
+    def automation_issues(self):
+        linked = {issue_number for numbers in self._by_pr.values() for issue_number in numbers}
+        return [issue for issue_number, issue in self.issues.items() if issue_number in linked]
+
+
 class GitHubCLI:
-    def __init__(self, repo: str, dry_run: bool = False):
+    def __init__(self, repo: str, dry_run: bool = False, api: GitHubAPI | None = None):
         self.repo = repo
+        self.owner, _, self.name = repo.partition("/")
         self.dry_run = dry_run
-        self._issues_cache = None
+        self.api = api or GitHubAPI()
+        self._default_branch = None
+        self._issue_index: IssueIndex | None = None
         self._issue_state_cache: dict[int, IssueJulesState] = {}
+        # Open PRs with their check rollups, loaded by list_open_pr_numbers.
+        self._pr_snapshot: dict[int, dict] = {}
+        # Guards the caches above; concurrent reconcile workers share one client.
+        self._lock = threading.RLock()
 
-    def run(self, command: list[str], check: bool = True):
-        result = subprocess.run(command, capture_output=True, text=True)
-        if check and result.returncode != 0:
-            printable = " ".join(command)
-            print(f"Command failed: {printable}")
-            if result.stderr:
-                print(result.stderr.strip())
-            return None
-        return result
-
-    def run_json(self, command: list[str]):
-        result = self.run(command, check=True)
-        if result is None:
-            return None
-
-        stdout = result.stdout.strip()
-        if not stdout:
+    def request_json(self, method: str, path: str, params: dict | None = None, body: dict | None = None):
+        try:
+            return self.api.request_json(method, path, params=params, body=body)
+        except GitHubAPIError as exc:
+            print(f"GitHub API request failed: {exc}")
             return None
 
+    def graphql(self, query: str, **variables):
         try:
-            return json.loads(stdout)
-        except json.JSONDecodeError:
-            printable = " ".join(command)
-            print(f"Failed to decode JSON output: {printable}")
+            return self.api.graphql(query, {"owner": self.owner, "name": self.name, **variables})
+        except GitHubAPIError as exc:
+            print(f"GitHub API request failed: {exc}")
             return None
 
     def list_open_pr_numbers(self):
-        data = self.run_json(
-            [
-                "gh",
-                "pr",
-                "list",
-                "--repo",
-                self.repo,
-                "--state",
-                "open",
-                "--limit",
-                "100",
-                "--json",
-                "number",
-            ]
-        )
-        if not data:
-            return []
-        return [int(pr["number"]) for pr in data]
-
-    def get_pr(self, pr_number: int):
-        return self.run_json(
-            [
-                "gh",
-                "pr",
-                "view",
-                str(pr_number),
-                "--repo",
-                self.repo,
-                "--json",
-                "number,title,url,mergeable,isDraft,state",
-            ]
-        )
+        """Load every open PR and its checks into the snapshot; return their numbers."""
+        snapshot: dict[int, dict] = {}
+        cursor = None
+        while True:
+            data = self.graphql(OPEN_PRS_QUERY, pageSize=PR_SNAPSHOT_PAGE_SIZE, cursor=cursor)
+            connection = ((data or {}).get("repository") or {}).get("pullRequests")
+            if not connection:
+                break
+            for pr in connection.get("nodes") or []:
+                if pr:
+                    snapshot[int(pr["number"])] = pr
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+
+        self._pr_snapshot = snapshot
+        return sorted(snapshot)
+
+    def get_pr(self, pr_number: int, refresh: bool = False):
+        """Return a PR from the snapshot, or fetch it when missing or ``refresh`` is set.
+
+        A refresh also drops the snapshot's checks, so the next
+        ``get_pr_checks`` reads them live as well.
+        """
+        if refresh:
+            self._pr_snapshot.pop(pr_number, None)
+        elif pr_number in self._pr_snapshot:
+            return self._pr_snapshot[pr_number]
+        data = self.graphql(PR_QUERY, number=pr_number)
+        return ((data or {}).get("repository") or {}).get("pullRequest")
 
     def get_pr_checks(self, pr_number: int):
-        result = self.run(
-            [
-                "gh",
-                "pr",
-                "checks",
-                str(pr_number),
-                "--repo",
-                self.repo,
-                "--json",
-                "name,state,link",
-            ],
-            check=False,
-        )
-        if result is None:
+        pr = self._pr_snapshot.get(pr_number)
+        if pr is None:
+            contexts = self._load_check_contexts(pr_number)
+        else:
+            page = (pr.get("statusCheckRollup") or {}).get("contexts") or {}
+            contexts = page.get("nodes") or []
+            page_info = page.get("pageInfo") or {}
+            if page_info.get("hasNextPage"):
+                contexts = self._load_check_contexts(pr_number, contexts, page_info.get("endCursor"))
+        return [check_from_rollup_context(context) for context in latest_rollup_contexts(contexts)]
+
+    def _load_check_contexts(self, pr_number: int, contexts=(), cursor: str | None = None):
+        contexts = list(contexts)
+        while True:
+            data = self.graphql(PR_CHECKS_QUERY, number=pr_number, cursor=cursor)
+            pr = ((data or {}).get("repository") or {}).get("pullRequest")
+            if pr is None:
+                # Without the full rollup a failing check could be missing; wait instead.
+                contexts.append({"__typename": "StatusContext", "context": "statusCheckRollup", "state": "PENDING"})
+                return contexts
+            page = (pr.get("statusCheckRollup") or {}).get("contexts") or {}
+            contexts.extend(page.get("nodes") or [])
+            page_info = page.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return contexts
+            cursor = page_info.get("endCursor")
+
+    def open_pr_numbers_for_commit(self, sha: str | None):
+        if not sha:
             return []
-
-        stdout = result.stdout.strip()
-        if not stdout:
+        pulls = self.request_json("GET", f"repos/{self.repo}/commits/{sha}/pulls")
+        if not isinstance(pulls, list):
             return []
+        return sorted({int(pr["number"]) for pr in pulls if pr.get("state") == "open"})
 
+    def get_mergeable_states(self, pr_numbers: list[int]):
         try:
-            checks = json.loads(stdout)
-        except json.JSONDecodeError:
-            return []
+            return self.api.mergeable_states(self.repo, pr_numbers)
+        except GitHubAPIError as exc:
+            print(f"GitHub API request failed: {exc}")
+            return {}
 
-        if isinstance(checks, list):
-            return checks
-        return []
+    def default_branch(self):
+        if self._default_branch is None:
+            data = self.request_json("GET", f"repos/{self.repo}") or {}
+            self._default_branch = data.get("default_branch") or "main"
+        return self._default_branch
 
     def merge_pr(self, pr_number: int):
         if self.dry_run:
@@ -152,200 +395,167 @@ class GitHubCLI:
             return True
 
         # Approval is best-effort; some repos do not allow bot approvals.
-        self.run(
-            [
-                "gh",
-                "pr",
-                "review",
-                str(pr_number),
-                "--repo",
-                self.repo,
-                "--approve",
-            ],
-            check=False,
-        )
-
-        result = self.run(
-            [
-                "gh",
-                "pr",
-                "merge",
-                str(pr_number),
-                "--repo",
-                self.repo,
-                "--merge",
-                "--delete-branch",
-            ],
-            check=False,
-        )
-        return bool(result and result.returncode == 0)
+        try:
+            self.api.post(f"repos/{self.repo}/pulls/{pr_number}/reviews", {"event": "APPROVE"})
+        except GitHubAPIError as exc:
+            print(f"Approval skipped for PR #{pr_number}: {exc}")
 
-    def _list_open_issues(self):
-        if self._issues_cache is not None:
-            return self._issues_cache
+        try:
+            pr = self.api.get(f"repos/{self.repo}/pulls/{pr_number}")
+            self.api.put(f"repos/{self.repo}/pulls/{pr_number}/merge", {"merge_method": "merge"})
+        except GitHubAPIError as exc:
+            print(f"Merge request failed for PR #{pr_number}: {exc}")
+            return False
+        self._pr_snapshot.pop(pr_number, None)
+
+        head = pr.get("head") or {}
+        if (head.get("repo") or {}).get("full_name") == self.repo and head.get("ref"):
+            try:
+                self.api.delete(f"repos/{self.repo}/git/refs/heads/{head['ref']}")
+            except GitHubAPIError as exc:
+                print(f"Could not delete branch {head['ref']}: {exc}")
+        return True
 
-        data = self.run_json(["gh", "api", f"repos/{self.repo}/issues?state=open&per_page=100"])
-        if not isinstance(data, list):
-            self._issues_cache = []
-            return self._issues_cache
+    def iter_open_issues(self):
+        """Stream open issues (not PRs) page by page, following ``Link`` headers.
 
-        self._issues_cache = [issue for issue in data if "pull_request" not in issue]
-        return self._issues_cache
+        Only the current page is held in memory, and a caller that stops
+        early never fetches the remaining pages.
+        """
+        try:
+            for issue in self.api.paginate(f"repos/{self.repo}/issues", params={"state": "open"}):
+                if "pull_request" not in issue:
+                    yield {"number": issue["number"], "title": issue.get("title", ""), "body": issue.get("body") or ""}
+        except GitHubAPIError as exc:
+            print(f"GitHub API request failed: {exc}")
+
+    def _load_issue_index(self):
+        with self._lock:
+            if self._issue_index is None:
+                self._issue_index = IssueIndex(self.iter_open_issues())
+            return self._issue_index
 
     def find_open_issue_by_title(self, title: str):
-        for issue in self._list_open_issues():
+        with self._lock:
+            if self._issue_index is not None:
+                return self._issue_index.find_by_title(title)
+        for issue in self.iter_open_issues():
             if issue.get("title") == title:
                 return int(issue["number"])
         return None
 
     def list_open_automation_issues(self):
-        issues = []
-        for issue in self._list_open_issues():
-            if linked_pr_number_for_issue(issue) is None:
-                continue
-            issues.append(issue)
-        return issues
+        index = self._load_issue_index()
+        with self._lock:
+            return index.automation_issues()
 
     def create_issue(self, title: str, body: str):
         if self.dry_run:
             print(f"[dry-run] Would create issue: {title}")
             return 0
 
-        result = self.run(
-            [
-                "gh",
-                "api",
-                f"repos/{self.repo}/issues",
-                "-X",
-                "POST",
-                "-f",
-                f"title={title}",
-                "-f",
-                f"body={body}",
-                "-q",
-                ".number",
-            ],
-            check=True,
-        )
-        if result is None:
-            return None
-
-        issue_number_text = result.stdout.strip()
-        if not issue_number_text.isdigit():
+        created = self.request_json("POST", f"repos/{self.repo}/issues", body={"title": title, "body": body})
+        if not created or not created.get("number"):
             return None
 
-        issue_number = int(issue_number_text)
-        if self._issues_cache is not None:
-            self._issues_cache.append({"number": issue_number, "title": title})
+        issue_number = int(created["number"])
+        with self._lock:
+            if self._issue_index is not None:
+                self._issue_index.add({"number": issue_number, "title": title, "body": body})
         return issue_number
 
     def find_open_issue_numbers_for_pr(self, pr_number: int):
-        titles = {
-            ci_failure_issue_title_for_pr(pr_number),
-            issue_title_for_pr(pr_number),
-            conflict_issue_title_for_pr(pr_number),
-        }
-
-        issue_numbers: list[int] = []
-        for issue in self._list_open_issues():
-            issue_number = int(issue["number"])
-            title = issue.get("title", "")
-            if title in titles:
-                issue_numbers.append(issue_number)
-                continue
-
-            marker = PR_AUTOMATION_MARKER_PATTERN.search(str(issue.get("body", "")))
-            if marker and int(marker.group(1)) == pr_number:
-                issue_numbers.append(issue_number)
-
-        return sorted(set(issue_numbers))
+        index = self._load_issue_index()
+        with self._lock:
+            return index.issue_numbers_for_pr(pr_number)
 
     def close_issue(self, issue_number: int, reason: str):
         if self.dry_run:
             print(f"[dry-run] Would close issue #{issue_number}")
             return True
 
-        result = self.run(
-            [
-                "gh",
-                "issue",
-                "close",
-                str(issue_number),
-                "--repo",
-                self.repo,
-                "--comment",
-                reason,
-            ],
-            check=False,
-        )
-        if not result or result.returncode != 0:
+        try:
+            self.api.post(f"repos/{self.repo}/issues/{issue_number}/comments", {"body": reason})
+            self.api.patch(f"repos/{self.repo}/issues/{issue_number}", {"state": "closed"})
+        except GitHubAPIError as exc:
+            print(f"Failed to close issue #{issue_number}: {exc}")
             return False
 
-        if self._issues_cache is not None:
-            self._issues_cache = [
-                issue for issue in self._issues_cache if int(issue.get("number", -1)) != issue_number
-            ]
+        with self._lock:
+            if self._issue_index is not None:
+                self._issue_index.remove(issue_number)
 
         return True
 
     def get_issue_jules_state(self, issue_number: int):
-        if issue_number in self._issue_state_cache:
-            return self._issue_state_cache[issue_number]
-
-        comments = self.run_json(
-            [
-                "gh",
-                "api",
-                f"repos/{self.repo}/issues/{issue_number}/comments?per_page=100",
-            ]
-        )
-        if not isinstance(comments, list):
-            state = IssueJulesState()
-            self._issue_state_cache[issue_number] = state
-            return state
-
-        state = IssueJulesState()
-        for comment in comments:
-            body = comment.get("body", "")
-            if SESSION_ID_PATTERN.search(body):
-                state.has_session = True
-
-            if QUEUE_MARKER_PATTERN.search(body):
-                state.queued = True
-                created_at = parse_github_timestamp(comment.get("created_at") or comment.get("createdAt"))
-                if created_at and (
-                    state.last_queue_comment_at is None or created_at > state.last_queue_comment_at
-                ):
-                    state.last_queue_comment_at = created_at
-
-        self._issue_state_cache[issue_number] = state
-        return state
+        """Return the issue's comment state, or None when its comments could not be read."""
+        self.load_issue_jules_states([issue_number])
+        with self._lock:
+            return self._issue_state_cache.get(issue_number)
+
+    def load_issue_jules_states(self, issue_numbers):
+        """Fill the comment-state cache for many issues, one aliased GraphQL query per batch.
+
+        Each issue's newest 100 comments come back in the batch. Older pages
+        are only read for an issue that has no session comment yet, since a
+        session anywhere settles its state. Issues whose comments could not
+        be read are left out of the cache, so they are not mistaken for
+        issues without a session.
+        """
+        with self._lock:
+            missing = sorted({int(number) for number in issue_numbers} - self._issue_state_cache.keys())
+        for start in range(0, len(missing), ISSUE_STATE_BATCH_SIZE):
+            batch = missing[start : start + ISSUE_STATE_BATCH_SIZE]
+            fields = "\n".join(
+                f"    issue{number}: issue(number: {number}) {{ {ISSUE_COMMENTS_FIELDS} }}" for number in batch
+            )
+            query = (
+                "query($owner: String!, $name: String!, $cursor: String) {\n"
+                f"  repository(owner: $owner, name: $name) {{\n{fields}\n  }}\n}}"
+            )
+            repository = (self.graphql(query) or {}).get("repository")
+            if repository is None:
+                continue
+            for number in batch:
+                state = IssueJulesState()
+                connection = (repository.get(f"issue{number}") or {}).get("comments") or {}
+                while True:
+                    fold_comments_into_state(state, connection.get("nodes") or [])
+                    page_info = connection.get("pageInfo") or {}
+                    if state.has_session or not page_info.get("hasPreviousPage"):
+                        break
+                    data = self.graphql(ISSUE_COMMENTS_QUERY, number=number, cursor=page_info.get("startCursor"))
+                    issue = ((data or {}).get("repository") or {}).get("issue")
+                    if issue is None:
+                        state = None
+                        break
+                    connection = issue.get("comments") or {}
+                if state is not None:
+                    with self._lock:
+                        self._issue_state_cache[number] = state
 
     def issue_has_jules_session(self, issue_number: int):
-        return self.get_issue_jules_state(issue_number).has_session
+        state = self.get_issue_jules_state(issue_number)
+        return bool(state and state.has_session)
 
     def trigger_jules_session(self, issue_number: int):
         if self.dry_run:
             print(f"[dry-run] Would trigger run-agent.yml for issue #{issue_number}")
             return True
 
-        result = self.run(
-            [
-                "gh",
-                "workflow",
-                "run",
-                "run-agent.yml",
-                "--repo",
-                self.repo,
-                "-f",
-                f"issue_number={issue_number}",
-            ],
-            check=False,
-        )
-        return bool(result and result.returncode == 0)
+        try:
+            self.api.post(
+                f"repos/{self.repo}/actions/workflows/run-agent.yml/dispatches",
+                {"ref": self.default_branch(), "inputs": {"issue_number": str(issue_number)}},
+            )
+        except GitHubAPIError as exc:
+            print(f"Failed to dispatch run-agent.yml for issue #{issue_number}: {exc}")
+            return False
+        return True
 
     def drop_issue_from_cache(self, issue_number: int):
-        self._issue_state_cache.pop(issue_number, None)
+        with self._lock:
+            self._issue_state_cache.pop(issue_number, None)
 
 
 def issue_title_for_pr(pr_number: int):
@@ -360,6 +570,30 @@ def conflict_issue_title_for_pr(pr_number: int):
     return f"Merge Conflict: PR #{pr_number}"
 
 
+def pr_fingerprint(pr: dict, mergeable: str | None, checks: list[dict]):
+    """What a reconcile decision depends on: both SHAs, mergeability and check states."""
+    states = sorted((str(check.get("name") or ""), normalize_check_state(check)) for check in checks)
+    return {
+        "head": pr.get("headRefOid"),
+        "base": pr.get("baseRefOid"),
+        "mergeable": str(mergeable or "UNKNOWN").upper(),
+        "checks": hashlib.sha256(json.dumps(states).encode()).hexdigest()[:16],
+    }
+
+
+def fold_comments_into_state(state: IssueJulesState, comments: list[dict]):
+    for comment in comments:
+        body = (comment or {}).get("body") or ""
+        if SESSION_ID_PATTERN.search(body):
+            state.has_session = True
+
+        if QUEUE_MARKER_PATTERN.search(body):
+            state.queued = True
+            created_at = parse_github_timestamp(comment.get("created_at") or comment.get("createdAt"))
+            if created_at and (state.last_queue_comment_at is None or created_at > state.last_queue_comment_at):
+                state.last_queue_comment_at = created_at
+
+
 def parse_github_timestamp(value: str | None):
     if not value:
         return None
@@ -370,6 +604,25 @@ def parse_github_timestamp(value: str | None):
         return None
 
 
+def pr_numbers_for_issue(issue: dict):
+    """Every PR an issue refers to, through its body marker or its title."""
+    pr_numbers = set()
+    marker = PR_AUTOMATION_MARKER_PATTERN.search(str(issue.get("body", "")))
+    if marker:
+        pr_numbers.add(int(marker.group(1)))
+
+    title = str(issue.get("title", ""))
+    for pattern in (
+        CI_FAILURE_TITLE_PATTERN,
+        MERGE_CONFLICT_TITLE_PATTERN,
+        GENERIC_AUTOMATION_TITLE_PATTERN,
+    ):
+        match = pattern.match(title)
+        if match:
+            pr_numbers.add(int(match.group(1)))
+    return pr_numbers
+
+
 def linked_pr_number_for_issue(issue: dict):
     marker = PR_AUTOMATION_MARKER_PATTERN.search(str(issue.get("body", "")))
     if marker:
@@ -397,6 +650,48 @@ def canonical_issue_number(issues: list[dict], issue_states: dict[int, IssueJule
     return int(min(issues, key=sort_key)["number"])
 
 
+def rollup_context_key(context: dict):
+    if context.get("__typename") == "StatusContext":
+        return ("StatusContext", context.get("context"))
+    workflow = ((context.get("checkSuite") or {}).get("workflowRun") or {}).get("workflow") or {}
+    return ("CheckRun", workflow.get("name"), context.get("name"))
+
+
+def rollup_context_time(context: dict):
+    return context.get("startedAt") or context.get("createdAt") or context.get("completedAt") or ""
+
+
+def latest_rollup_contexts(contexts: list[dict]):
+    """Keep the newest context per check, as ``gh pr checks`` did, so a passing re-run hides the failed attempt."""
+    latest: dict[tuple, dict] = {}
+    for context in contexts:
+        if not context:
+            continue
+        key = rollup_context_key(context)
+        current = latest.get(key)
+        if current is None or rollup_context_time(context) >= rollup_context_time(current):
+            latest[key] = context
+    return list(latest.values())
+
+
+def check_from_rollup_context(context: dict):
+    """Convert a statusCheckRollup context into the ``gh pr checks`` shape."""
+    if context.get("__typename") == "StatusContext":
+        return {
+            "name": context.get("context"),
+            "state": str(context.get("state") or "UNKNOWN").upper(),
+            "link": context.get("targetUrl"),
+        }
+
+    status = str(context.get("status") or "").upper()
+    state = context.get("conclusion") if status == "COMPLETED" else status
+    return {
+        "name": context.get("name"),
+        "state": str(state or "UNKNOWN").upper(),
+        "link": context.get("detailsUrl"),
+    }
+
+
 def normalize_check_state(check: dict):
     return str(check.get("state") or "UNKNOWN").upper()
 
@@ -462,41 +757,219 @@ def build_issue_body(pr: dict, reasons: list[str], blocked: list[dict]):
     return "\n".join(lines)
 
 
+class ThreadOutput:
+    """``sys.stdout`` stand-in that buffers each capturing thread's prints separately.
+
+    Concurrent workers keep using ``print``; the reconciler replays each PR's
+    buffered log in PR order, so the job log reads the same as a serial run.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    @contextmanager
+    def capture(self):
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, text: str):
+        buffer = getattr(self._local, "buffer", None)
+        return (self.target if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
 class PrReconciler:
-    def __init__(self, client: GitHubCLI):
+    def __init__(
+        self,
+        client: GitHubCLI,
+        workers: int = 1,
+        rechecks: RecheckQueue | None = None,
+        state: ReconcileState | None = None,
+    ):
         self.client = client
+        self.workers = max(1, workers)
+        # PRs whose mergeability is still UNKNOWN wait here instead of blocking a worker.
+        self.rechecks = rechecks if rechecks is not None else RecheckQueue()
+        # Decisions from earlier runs; unchanged PRs are skipped when set.
+        self.state = state
         self.stats = ReconcileStats()
+        # Last PR fully processed before the API budget ran out; the next run
+        # resumes after it with --resume-after.
+        self.resume_cursor: int | None = None
+        self._pr_locks: dict[int, threading.Lock] = {}
+        self._pr_locks_guard = threading.Lock()
+
+    def _pr_lock(self, pr_number: int):
+        """Return the lock that keeps issue creation and merging for one PR from racing."""
+        with self._pr_locks_guard:
+            return self._pr_locks.setdefault(pr_number, threading.Lock())
+
+    def reconcile(self, pr_numbers: list[int] | None = None, resume_after: int | None = None):
+        try:
+            numbers = pr_numbers or sorted(self.client.list_open_pr_numbers())
+            if resume_after is not None:
+                numbers = [number for number in numbers if number > resume_after]
+            open_numbers = list(numbers)
+            if not pr_numbers:
+                numbers = [number for number in numbers if not self._is_unchanged(number)]
+            # PRs skipped as unchanged still count as processed, so recovery
+            # leaves their issues to the decision recorded for them.
+            processed_pr_numbers = set(open_numbers)
+            if not open_numbers:
+                print("No open PRs to process.")
+            elif not numbers:
+                print(f"All {len(open_numbers)} open PRs are unchanged since the last run.")
+            elif self.workers > 1 and len(numbers) > 1:
+                self._reconcile_concurrently(numbers)
+            else:
+                for pr_number in numbers:
+                    self.reconcile_pr(pr_number)
+                    self.resume_cursor = pr_number
+            self.process_rechecks()
+
+            # A resumed or scoped pass has not seen every open PR, so it
+            # cannot tell which automation issues are orphaned.
+            full_pass = not pr_numbers and resume_after is None
+            if full_pass and self._is_quiet(numbers, open_numbers):
+                print("No PR changed since the last run; skipping automation issue recovery.")
+            elif full_pass:
+                self.recover_automation_issues(processed_pr_numbers)
+            if full_pass and self.state is not None:
+                self.state.set_open_prs(open_numbers)
+            self.resume_cursor = None
+        except BudgetExhausted as exc:
+            print(f"Stopping early: {exc}")
+            self.stats.budget_exhausted = True
+            if self.resume_cursor is None:
+                self.resume_cursor = resume_after
+            # Parked PRs were never finished, so the cursor must not pass them.
+            pending = self.rechecks.pending()
+            if pending:
+                before_pending = pending[0] - 1
+                if self.resume_cursor is None or self.resume_cursor > before_pending:
+                    self.resume_cursor = before_pending
 
-    def reconcile(self, pr_numbers: list[int] | None = None):
-        numbers = pr_numbers or self.client.list_open_pr_numbers()
-        processed_pr_numbers = set(numbers)
-        if not numbers:
-            print("No open PRs to process.")
-        else:
-            for pr_number in numbers:
-                self.reconcile_pr(pr_number)
+        return self.stats
 
-        self.recover_automation_issues(processed_pr_numbers)
+    def _is_unchanged(self, pr_number: int):
+        if self.state is None:
+            return False
+        pr = self.client.get_pr(pr_number)
+        if not pr or pr.get("state") != "OPEN":
+            return False
+        fingerprint = pr_fingerprint(pr, pr.get("mergeable"), self.client.get_pr_checks(pr_number))
+        if not self.state.is_unchanged(pr_number, fingerprint):
+            return False
+        self.stats.add("unchanged")
+        return True
 
-        return self.stats
+    def _is_quiet(self, numbers: list[int], open_numbers: list[int]):
+        """Whether a full pass skipped every PR and no PR opened or closed since the last one."""
+        return self.state is not None and not numbers and set(open_numbers) == self.state.open_prs
 
-    def _resolve_mergeable(self, pr_number: int, initial_state: str):
-        mergeable = (initial_state or "UNKNOWN").upper()
-        if mergeable != "UNKNOWN":
-            return mergeable
+    def _remember(self, pr: dict, mergeable: str, checks: list[dict], decision: str | None, recheck_in=STATE_MAX_AGE):
+        """Record the decision for a PR so later runs can skip it while nothing changes.
 
-        for _ in range(3):
-            time.sleep(2)
-            refreshed = self.client.get_pr(pr_number)
-            if not refreshed:
-                break
-            mergeable = str(refreshed.get("mergeable") or "UNKNOWN").upper()
-            if mergeable != "UNKNOWN":
-                return mergeable
+        ``None`` clears the entry, so the PR is evaluated again next run.
+        """
+        if self.state is None:
+            return
+        pr_number = int(pr["number"])
+        if decision is None:
+            self.state.forget(pr_number)
+            return
+        recheck_after = datetime.now(timezone.utc) + min(recheck_in, STATE_MAX_AGE)
+        self.state.record(pr_number, pr_fingerprint(pr, mergeable, checks), decision, recheck_after)
+
+    def _reconcile_concurrently(self, numbers: list[int]):
+        """Reconcile PRs on a worker pool, replaying each PR's output in PR order.
+
+        The resume cursor only advances over an unbroken run of finished PRs,
+        so PRs that were in flight when the budget ran out are retried next time.
+        """
+        output = ThreadOutput(sys.stdout)
+        sys.stdout = output
+        stop: Exception | None = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reconcile") as executor:
+                futures = [
+                    (pr_number, executor.submit(self._reconcile_captured, output, pr_number))
+                    for pr_number in numbers
+                ]
+                for pr_number, future in futures:
+                    if future.cancelled():
+                        continue
+                    log, error = future.result()
+                    output.target.write(log)
+                    if error is not None and stop is None:
+                        stop = error
+                        for _, pending in futures:
+                            pending.cancel()
+                    if stop is None:
+                        self.resume_cursor = pr_number
+        finally:
+            sys.stdout = output.target
+
+        if stop is not None:
+            raise stop
+
+    def _reconcile_captured(self, output: ThreadOutput, pr_number: int):
+        with output.capture() as buffer:
+            try:
+                self.reconcile_pr(pr_number)
+            except Exception as exc:
+                return buffer.getvalue(), exc
+        return buffer.getvalue(), None
+
+    def process_rechecks(self):
+        """Re-poll parked PRs in batches until each mergeability is known or out of attempts."""
+        while len(self.rechecks):
+            batch = self.rechecks.next_batch()
+            try:
+                states = self.client.get_mergeable_states([pr_number for pr_number, _, _ in batch])
+            except BudgetExhausted:
+                for pr_number, payload, attempt in batch:
+                    self.rechecks.park(pr_number, payload, attempt)
+                raise
+            for index, (pr_number, (pr, stage), attempt) in enumerate(batch):
+                try:
+                    with self._pr_lock(pr_number):
+                        self._when_mergeable_known(pr, stage, states.get(pr_number), attempt + 1)
+                except BudgetExhausted:
+                    for unfinished, payload, _ in batch[index:]:
+                        self.rechecks.park(unfinished, payload)
+                    raise
+
+    def _when_mergeable_known(self, pr: dict, stage: str, mergeable: str | None = None, attempt: int = 0):
+        """Run ``stage`` for a PR once GitHub has computed its mergeability.
+
+        While the state is ``UNKNOWN`` the PR is parked and the caller moves on
+        to other PRs; after the last re-check it proceeds with ``UNKNOWN``.
+        """
+        pr_number = int(pr["number"])
+        mergeable = str(mergeable or pr.get("mergeable") or "UNKNOWN").upper()
+        if mergeable == "UNKNOWN" and self.rechecks.park(pr_number, (pr, stage), attempt):
+            print(f"PR #{pr_number} mergeability is still being computed; re-checking later.")
+            return
 
-        return mergeable
+        if stage == "diagnose":
+            self._diagnose_failed_merge(pr, mergeable)
+        else:
+            self._evaluate_pr(pr, mergeable)
 
     def _ensure_issue_and_session(self, pr: dict, reasons: list[str], blocked: list[dict]):
+        """Make sure an issue tracks the PR and has a Jules session.
+
+        Return whether the issue already had a session, or None when no
+        issue could be created.
+        """
         pr_number = int(pr["number"])
         title = issue_title_for_pr(pr_number)
         linked_issue_numbers = self.client.find_open_issue_numbers_for_pr(pr_number)
@@ -507,16 +980,26 @@ class PrReconciler:
             issue_number = self.client.create_issue(title, body)
             if issue_number is None:
                 print(f"Failed to create issue for PR #{pr['number']}")
-                self.stats.errors += 1
-                return
-            self.stats.issues_created += 1
+                self.stats.add("errors")
+                return None
+            self.stats.add("issues_created")
             print(f"Created issue #{issue_number} for PR #{pr['number']}")
 
         if self.client.issue_has_jules_session(issue_number):
             print(f"Issue #{issue_number} already has a Jules session.")
-            return
+            return True
 
         self._trigger_issue_if_ready(issue_number)
+        return False
+
+    def _track_with_issue(self, pr: dict, mergeable: str, checks: list[dict], reasons: list[str], blocked: list[dict]):
+        has_session = self._ensure_issue_and_session(pr, reasons, blocked)
+        if has_session is None:
+            self._remember(pr, mergeable, checks, None)
+            return
+        # Without a session the issue may be due for a retry before the usual recheck.
+        recheck_in = STATE_MAX_AGE if has_session else QUEUE_RETRY_INTERVAL
+        self._remember(pr, mergeable, checks, DECISION_ISSUE_EXISTS, recheck_in)
 
     def _close_linked_issues(self, pr_number: int, reason: str):
         issue_numbers = self.client.find_open_issue_numbers_for_pr(pr_number)
@@ -525,38 +1008,42 @@ class PrReconciler:
 
         for issue_number in issue_numbers:
             if self.client.close_issue(issue_number, reason):
-                self.stats.issues_closed += 1
+                self.stats.add("issues_closed")
                 print(f"Closed issue #{issue_number} for PR #{pr_number}")
                 continue
 
-            self.stats.errors += 1
+            self.stats.add("errors")
             print(f"Failed to close issue #{issue_number} for PR #{pr_number}")
 
     def _close_issue(self, issue_number: int, reason: str):
         if self.client.close_issue(issue_number, reason):
             self.client.drop_issue_from_cache(issue_number)
-            self.stats.issues_closed += 1
+            self.stats.add("issues_closed")
             print(f"Closed issue #{issue_number}")
             return True
 
-        self.stats.errors += 1
+        self.stats.add("errors")
         print(f"Failed to close issue #{issue_number}")
         return False
 
     def _trigger_issue_if_ready(self, issue_number: int):
         state = self.client.get_issue_jules_state(issue_number)
+        if state is None:
+            print(f"Could not read comments on issue #{issue_number}; not triggering Jules this run.")
+            self.stats.add("errors")
+            return
         if not state.should_retry():
             print(f"Issue #{issue_number} is queued for retry and not ready yet.")
             return
 
         print(f"Issue #{issue_number} is ready for Jules recovery. Triggering run-agent workflow.")
         if self.client.trigger_jules_session(issue_number):
-            self.stats.sessions_triggered += 1
+            self.stats.add("sessions_triggered")
             self.client.drop_issue_from_cache(issue_number)
             return
 
         print(f"Failed to trigger Jules for issue #{issue_number}")
-        self.stats.errors += 1
+        self.stats.add("errors")
 
     def recover_automation_issues(self, processed_pr_numbers: set[int]):
         grouped: dict[int, list[dict]] = {}
@@ -566,44 +1053,60 @@ class PrReconciler:
                 continue
             grouped.setdefault(pr_number, []).append(issue)
 
+        self.client.load_issue_jules_states(
+            int(issue["number"]) for issues in grouped.values() for issue in issues
+        )
         for pr_number, issues in sorted(grouped.items()):
-            issue_states = {
-                int(issue["number"]): self.client.get_issue_jules_state(int(issue["number"]))
-                for issue in issues
-            }
-            canonical_number = canonical_issue_number(issues, issue_states)
-
-            for issue in sorted(issues, key=lambda item: int(item["number"])):
-                issue_number = int(issue["number"])
-                if issue_number == canonical_number:
-                    continue
-                self._close_issue(
-                    issue_number,
-                    (
-                        f"Closing automatically as a duplicate automation issue for PR #{pr_number}. "
-                        f"Issue #{canonical_number} remains the canonical tracker."
-                    ),
-                )
-
-            if pr_number in processed_pr_numbers:
-                continue
+            with self._pr_lock(pr_number):
+                self._recover_pr_issues(pr_number, issues, processed_pr_numbers)
+
+    def _recover_pr_issues(self, pr_number: int, issues: list[dict], processed_pr_numbers: set[int]):
+        issue_states = {
+            int(issue["number"]): self.client.get_issue_jules_state(int(issue["number"]))
+            for issue in issues
+        }
+        if None in issue_states.values():
+            # Without every issue's state the canonical issue cannot be chosen safely.
+            print(f"Could not read comments on every automation issue for PR #{pr_number}; skipping it this run.")
+            self.stats.add("errors")
+            return
+        canonical_number = canonical_issue_number(issues, issue_states)
 
-            pr = self.client.get_pr(pr_number)
-            if not pr or pr.get("state") != "OPEN":
-                self._close_issue(
-                    canonical_number,
-                    f"Closing automatically because PR #{pr_number} is no longer open.",
-                )
+        for issue in sorted(issues, key=lambda item: int(item["number"])):
+            issue_number = int(issue["number"])
+            if issue_number == canonical_number:
                 continue
+            self._close_issue(
+                issue_number,
+                (
+                    f"Closing automatically as a duplicate automation issue for PR #{pr_number}. "
+                    f"Issue #{canonical_number} remains the canonical tracker."
+                ),
+            )
 
-            self._trigger_issue_if_ready(canonical_number)
+        if pr_number in processed_pr_numbers:
+            return
+
+        pr = self.client.get_pr(pr_number)
+        if not pr or pr.get("state") != "OPEN":
+            self._close_issue(
+                canonical_number,
+                f"Closing automatically because PR #{pr_number} is no longer open.",
+            )
+            return
+
+        self._trigger_issue_if_ready(canonical_number)
 
     def reconcile_pr(self, pr_number: int):
-        self.stats.scanned += 1
+        with self._pr_lock(pr_number):
+            self._reconcile_pr(pr_number)
+
+    def _reconcile_pr(self, pr_number: int):
+        self.stats.add("scanned")
         pr = self.client.get_pr(pr_number)
         if not pr:
             print(f"Unable to load PR #{pr_number}")
-            self.stats.errors += 1
+            self.stats.add("errors")
             return
 
         if pr.get("state") != "OPEN":
@@ -614,7 +1117,10 @@ class PrReconciler:
             )
             return
 
-        mergeable = self._resolve_mergeable(pr_number, str(pr.get("mergeable") or "UNKNOWN"))
+        self._when_mergeable_known(pr, "evaluate")
+
+    def _evaluate_pr(self, pr: dict, mergeable: str):
+        pr_number = int(pr["number"])
         checks = self.client.get_pr_checks(pr_number)
         waiting = waiting_checks(checks)
         blocked = blocking_checks(checks)
@@ -627,15 +1133,17 @@ class PrReconciler:
             reasons.append("PR checks are not passing.")
 
         if reasons:
-            self._ensure_issue_and_session(pr, reasons, blocked)
+            self._track_with_issue(pr, mergeable, checks, reasons, blocked)
             return
 
         if waiting:
             print(f"PR #{pr_number} still has non-terminal checks; waiting for CI to finish.")
+            self._remember(pr, mergeable, checks, DECISION_WAITING)
             return
 
+        self._remember(pr, mergeable, checks, None)
         if self.client.merge_pr(pr_number):
-            self.stats.merged += 1
+            self.stats.add("merged")
             print(f"Merged PR #{pr_number}")
             self._close_linked_issues(
                 pr_number,
@@ -644,16 +1152,18 @@ class PrReconciler:
             return
 
         print(f"Merge failed for PR #{pr_number}; collecting diagnostics.")
-        refreshed_pr = self.client.get_pr(pr_number) or pr
-        refreshed_mergeable = self._resolve_mergeable(
-            pr_number, str(refreshed_pr.get("mergeable") or "UNKNOWN")
-        )
+        refreshed_pr = self.client.get_pr(pr_number, refresh=True) or pr
+        self._when_mergeable_known(refreshed_pr, "diagnose")
+
+    def _diagnose_failed_merge(self, refreshed_pr: dict, refreshed_mergeable: str):
+        pr_number = int(refreshed_pr["number"])
         refreshed_checks = self.client.get_pr_checks(pr_number)
         refreshed_waiting = waiting_checks(refreshed_checks)
         refreshed_blocked = blocking_checks(refreshed_checks)
 
         if refreshed_waiting and str(refreshed_mergeable).upper() != "CONFLICTING" and not refreshed_blocked:
             print(f"PR #{pr_number} has non-terminal checks after merge attempt; waiting for CI to finish.")
+            self._remember(refreshed_pr, refreshed_mergeable, refreshed_checks, DECISION_WAITING)
             return
 
         fallback_reasons = []
@@ -664,7 +1174,44 @@ class PrReconciler:
         if not fallback_reasons:
             fallback_reasons.append("Automatic merge failed for an unknown reason.")
 
-        self._ensure_issue_and_session(refreshed_pr, fallback_reasons, refreshed_blocked)
+        self._track_with_issue(refreshed_pr, refreshed_mergeable, refreshed_checks, fallback_reasons, refreshed_blocked)
+
+
+def load_event(event_path: str | None):
+    if not event_path:
+        return None
+    try:
+        with open(event_path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def affected_pr_numbers(event_name: str | None, payload: dict, client: GitHubCLI):
+    """Return the PRs an event may have made ready (or unready) to merge.
+
+    ``None`` means the event is not PR-scoped (a schedule or manual dispatch)
+    and calls for a full pass; an empty list means there is nothing to do.
+    """
+    if event_name == "status":
+        if payload.get("state") == "pending":
+            return []
+        return client.open_pr_numbers_for_commit(payload.get("sha"))
+
+    if event_name not in EVENT_ACTIONS:
+        return None
+    if payload.get("action") not in EVENT_ACTIONS[event_name]:
+        return []
+    if event_name == "pull_request":
+        return [int(payload["pull_request"]["number"])]
+
+    subject = payload.get(event_name) or {}
+    # Payloads list only same-repository PRs; fork PRs are found by head SHA.
+    pulls = subject.get("pull_requests") or []
+    if pulls:
+        return sorted({int(pr["number"]) for pr in pulls})
+    head_sha = subject.get("head_sha") or (subject.get("check_suite") or {}).get("head_sha")
+    return client.open_pr_numbers_for_commit(head_sha)
 
 
 def resolve_repo(args_repo: str | None):
@@ -691,6 +1238,32 @@ def parse_args():
     parser.add_argument("--pr-number", type=int, help="Optional single PR number to reconcile")
     parser.add_argument("--repo", help="GitHub repo in owner/name format")
     parser.add_argument("--dry-run", action="store_true", help="Print intended changes only")
+    parser.add_argument(
+        "--resume-after",
+        type=int,
+        help="Skip PRs up to and including this number (cursor printed by a run that ran out of API budget)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get(WORKERS_ENV) or DEFAULT_WORKERS),
+        help=f"PRs reconciled in parallel (default: ${WORKERS_ENV} or {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--event-name",
+        default=os.environ.get("GITHUB_EVENT_NAME"),
+        help="Event that triggered the run (default: $GITHUB_EVENT_NAME)",
+    )
+    parser.add_argument(
+        "--event-path",
+        default=os.environ.get("GITHUB_EVENT_PATH"),
+        help="Event payload; PR-scoped events reconcile only the PRs they affect (default: $GITHUB_EVENT_PATH)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=os.environ.get(STATE_FILE_ENV),
+        help=f"JSON file of per-PR fingerprints kept between runs (default: ${STATE_FILE_ENV})",
+    )
     return parser.parse_args()
 
 
@@ -701,19 +1274,42 @@ def main():
         print("Could not resolve repository. Set --repo or GITHUB_REPOSITORY.")
         return 1
 
-    client = GitHubCLI(repo=repo, dry_run=args.dry_run)
-    reconciler = PrReconciler(client)
+    workers = max(1, args.workers)
+    client = GitHubCLI(repo=repo, dry_run=args.dry_run, api=GitHubAPI(pool_size=max(workers, DEFAULT_POOL_SIZE)))
+    state = ReconcileState(args.state_file) if args.state_file else None
+    reconciler = PrReconciler(client, workers=workers, state=state)
 
     pr_numbers = [args.pr_number] if args.pr_number else None
-    stats = reconciler.reconcile(pr_numbers)
+    payload = load_event(args.event_path) if pr_numbers is None else None
+    if payload is not None:
+        pr_numbers = affected_pr_numbers(args.event_name, payload, client)
+        if pr_numbers == []:
+            print(f"No open PRs affected by this {args.event_name} event.")
+            client.api.close()
+            return 0
+        if pr_numbers:
+            print(f"Reconciling PRs affected by this {args.event_name} event: {pr_numbers}")
+
+    stats = reconciler.reconcile(pr_numbers, resume_after=args.resume_after)
 
     print(
         "Summary: "
         f"scanned={stats.scanned}, merged={stats.merged}, "
         f"issues_created={stats.issues_created}, issues_closed={stats.issues_closed}, "
-        f"sessions_triggered={stats.sessions_triggered}, "
-        f"errors={stats.errors}"
+        f"sessions_triggered={stats.sessions_triggered}, unchanged={stats.unchanged}, "
+        f"errors={stats.errors}, {client.api.cache_summary()}"
     )
+    client.api.close()
+    if state is not None and not args.dry_run:
+        state.save()
+
+    if stats.budget_exhausted:
+        cursor = reconciler.resume_cursor if reconciler.resume_cursor is not None else 0
+        print(f"API budget exhausted; rerun with --resume-after {cursor}")
+        output_path = os.environ.get("GITHUB_OUTPUT")
+        if output_path:
+            with open(output_path, "a", encoding="utf-8") as handle:
+                handle.write(f"resume_after={cursor}\n")
 
     return 1 if stats.errors else 0
 
@@ -1,11 +1,15 @@
 import argparse
-import json
 import os
 import re
 import subprocess
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from github_api import BudgetExhausted, GitHubAPI, GitHubAPIError  # noqa: E402
 
 AUTONOMOUS_MARKER = "<!-- autonomous-schedule -->"
 AUTONOMOUS_TITLE = "Scheduled Autonomous Development"
@@ -32,111 +36,58 @@ def parse_github_timestamp(value: str | None):
 
 
 class GitHubCLI:
-    def __init__(self, repo: str, dry_run: bool = False):
+    def __init__(self, repo: str, dry_run: bool = False, api: GitHubAPI | None = None):
         self.repo = repo
         self.dry_run = dry_run
+        self.api = api or GitHubAPI()
+        self._default_branch = None
 
-    def run(self, command: list[str], check: bool = True):
-        result = subprocess.run(command, capture_output=True, text=True)
-        if check and result.returncode != 0:
-            printable = " ".join(command)
-            print(f"Command failed: {printable}")
-            if result.stderr:
-                print(result.stderr.strip())
-            return None
-        return result
-
-    def run_json(self, command: list[str]):
-        result = self.run(command, check=True)
-        if result is None:
-            return None
-
-        stdout = result.stdout.strip()
-        if not stdout:
-            return None
-
+    def request_json(self, method: str, path: str, params: dict | None = None, body: dict | None = None):
         try:
-            return json.loads(stdout)
-        except json.JSONDecodeError:
-            printable = " ".join(command)
-            print(f"Failed to decode JSON output: {printable}")
+            return self.api.request_json(method, path, params=params, body=body)
+        except GitHubAPIError as exc:
+            print(f"GitHub API request failed: {exc}")
             return None
 
     def list_open_pr_numbers(self):
-        data = self.run_json(
-            [
-                "gh",
-                "pr",
-                "list",
-                "--repo",
-                self.repo,
-                "--state",
-                "open",
-                "--limit",
-                "100",
-                "--json",
-                "number",
-            ]
-        )
+        data = self.request_json("GET", f"repos/{self.repo}/pulls", params={"state": "open", "per_page": 100})
         if not isinstance(data, list):
             return []
         return [int(pr["number"]) for pr in data]
 
-    def list_open_issues(self):
-        data = self.run_json(["gh", "api", f"repos/{self.repo}/issues?state=open&per_page=100"])
-        if not isinstance(data, list):
-            return []
-        return [issue for issue in data if "pull_request" not in issue]
+    def iter_open_issues(self):
+        """Stream open issues (not PRs) page by page, following ``Link`` headers."""
+        try:
+            for issue in self.api.paginate(f"repos/{self.repo}/issues", params={"state": "open"}):
+                if "pull_request" not in issue:
+                    yield issue
+        except GitHubAPIError as exc:
+            print(f"GitHub API request failed: {exc}")
 
     def find_autonomous_issue(self):
-        for issue in self.list_open_issues():
-            body = str(issue.get("body", ""))
-            if AUTONOMOUS_MARKER in body:
+        # The marker wins over a title match, so only a marker ends the scan early.
+        title_match = None
+        for issue in self.iter_open_issues():
+            if AUTONOMOUS_MARKER in str(issue.get("body", "")):
                 return int(issue["number"])
-
-        for issue in self.list_open_issues():
-            if issue.get("title") == AUTONOMOUS_TITLE:
-                return int(issue["number"])
-
-        return None
+            if title_match is None and issue.get("title") == AUTONOMOUS_TITLE:
+                title_match = int(issue["number"])
+        return title_match
 
     def create_issue(self, title: str, body: str):
         if self.dry_run:
             print(f"[dry-run] Would create issue: {title}")
             return 0
 
-        result = self.run(
-            [
-                "gh",
-                "api",
-                f"repos/{self.repo}/issues",
-                "-X",
-                "POST",
-                "-f",
-                f"title={title}",
-                "-f",
-                f"body={body}",
-                "-q",
-                ".number",
-            ],
-            check=True,
-        )
-        if result is None:
-            return None
-
-        issue_number_text = result.stdout.strip()
-        if not issue_number_text.isdigit():
+        created = self.request_json("POST", f"repos/{self.repo}/issues", body={"title": title, "body": body})
+        if not created or not created.get("number"):
             return None
 
-        return int(issue_number_text)
+        return int(created["number"])
 
     def get_issue_comments(self, issue_number: int):
-        data = self.run_json(
-            [
-                "gh",
-                "api",
-                f"repos/{self.repo}/issues/{issue_number}/comments?per_page=100",
-            ]
+        data = self.request_json(
+            "GET", f"repos/{self.repo}/issues/{issue_number}/comments", params={"per_page": 100}
         )
         if not isinstance(data, list):
             return []
@@ -147,20 +98,21 @@ class GitHubCLI:
             print(f"[dry-run] Would trigger run-agent.yml for issue #{issue_number}")
             return True
 
-        result = self.run(
-            [
-                "gh",
-                "workflow",
-                "run",
-                "run-agent.yml",
-                "--repo",
-                self.repo,
-                "-f",
-                f"issue_number={issue_number}",
-            ],
-            check=False,
-        )
-        return bool(result and result.returncode == 0)
+        try:
+            self.api.post(
+                f"repos/{self.repo}/actions/workflows/run-agent.yml/dispatches",
+                {"ref": self.default_branch(), "inputs": {"issue_number": str(issue_number)}},
+            )
+        except GitHubAPIError as exc:
+            print(f"Failed to dispatch run-agent.yml for issue #{issue_number}: {exc}")
+            return False
+        return True
+
+    def default_branch(self):
+        if self._default_branch is None:
+            data = self.request_json("GET", f"repos/{self.repo}") or {}
+            self._default_branch = data.get("default_branch") or "main"
+        return self._default_branch
 
 
 def build_issue_body():
@@ -298,7 +250,12 @@ def main():
         cooldown=timedelta(hours=args.cooldown_hours),
         force=args.force,
     )
-    stats = scheduler.run()
+    try:
+        stats = scheduler.run()
+    except BudgetExhausted as exc:
+        # The next scheduled run picks up where this one left off.
+        print(f"Stopping early: {exc}")
+        stats = scheduler.stats
 
     print(
         "Summary: "
@@ -306,8 +263,9 @@ def main():
         f"sessions_triggered={stats.sessions_triggered}, "
         f"skipped_for_open_prs={stats.skipped_for_open_prs}, "
         f"skipped_for_cooldown={stats.skipped_for_cooldown}, "
-        f"errors={stats.errors}"
+        f"errors={stats.errors}, {client.api.cache_summary()}"
     )
+    client.api.close()
     return 1 if stats.errors else 0
 
 
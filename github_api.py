@@ -0,0 +1,719 @@
+"""In-process GitHub REST and GraphQL client shared by the automation scripts.
+
+The scripts used to shell out to ``gh`` for every call, paying process
+startup plus a fresh TLS connection each time. This client keeps a small
+pool of keep-alive connections and only depends on the standard library, so
+the ``.github/scripts`` entry points can still run with a bare ``python3``.
+"""
+
+import hashlib
+import heapq
+import http.client
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_API_VERSION = "2022-11-28"
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 4
+# Safe to replay after a dropped keep-alive connection: repeating them
+# cannot create a second issue or comment.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+DEFAULT_PAGE_SIZE = 100
+USER_AGENT = "jules-automation"
+LINK_NEXT_PATTERN = re.compile(r'<([^>]+)>;\s*rel="next"')
+CACHE_DIR_ENV = "GITHUB_API_CACHE_DIR"
+DEFAULT_CACHE_MAX_ENTRIES = 500
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+CACHED_RESPONSE_HEADERS = ("ETag", "Last-Modified", "Link")
+BUDGET_FRACTION_ENV = "GITHUB_API_BUDGET_FRACTION"
+DEFAULT_BUDGET_FRACTION = 0.8
+# Share of the usable budget that low-priority reads must leave for writes.
+DEFAULT_WRITE_RESERVE = 0.1
+# Start spacing calls out once less than this share of the limit is usable.
+DEFAULT_PACE_BELOW = 0.1
+DEFAULT_MAX_PAUSE_SECONDS = 5.0
+DEFAULT_MAX_RATE_LIMIT_WAIT_SECONDS = 60.0
+MAX_RATE_LIMIT_RETRIES = 2
+DEFAULT_RECHECK_DELAY_SECONDS = 2.0
+DEFAULT_RECHECK_ATTEMPTS = 3
+MERGEABLE_BATCH_SIZE = 50
+
+
+class GitHubAPIError(Exception):
+    """A GitHub request failed, either on the network or with an error status."""
+
+    def __init__(self, message, status=None, method=None, path=None):
+        super().__init__(message)
+        self.status = status
+        self.method = method
+        self.path = path
+
+
+class BudgetExhausted(Exception):
+    """The next call would exceed the configured rate-limit budget.
+
+    Deliberately not a GitHubAPIError, so callers that swallow failed
+    requests still stop cleanly instead of carrying on without a budget.
+    """
+
+    def __init__(self, message, resource=None, reset_at=None):
+        super().__init__(message)
+        self.resource = resource
+        self.reset_at = reset_at
+
+
+def discover_token():
+    """Return a token from GH_TOKEN/GITHUB_TOKEN, falling back to a local ``gh`` login."""
+    for name in ("GH_TOKEN", "GITHUB_TOKEN"):
+        token = os.environ.get(name)
+        if token:
+            return token
+
+    try:
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    token = result.stdout.strip()
+    return token if result.returncode == 0 and token else None
+
+
+def next_page_url(link_header):
+    if not link_header:
+        return None
+    match = LINK_NEXT_PATTERN.search(link_header)
+    return match.group(1) if match else None
+
+
+class GitHubResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return None
+        return json.loads(self.body)
+
+
+def write_file_atomic(path, data):
+    """Write bytes to a sibling temp file and rename it over ``path``."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_json_atomic(path, data):
+    write_file_atomic(path, json.dumps(data).encode())
+
+
+class ResponseCache:
+    """Disk-backed LRU of GET responses keyed by URL, revalidated with ETag/Last-Modified.
+
+    Unchanged resources come back from GitHub as 304s, which do not count
+    against the rate limit; the cached body is then served instead.
+    """
+
+    def __init__(self, directory, max_entries=DEFAULT_CACHE_MAX_ENTRIES, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        directory = os.environ.get(CACHE_DIR_ENV)
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, f"{key}.body")
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as handle:
+                    self._index = json.load(handle)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def lookup(self, url):
+        """Return ``(headers, body)`` for a cached URL, or None."""
+        key = self.key_for(url)
+        with self._lock:
+            entry = self._load_index().get(key)
+            if not entry:
+                return None
+            try:
+                with open(self._body_path(key), "rb") as handle:
+                    body = handle.read()
+            except OSError:
+                self._index.pop(key, None)
+                return None
+            entry["last_used"] = time.time()
+            return entry["headers"], body
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def store(self, url, headers, body):
+        cached_headers = {name: headers[name] for name in CACHED_RESPONSE_HEADERS if headers.get(name)}
+        if "ETag" not in cached_headers and "Last-Modified" not in cached_headers:
+            return
+        key = self.key_for(url)
+        with self._lock:
+            try:
+                write_file_atomic(self._body_path(key), body)
+            except OSError as exc:
+                print(f"Warning: could not write GitHub response cache entry: {exc}")
+                return
+            self._load_index()[key] = {
+                "url": url,
+                "headers": cached_headers,
+                "size": len(body),
+                "last_used": time.time(),
+            }
+            self._evict()
+
+    def _evict(self):
+        index = self._index
+        total_bytes = sum(entry["size"] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]["last_used"]):
+            if len(index) <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            index.pop(key)
+            total_bytes -= entry["size"]
+            try:
+                os.unlink(self._body_path(key))
+            except OSError:
+                pass
+
+    def save(self):
+        """Persist the LRU index; call once at the end of a run."""
+        with self._lock:
+            if self._index is None:
+                return
+            try:
+                write_json_atomic(self.index_path, self._index)
+            except OSError as exc:
+                print(f"Warning: could not write GitHub response cache index: {exc}")
+
+
+class RateLimitBudget:
+    """Paces calls to stay under a fraction of GitHub's per-resource rate limits.
+
+    State comes from the ``X-RateLimit-*`` headers on every response; GraphQL
+    reports its point cost through the same headers with
+    ``X-RateLimit-Resource: graphql``. Low-priority reads must leave a reserve
+    for writes, so a run that is about to run dry stops before it starts
+    something it cannot finish.
+    """
+
+    def __init__(
+        self,
+        fraction=DEFAULT_BUDGET_FRACTION,
+        write_reserve=DEFAULT_WRITE_RESERVE,
+        pace_below=DEFAULT_PACE_BELOW,
+        max_pause=DEFAULT_MAX_PAUSE_SECONDS,
+        max_wait=DEFAULT_MAX_RATE_LIMIT_WAIT_SECONDS,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.fraction = fraction
+        self.write_reserve = write_reserve
+        self.pace_below = pace_below
+        self.max_pause = max_pause
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.paused_seconds = 0.0
+        self._limits = {}
+        self._last_request_at = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        raw = os.environ.get(BUDGET_FRACTION_ENV)
+        try:
+            fraction = float(raw) if raw else DEFAULT_BUDGET_FRACTION
+        except ValueError:
+            fraction = DEFAULT_BUDGET_FRACTION
+        return cls(fraction=min(max(fraction, 0.0), 1.0))
+
+    def update(self, headers):
+        try:
+            limit = int(headers.get("X-RateLimit-Limit"))
+            remaining = int(headers.get("X-RateLimit-Remaining"))
+            reset_at = float(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return
+        resource = headers.get("X-RateLimit-Resource") or "core"
+        with self._lock:
+            self._limits[resource] = {"limit": limit, "remaining": remaining, "reset_at": reset_at}
+
+    def remaining(self, resource):
+        state = self._limits.get(resource)
+        return state["remaining"] if state else None
+
+    def _headroom(self, state, priority):
+        floor = state["limit"] * (1 - self.fraction)
+        if priority == "low":
+            floor += state["limit"] * self.fraction * self.write_reserve
+        return state["remaining"] - floor
+
+    def before_request(self, resource, priority):
+        """Raise BudgetExhausted or pause as needed before spending one call."""
+        now = self.clock()
+        with self._lock:
+            state = self._limits.get(resource)
+            if state is not None and now >= state["reset_at"]:
+                self._limits.pop(resource)
+                state = None
+            if state is None:
+                self._last_request_at[resource] = now
+                return
+
+            headroom = self._headroom(state, priority)
+            if headroom < 1:
+                raise BudgetExhausted(
+                    f"GitHub {resource} budget exhausted for {priority}-priority calls "
+                    f"({state['remaining']}/{state['limit']} left until {int(state['reset_at'])})",
+                    resource=resource,
+                    reset_at=state["reset_at"],
+                )
+
+            pause = 0.0
+            if headroom < state["limit"] * self.pace_below:
+                interval = (state["reset_at"] - now) / headroom
+                last = self._last_request_at.get(resource, 0.0)
+                pause = min(self.max_pause, max(0.0, last + interval - now))
+            self._last_request_at[resource] = now + pause
+            # Count the call now so concurrent callers see the spend immediately.
+            state["remaining"] -= 1
+
+        if pause:
+            self.paused_seconds += pause
+            self.sleep(pause)
+
+    def rate_limit_delay(self, response):
+        """Return how long to wait before retrying a rate-limited response, or None."""
+        if response.status not in (403, 429):
+            return None
+        headers = response.headers
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.strip().isdigit():
+            return float(retry_after)
+        if headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                return max(0.0, float(headers.get("X-RateLimit-Reset")) - self.clock())
+            except (TypeError, ValueError):
+                return None
+        if response.status == 429 or b"secondary rate limit" in response.body.lower():
+            return 60.0
+        return None
+
+
+class ConnectionPool:
+    """Keep-alive connections to one host, handed out to one request at a time."""
+
+    def __init__(self, base_url, maxsize=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        parsed = urlsplit(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        connection_class = (
+            http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        )
+        with self._lock:
+            self.connections_opened += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, method, target, body=None, headers=None):
+        connection, reused = self._acquire()
+        try:
+            connection.request(method, target, body=body, headers=headers or {})
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            connection.close()
+            if not reused or method.upper() not in IDEMPOTENT_METHODS:
+                raise
+            # The server closed an idle keep-alive connection; retry once on a fresh one.
+            connection = self._new_connection()
+            connection.request(method, target, body=body, headers=headers or {})
+            response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        return GitHubResponse(response.status, response.headers, data)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class GitHubAPI:
+    """Minimal REST + GraphQL client over a shared keep-alive connection pool."""
+
+    def __init__(
+        self,
+        token=None,
+        base_url=None,
+        timeout=DEFAULT_TIMEOUT,
+        pool_size=DEFAULT_POOL_SIZE,
+        cache=None,
+        budget=None,
+        graphql_url=None,
+    ):
+        if base_url is None and graphql_url is None:
+            graphql_url = os.environ.get("GITHUB_GRAPHQL_URL")
+        self.base_url = (base_url or os.environ.get("GITHUB_API_URL") or GITHUB_API_URL).rstrip("/")
+        self.base_path = urlsplit(self.base_url).path
+        # GitHub Enterprise Server serves REST under /api/v3 but GraphQL at /api/graphql.
+        self.graphql_url = (graphql_url or f"{self.base_url.removesuffix('/v3')}/graphql").rstrip("/")
+        self.graphql_path = urlsplit(self.graphql_url).path
+        self.token = token if token is not None else discover_token()
+        self.pool = ConnectionPool(self.base_url, maxsize=pool_size, timeout=timeout)
+        self.cache = cache if cache is not None else ResponseCache.from_environment()
+        self.budget = budget if budget is not None else RateLimitBudget.from_environment()
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    def _target(self, path, params=None):
+        if path.startswith(("http://", "https://")):
+            parsed = urlsplit(path)
+            target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        else:
+            target = f"{self.base_path}/{path.lstrip('/')}"
+        if params:
+            separator = "&" if "?" in target else "?"
+            target = f"{target}{separator}{urlencode(params)}"
+        return target
+
+    def _headers(self, has_body):
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": USER_AGENT,
+            "X-GitHub-Api-Version": GITHUB_API_VERSION,
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if has_body:
+            headers["Content-Type"] = "application/json"
+        return headers
+
+    def request(self, method, path, params=None, body=None, priority=None):
+        """Send one request and return the raw GitHubResponse, raising on error statuses.
+
+        GETs are revalidated against the response cache when one is configured.
+        Every call is charged to the rate-limit budget; ``priority`` defaults to
+        "low" for GETs and "high" for writes.
+        """
+        payload = json.dumps(body).encode() if body is not None else None
+        target = self._target(path, params)
+        headers = self._headers(payload is not None)
+        cached = self.cache.lookup(target) if self.cache is not None and method == "GET" else None
+        if cached is not None:
+            cached_headers, cached_body = cached
+            if cached_headers.get("ETag"):
+                headers["If-None-Match"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        resource = "graphql" if target == self.graphql_path else "core"
+        priority = priority or ("low" if method == "GET" else "high")
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.budget.before_request(resource, priority)
+            with self._count_lock:
+                self.request_count += 1
+            try:
+                response = self.pool.request(method, target, body=payload, headers=headers)
+            except (OSError, http.client.HTTPException) as exc:
+                raise GitHubAPIError(f"{method} {target} failed: {exc}", method=method, path=target) from exc
+            self.budget.update(response.headers)
+
+            delay = self.budget.rate_limit_delay(response)
+            if delay is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            if delay > self.budget.max_wait:
+                raise BudgetExhausted(
+                    f"GitHub rate limit hit on {method} {target}; retry in {int(delay)}s",
+                    resource=resource,
+                    reset_at=self.budget.clock() + delay,
+                )
+            print(f"GitHub rate limit hit on {method} {target}; waiting {delay:.0f}s")
+            self.budget.sleep(delay)
+
+        if self.cache is not None and method == "GET":
+            if response.status == 304 and cached is not None:
+                self.cache.record_hit()
+                merged_headers = {**cached_headers, **{k: v for k, v in response.headers.items()}}
+                return GitHubResponse(200, merged_headers, cached_body)
+            if response.status == 200:
+                self.cache.record_miss()
+                self.cache.store(target, response.headers, response.body)
+
+        if response.status >= 400:
+            message = response.body.decode(errors="replace").strip()
+            try:
+                message = json.loads(message).get("message", message)
+            except (ValueError, AttributeError):
+                pass
+            raise GitHubAPIError(
+                f"{method} {target} returned HTTP {response.status}: {message}",
+                status=response.status,
+                method=method,
+                path=target,
+            )
+        return response
+
+    def request_json(self, method, path, params=None, body=None, priority=None):
+        return self.request(method, path, params=params, body=body, priority=priority).json()
+
+    def get(self, path, params=None):
+        return self.request_json("GET", path, params=params)
+
+    def post(self, path, body=None):
+        return self.request_json("POST", path, body=body)
+
+    def patch(self, path, body=None):
+        return self.request_json("PATCH", path, body=body)
+
+    def put(self, path, body=None):
+        return self.request_json("PUT", path, body=body)
+
+    def delete(self, path):
+        return self.request_json("DELETE", path)
+
+    def paginate(self, path, params=None, item_key=None):
+        """Yield items from every page of a REST listing, following ``Link: rel="next"``."""
+        params = {"per_page": DEFAULT_PAGE_SIZE, **(params or {})}
+        url = path
+        while url:
+            response = self.request("GET", url, params=params)
+            data = response.json()
+            items = data.get(item_key, []) if item_key else data
+            yield from items or []
+            url = next_page_url(response.headers.get("Link"))
+            params = None
+
+    def graphql(self, query, variables=None):
+        """Run a GraphQL query and return its ``data``; GraphQL-level errors raise."""
+        priority = "high" if query.lstrip().startswith("mutation") else "low"
+        payload = self.request_json(
+            "POST", self.graphql_url, body={"query": query, "variables": variables or {}}, priority=priority
+        ) or {}
+        if payload.get("errors"):
+            messages = "; ".join(error.get("message", str(error)) for error in payload["errors"])
+            raise GitHubAPIError(f"GraphQL query failed: {messages}", method="POST", path="graphql")
+        return payload.get("data") or {}
+
+    def graphql_nodes(self, query, variables, connection_path):
+        """Yield nodes of a cursor-paginated connection located at ``connection_path``.
+
+        The query must accept a ``$cursor: String`` variable and select
+        ``pageInfo { hasNextPage endCursor }`` on that connection.
+        """
+        cursor = None
+        while True:
+            data = self.graphql(query, {**variables, "cursor": cursor})
+            connection = data
+            for key in connection_path:
+                connection = (connection or {}).get(key)
+            if not connection:
+                return
+
+            yield from (node for node in connection.get("nodes") or [] if node)
+
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return
+            cursor = page_info.get("endCursor")
+
+    def mergeable_states(self, repo, pr_numbers):
+        """Return ``{number: mergeable}`` for many PRs, one aliased GraphQL query per batch."""
+        owner, _, name = repo.partition("/")
+        numbers = sorted({int(number) for number in pr_numbers})
+        states = {}
+        for start in range(0, len(numbers), MERGEABLE_BATCH_SIZE):
+            batch = numbers[start : start + MERGEABLE_BATCH_SIZE]
+            fields = "\n".join(f"    pr{number}: pullRequest(number: {number}) {{ mergeable }}" for number in batch)
+            query = (
+                "query($owner: String!, $name: String!) {\n"
+                f"  repository(owner: $owner, name: $name) {{\n{fields}\n  }}\n}}"
+            )
+            repository = self.graphql(query, {"owner": owner, "name": name}).get("repository") or {}
+            for number in batch:
+                states[number] = str((repository.get(f"pr{number}") or {}).get("mergeable") or "UNKNOWN").upper()
+        return states
+
+    def cache_summary(self):
+        if self.cache is None:
+            return "cache=off"
+        return f"cache_hits={self.cache.hits}, cache_misses={self.cache.misses}"
+
+    def rate_limit_status(self):
+        """Fetch /rate_limit, which itself does not count against the limit."""
+        data = self.request_json("GET", "rate_limit", priority="high") or {}
+        return data.get("resources") or {}
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.save()
+        self.pool.close()
+
+
+class RecheckQueue:
+    """PRs whose mergeability GitHub is still computing, parked until a not-before time.
+
+    Instead of sleeping on each ``UNKNOWN`` PR in turn, callers park it and
+    move on, then drain the queue: ``next_batch`` waits once for the earliest
+    entry and returns every entry that is due, so they can be re-polled
+    together with ``GitHubAPI.mergeable_states``.
+    """
+
+    def __init__(
+        self,
+        delay=DEFAULT_RECHECK_DELAY_SECONDS,
+        attempts=DEFAULT_RECHECK_ATTEMPTS,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.delay = delay
+        self.attempts = attempts
+        self.clock = clock
+        self.sleep = sleep
+        self._heap = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def park(self, pr_number, payload=None, attempt=0):
+        """Park a PR for its ``attempt``-th re-check; return False once attempts are used up."""
+        if attempt >= self.attempts:
+            return False
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._heap, (self.clock() + self.delay, self._sequence, int(pr_number), payload, attempt))
+        return True
+
+    def pending(self):
+        with self._lock:
+            return sorted(entry[2] for entry in self._heap)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+    def next_batch(self):
+        """Wait for the earliest entry, then pop every due ``(pr_number, payload, attempt)``."""
+        with self._lock:
+            if not self._heap:
+                return []
+            earliest = self._heap[0][0]
+        wait = earliest - self.clock()
+        if wait > 0:
+            self.sleep(wait)
+        now = max(self.clock(), earliest)
+        batch = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, pr_number, payload, attempt = heapq.heappop(self._heap)
+                batch.append((pr_number, payload, attempt))
+        return batch
+
+
+def budget_shortfalls(resources, needed, fraction=DEFAULT_BUDGET_FRACTION):
+    """Return resources from a /rate_limit payload that cannot absorb ``needed`` more calls."""
+    short = []
+    for name in ("core", "graphql"):
+        state = resources.get(name)
+        if not state:
+            continue
+        usable = state["remaining"] - state["limit"] * (1 - fraction)
+        if usable < needed:
+            short.append(f"{name} ({state['remaining']}/{state['limit']} left, resets at {state['reset']})")
+    return short
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the remaining GitHub API budget.")
+    parser.add_argument("--need", type=int, default=1, help="Calls the caller is about to make.")
+    args = parser.parse_args(argv)
+
+    api = GitHubAPI()
+    try:
+        resources = api.rate_limit_status()
+    except GitHubAPIError as exc:
+        print(f"Could not read the GitHub rate limit: {exc}")
+        return 0
+    finally:
+        api.close()
+
+    short = budget_shortfalls(resources, args.need, api.budget.fraction)
+    if short:
+        print("GitHub API budget too low: " + ", ".join(short))
+        return 1
+    print("GitHub API budget ok")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
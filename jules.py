@@ -4,17 +4,87 @@
 # ]
 # ///
 
+import argparse
+import hashlib
+import heapq
+import hmac
+import importlib.util
 import json
+import math
 import os
+import random
 import re
-import subprocess
 import sys
+import threading
+import time
+from contextlib import contextmanager
 
-import requests
+
+def lazy_module(name):
+    """Return module ``name``, deferring its execution until an attribute is first used.
+
+    Most runs exit after a cheap look at the event payload, so the HTTP stack
+    is only loaded once a request is actually about to be made.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+requests = lazy_module("requests")
+github_api = lazy_module("github_api")
 
 JULES_API_BASE = "https://jules.googleapis.com/v1alpha"
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Statuses where the server explicitly refused the request, so replaying a
+# non-idempotent POST cannot create a duplicate.
+REFUSED_STATUS_CODES = {429, 503}
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+WAIT_POLL_INITIAL_SECONDS = 1.0
+WAIT_POLL_MAX_SECONDS = 30.0
+ACTIVITY_PAGE_SIZE = 50
+ACTIVITY_HISTORY_LINES = 10
+ACTIVITY_STATUS_MARKER = "<!-- jules-status -->"
+ACTIVITY_CURSOR_PATTERN = re.compile(r"<!-- jules-activity-cursor (\{.*?\}) -->")
+DEFAULT_MIRROR_WORKERS = 4
+FORWARD_MARKER = "<!-- jules-forwarded -->"
+FORWARD_CURSOR_PATTERN = re.compile(r"<!-- jules-forward-cursor (\{.*?\}) -->")
+FORWARD_DEBOUNCE_ENV = "JULES_FORWARD_DEBOUNCE_SECONDS"
+ACTIVE_SESSIONS_FILTER = "archived = false"
+SESSION_PAGE_SIZE = 100
+CACHE_DIR_ENV = "JULES_CACHE_DIR"
+SOURCE_CACHE_TTL_SECONDS = 24 * 60 * 60
+QUEUE_SCAN_PAGE_SIZE = 50
+QUEUE_SCAN_COMMENT_LIMIT = 100
 SESSION_ID_PATTERN = re.compile(r"\*\*Session ID:\*\* `(sessions/[^`]+)`")
 QUEUE_MARKER = "<!-- jules-queue -->"
+QUEUE_STATE_LABEL = "jules-queue"
+QUEUE_STATE_TITLE = "Jules issue queue"
+QUEUE_STATE_PATTERN = re.compile(r"<!-- jules-queue-state\n(.*?)\n-->", re.DOTALL)
+PRIORITY_LABEL_RANKS = {
+    "priority:critical": 0,
+    "priority:high": 1,
+    "priority:low": 3,
+}
+DEFAULT_PRIORITY_RANK = 2
+MAX_QUEUE_RETRIES = 3
+QUEUE_SAVE_ATTEMPTS = 3
+# start_issue_session results; only SESSION_START_FAILED is a failing exit code.
+SESSION_CREATED = 0
+SESSION_START_FAILED = 1
+SESSION_QUEUED = 2
+SESSION_EXISTS = 3
 BUSY_SESSION_STATES = {
     "QUEUED",
     "PLANNING",
@@ -23,70 +93,523 @@ BUSY_SESSION_STATES = {
     "IN_PROGRESS",
     "PAUSED",
 }
+# Adaptive polling for `jules.py serve`, keyed by the busy session's state.
+# An IN_PROGRESS session can finish at any moment; sessions waiting on a human
+# rarely change between polls.
+POLL_FAST_SECONDS = 15.0
+POLL_SLOW_SECONDS = 300.0
+POLL_INTERVALS_BY_STATE = {
+    "IN_PROGRESS": POLL_FAST_SECONDS,
+    "QUEUED": 60.0,
+    "PLANNING": 60.0,
+    "AWAITING_PLAN_APPROVAL": POLL_SLOW_SECONDS,
+    "AWAITING_USER_FEEDBACK": POLL_SLOW_SECONDS,
+    "PAUSED": POLL_SLOW_SECONDS,
+}
+METRICS_PORT_ENV = "JULES_METRICS_PORT"
+DEFAULT_METRICS_PORT = 9464
+WEBHOOK_SECRET_ENV = "JULES_WEBHOOK_SECRET"
+WEBHOOK_PORT_ENV = "JULES_WEBHOOK_PORT"
+DEFAULT_WEBHOOK_PORT = 8080
+DEFAULT_WEBHOOK_WORKERS = 4
+DEFAULT_WEBHOOK_BACKLOG = 64
+# GitHub caps webhook payloads at 25 MB and drops anything larger.
+MAX_WEBHOOK_BODY_BYTES = 25 * 1024 * 1024
+WEBHOOK_EVENTS = {"issues", "issue_comment"}
+REPOSITORIES_ENV = "JULES_REPOSITORIES"
+MAX_SESSIONS_ENV = "JULES_MAX_SESSIONS_PER_REPO"
+SLOT_WEIGHTS_ENV = "JULES_SESSION_SLOT_WEIGHTS"
 
 
 def is_session_busy(session):
-    """Return True when a session still occupies the repo's only active slot."""
+    """Return True when a session is in a non-terminal state."""
     return str(session.get("state") or "").upper() in BUSY_SESSION_STATES
 
 
+def parse_slot_weights(value):
+    """Parse ``STATE=weight`` pairs, comma- or whitespace-separated, into a dict."""
+    weights = {}
+    for item in re.split(r"[\s,]+", value or ""):
+        state, _, weight = item.partition("=")
+        if not state or not weight:
+            continue
+        try:
+            weights[state.upper()] = float(weight)
+        except ValueError:
+            print(f"Ignoring invalid session slot weight: {item}")
+    return weights
+
+
+class SlotPolicy:
+    """How many sessions a repo may run at once, and how much of a slot each busy state uses.
+
+    Busy states weigh 1 unless ``weights`` says otherwise; a weight of 0 (for
+    example for ``AWAITING_USER_FEEDBACK``) lets a parked session stop holding
+    a slot. The default, one slot with every busy state weighing 1, is the
+    original one-active-session-per-repo rule.
+    """
+
+    def __init__(self, max_sessions=1, weights=None):
+        self.max_sessions = max(1, int(max_sessions))
+        self.weights = dict(weights or {})
+
+    @classmethod
+    def from_environment(cls):
+        try:
+            max_sessions = int(os.environ.get(MAX_SESSIONS_ENV) or 1)
+        except ValueError:
+            print(f"Ignoring invalid {MAX_SESSIONS_ENV}; using 1.")
+            max_sessions = 1
+        return cls(max_sessions, parse_slot_weights(os.environ.get(SLOT_WEIGHTS_ENV)))
+
+    def weight(self, session):
+        if not is_session_busy(session):
+            return 0
+        return self.weights.get(str(session.get("state") or "").upper(), 1)
+
+    def used_slots(self, sessions):
+        return sum(self.weight(session) for session in sessions)
+
+    def free_slots(self, sessions):
+        """Count the sessions that can start now; a partly used slot still takes one."""
+        return max(0, math.ceil(self.max_sessions - self.used_slots(sessions)))
+
+    def blocking_session(self, sessions):
+        """Return the busy session that uses up the last free slot, or None if one is free.
+
+        ``sessions`` is consumed lazily, so a paged listing stops as soon as
+        the slots are known to be full.
+        """
+        used = 0
+        for session in sessions:
+            weight = self.weight(session)
+            if not weight:
+                continue
+            used += weight
+            if used >= self.max_sessions:
+                return session
+        return None
+
+
+class LatencyHistogram:
+    """Bucketed wall-clock latency per Jules API call name."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = {}
+        self._totals_ms = {}
+        # The serve daemon and webhook threads share one client.
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            counts = self._counts.setdefault(name, [0] * (len(self.buckets_ms) + 1))
+            for index, bound in enumerate(self.buckets_ms):
+                if elapsed_ms <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._totals_ms[name] = self._totals_ms.get(name, 0.0) + elapsed_ms
+
+    def snapshot(self):
+        """Return {name: {"count", "total_ms", "buckets"}} with per-bucket (non-cumulative) counts."""
+        labels = [f"<={bound}ms" for bound in self.buckets_ms] + ["+Inf"]
+        with self._lock:
+            return {
+                name: {
+                    "count": sum(counts),
+                    "total_ms": round(self._totals_ms[name], 1),
+                    "buckets": dict(zip(labels, counts)),
+                }
+                for name, counts in self._counts.items()
+            }
+
+    def summary(self):
+        lines = []
+        for name, data in sorted(self.snapshot().items()):
+            average = data["total_ms"] / data["count"] if data["count"] else 0.0
+            filled = ", ".join(
+                f"{label}={count}" for label, count in data["buckets"].items() if count
+            )
+            lines.append(f"{name}: count={data['count']}, avg={average:.1f}ms ({filled})")
+        return "\n".join(lines)
+
+
+def default_cache_dir():
+    """Return the bridge cache directory, honouring JULES_CACHE_DIR and XDG_CACHE_HOME."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "jules-bridge")
+
+
+class SourceMapCache:
+    """On-disk (owner, repo) -> Jules source name map shared across bridge runs."""
+
+    def __init__(self, directory, ttl_seconds=SOURCE_CACHE_TTL_SECONDS):
+        self.path = os.path.join(directory, "sources.json")
+        self.ttl_seconds = ttl_seconds
+
+    def load(self):
+        """Return the cached map, or None when it is missing, expired or unreadable."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            fetched_at = float(data["fetched_at"])
+            sources = data["sources"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if time.time() - fetched_at > self.ttl_seconds:
+            return None
+
+        source_map = {}
+        for key, name in sources.items():
+            owner, _, repo = key.partition("/")
+            source_map[(owner, repo)] = name
+        return source_map
+
+    def save(self, source_map):
+        data = {
+            "fetched_at": time.time(),
+            "sources": {f"{owner}/{repo}": name for (owner, repo), name in source_map.items()},
+        }
+        try:
+            github_api.write_json_atomic(self.path, data)
+        except OSError as exc:
+            print(f"Warning: could not write Jules source cache {self.path}: {exc}")
+
+    def invalidate(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            print(f"Warning: could not remove Jules source cache {self.path}: {exc}")
+
+
+class SessionIndex:
+    """Active Jules sessions partitioned by ``sourceContext.source``.
+
+    Built from a single listing so that many repositories can be checked for a
+    busy session without one listing per repository.
+    """
+
+    def __init__(self, sessions=()):
+        self._by_source = {}
+        for session in sessions:
+            self.add(session)
+
+    def add(self, session):
+        source = (session.get("sourceContext") or {}).get("source")
+        if source:
+            self._by_source.setdefault(source, []).append(session)
+
+    def sessions_for(self, source_name):
+        return list(self._by_source.get(source_name, []))
+
+    def busy_session_for(self, source_name, slot_policy=None):
+        """Return the session that leaves this source no free slot, like the client lookup."""
+        return (slot_policy or SlotPolicy()).blocking_session(self._by_source.get(source_name, []))
+
+
+def join_filters(*expressions):
+    """Combine AIP-160 filter expressions with AND, skipping empty ones."""
+    return " AND ".join(expression for expression in expressions if expression)
+
+
+def build_http_session(pool_maxsize=4):
+    """Create a keep-alive session; retries are handled by JulesClient itself."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_retry_after(value):
+    """Return the Retry-After delay in seconds, accepting delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - time.time())
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff that never undercuts the server's Retry-After."""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2**attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX_SECONDS))
+    return delay
+
+
+def request_never_sent(exc):
+    """Return True when a connection error happened before the request reached the server."""
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+ISSUE_WITH_COMMENTS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issue(number: $number) {
+      number
+      title
+      body
+      state
+      createdAt
+      author { login }
+      labels(first: 20) { nodes { name } }
+      comments(first: 100, after: $cursor) {
+        pageInfo { hasNextPage endCursor }
+        nodes { databaseId body createdAt author { login } }
+      }
+    }
+  }
+}
+"""
+
+QUEUE_STATE_QUERY = """
+query($owner: String!, $name: String!, $label: String!) {
+  repository(owner: $owner, name: $name) {
+    issues(states: OPEN, labels: [$label], first: 1, orderBy: {field: CREATED_AT, direction: ASC}) {
+      nodes { id number body updatedAt }
+    }
+  }
+}
+"""
+
+PIN_ISSUE_MUTATION = """
+mutation($issueId: ID!) {
+  pinIssue(input: {issueId: $issueId}) { issue { number } }
+}
+"""
+
+OPEN_ISSUES_WITH_COMMENTS_QUERY = """
+query($owner: String!, $name: String!, $pageSize: Int!, $commentLimit: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issues(
+      states: OPEN
+      first: $pageSize
+      after: $cursor
+      orderBy: {field: CREATED_AT, direction: ASC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        createdAt
+        author { login }
+        labels(first: 20) { nodes { name } }
+        comments(last: $commentLimit) {
+          totalCount
+          nodes { databaseId body createdAt author { login } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
 class JulesClient:
-    def __init__(self, api_key):
+    def __init__(
+        self,
+        api_key,
+        base_url=JULES_API_BASE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        session=None,
+        source_cache=None,
+    ):
         self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
         self._sources_cache = None
         self._source_map = None
+        self._source_map_from_cache = False
+        self.source_cache = source_cache
+        self._source_filter_supported = True
         self.headers = {
             "x-goog-api-key": self.api_key,
             "Content-Type": "application/json",
         }
+        self.session = session or build_http_session()
+        self.session.headers.update(self.headers)
+        self.latency = LatencyHistogram()
+
+    def _request(self, method, path, name, params=None, payload=None, replay_safe=True, recover=None):
+        """Send one API call over the pooled session, retrying transient failures.
+
+        GETs are always replayed. POSTs (``replay_safe=False``) are only replayed
+        when the server provably did not act on them: the connection never
+        opened, or it answered 429/503. For other ambiguous failures the
+        ``recover`` callback must first confirm whether the request landed; it
+        returns that result, or None when a replay is safe. Without a callback
+        the error is raised instead of risking a duplicate.
+        """
+        url = f"{self.base_url}/{path}"
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, url, params=params, json=payload, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                self.latency.record(name, time.monotonic() - started)
+                if attempt >= self.max_retries:
+                    raise
+                if not replay_safe and not request_never_sent(exc):
+                    if recover is None:
+                        raise
+                    recovered = recover()
+                    if recovered is not None:
+                        return recovered
+                delay = backoff_delay(attempt)
+                print(f"{name} failed ({exc.__class__.__name__}); retrying in {delay:.1f}s")
+            else:
+                self.latency.record(name, time.monotonic() - started)
+                status = response.status_code
+                if status not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                if not replay_safe and status not in REFUSED_STATUS_CODES:
+                    if recover is None:
+                        response.raise_for_status()
+                    recovered = recover()
+                    if recovered is not None:
+                        return recovered
+                delay = backoff_delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                print(f"{name} returned HTTP {status}; retrying in {delay:.1f}s")
+
+            time.sleep(delay)
+            attempt += 1
 
     def list_sources(self):
         """List all available sources."""
         if self._sources_cache is not None:
             return self._sources_cache
 
-        url = f"{JULES_API_BASE}/sources"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        self._sources_cache = response.json().get("sources", [])
+        data = self._request("GET", "sources", "sources.list")
+        self._sources_cache = data.get("sources", [])
         return self._sources_cache
 
-    def list_sessions(self, filter_expression="archived = false", page_size=100):
-        """List available Jules sessions."""
-        url = f"{JULES_API_BASE}/sessions"
+    def iter_sessions(self, source_name=None, filter_expression=ACTIVE_SESSIONS_FILTER, page_size=SESSION_PAGE_SIZE):
+        """Yield Jules sessions page by page, following nextPageToken lazily.
+
+        When ``source_name`` is given the constraint is pushed into the server
+        filter; if the API rejects that filter, later calls fall back to
+        filtering on the client. Either way only matching sessions are yielded,
+        and a caller that stops iterating stops the page fetches too.
+        """
+        server_filter = source_name is not None and self._source_filter_supported
         params = {"pageSize": page_size}
-        if filter_expression:
-            params["filter"] = filter_expression
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-        return response.json().get("sessions", [])
+        expression = filter_expression
+        if server_filter:
+            expression = join_filters(filter_expression, f'sourceContext.source = "{source_name}"')
+        if expression:
+            params["filter"] = expression
 
-    def find_source_for_repo(self, repo_owner, repo_name):
-        """Find the Jules source ID for a specific GitHub repo."""
-        if self._source_map is None:
-            self._source_map = {}
-            for source in self.list_sources():
-                gh_repo = source.get("githubRepo", {})
-                owner = gh_repo.get("owner")
-                repo = gh_repo.get("repo")
-
-                if owner and repo:
-                    self._source_map[(owner.lower(), repo.lower())] = source.get("name")
-
-        return self._source_map.get((repo_owner.lower(), repo_name.lower()))
-
-    def find_busy_session_for_source(self, source_name):
-        """Return the first non-terminal session for this repository source."""
-        for session in self.list_sessions():
-            if session.get("sourceContext", {}).get("source") != source_name:
-                continue
-            if is_session_busy(session):
-                return session
-        return None
+        while True:
+            try:
+                data = self._request("GET", "sessions", "sessions.list", params=params)
+            except requests.HTTPError as exc:
+                rejected = exc.response is not None and exc.response.status_code == 400
+                if not (server_filter and rejected and "pageToken" not in params):
+                    raise
+                print("Jules API rejected the source filter; filtering sessions locally.")
+                self._source_filter_supported = False
+                yield from self.iter_sessions(source_name, filter_expression, page_size)
+                return
+
+            for session in data.get("sessions", []):
+                if source_name is None or session.get("sourceContext", {}).get("source") == source_name:
+                    yield session
+
+            next_page_token = data.get("nextPageToken")
+            if not next_page_token:
+                return
+            params = {**params, "pageToken": next_page_token}
+
+    def list_sessions(self, filter_expression=ACTIVE_SESSIONS_FILTER, page_size=SESSION_PAGE_SIZE):
+        """List all Jules sessions matching the filter, across every page."""
+        return list(self.iter_sessions(filter_expression=filter_expression, page_size=page_size))
 
-    def create_session(self, source_name, prompt, title):
-        """Create a new Jules session."""
-        url = f"{JULES_API_BASE}/sessions"
+    def find_source_for_repo(self, repo_owner, repo_name):
+        """Find the Jules source ID for a specific GitHub repo.
+
+        A fresh on-disk map from ``source_cache`` is used before calling the
+        API. A miss against that cached map invalidates it and refetches once,
+        so a newly connected repository is picked up immediately.
+        """
+        key = (repo_owner.lower(), repo_name.lower())
+        if self._source_map is None and self.source_cache is not None:
+            self._source_map = self.source_cache.load()
+            self._source_map_from_cache = self._source_map is not None
+
+        if self._source_map is not None and key in self._source_map:
+            return self._source_map[key]
+
+        if self._source_map is None or self._source_map_from_cache:
+            if self._source_map_from_cache:
+                print("Repository missing from cached Jules sources; refreshing.")
+                self.source_cache.invalidate()
+                self._sources_cache = None
+            self._source_map = self._build_source_map()
+            self._source_map_from_cache = False
+            if self.source_cache is not None:
+                self.source_cache.save(self._source_map)
+
+        return self._source_map.get(key)
+
+    def _build_source_map(self):
+        source_map = {}
+        for source in self.list_sources():
+            gh_repo = source.get("githubRepo", {})
+            owner = gh_repo.get("owner")
+            repo = gh_repo.get("repo")
+
+            if owner and repo:
+                source_map[(owner.lower(), repo.lower())] = source.get("name")
+        return source_map
+
+    def find_busy_session_for_source(self, source_name, slot_policy=None):
+        """Return the session that fills this source's last free slot, or None if one is free.
+
+        With the default single-slot policy this is the first non-terminal
+        session. Paging stops as soon as the answer is known.
+        """
+        return (slot_policy or SlotPolicy()).blocking_session(self.iter_sessions(source_name))
+
+    def build_session_index(self):
+        """List every active session once and index it by source."""
+        return SessionIndex(self.iter_sessions())
+
+    def create_session(self, source_name, prompt, title, verify=False):
+        """Create a new Jules session.
+
+        With ``verify`` the new session is read back once. Callers that need
+        to know when it actually starts should use ``wait_for_state`` instead.
+        """
         payload = {
             "prompt": prompt,
             "sourceContext": {
@@ -99,12 +622,17 @@ class JulesClient:
             "title": title,
         }
 
-        response = requests.post(url, headers=self.headers, json=payload)
-        response.raise_for_status()
-        session = response.json()
+        session = self._request(
+            "POST",
+            "sessions",
+            "sessions.create",
+            payload=payload,
+            replay_safe=False,
+            recover=lambda: self._find_created_session(source_name, title),
+        )
 
         session_id = session.get("name")
-        if session_id:
+        if verify and session_id:
             print(f"Verifying session {session_id}...")
             try:
                 self.get_session(session_id)
@@ -114,47 +642,223 @@ class JulesClient:
 
         return session
 
+    def _find_created_session(self, source_name, title):
+        """Look for a session that an ambiguous create_session call may have created."""
+        for session in self.iter_sessions(source_name):
+            if session.get("title") == title and is_session_busy(session):
+                print(f"Recovered session {session.get('name')} from an ambiguous create call.")
+                return session
+        return None
+
     def get_session(self, session_id):
         """Get session details."""
-        url = f"{JULES_API_BASE}/{session_id}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._request("GET", session_id, "sessions.get")
+
+    def wait_for_state(
+        self,
+        session_id,
+        target_states,
+        deadline,
+        initial_interval=WAIT_POLL_INITIAL_SECONDS,
+        max_interval=WAIT_POLL_MAX_SECONDS,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """Poll one session until its state is in ``target_states`` or ``deadline`` passes.
+
+        ``deadline`` is a ``clock()`` (by default ``time.monotonic()``)
+        timestamp. The poll interval doubles up to ``max_interval``. Returns
+        the matching session, or None on timeout.
+        """
+        found = self.wait_for_states(
+            [session_id],
+            target_states,
+            deadline,
+            initial_interval=initial_interval,
+            max_interval=max_interval,
+            clock=clock,
+            sleep=sleep,
+        )
+        return found.get(session_id)
+
+    def wait_for_states(
+        self,
+        session_ids,
+        target_states,
+        deadline,
+        initial_interval=WAIT_POLL_INITIAL_SECONDS,
+        max_interval=WAIT_POLL_MAX_SECONDS,
+        source_name=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """Poll many sessions until each reaches one of ``target_states`` or ``deadline`` passes.
+
+        A single session is read with ``get_session``; several are checked
+        with one session listing per round (filtered to ``source_name`` when
+        given). Returns ``{session_id: session}`` for those that got there.
+        """
+        targets = {state.upper() for state in target_states}
+        waiting = set(session_ids)
+        single = len(waiting) == 1
+        reached = {}
+        interval = initial_interval
+        while waiting:
+            if single:
+                sessions = [self.get_session(next(iter(waiting)))]
+            else:
+                sessions = self.iter_sessions(source_name)
+            for session in sessions:
+                name = session.get("name")
+                if name in waiting and str(session.get("state") or "").upper() in targets:
+                    reached[name] = session
+                    waiting.discard(name)
+            remaining = deadline - clock()
+            if not waiting or remaining <= 0:
+                break
+            sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+        return reached
+
+    def wait_for_state_async(self, session_id, target_states, deadline, **kwargs):
+        """Run ``wait_for_state`` on a daemon thread and return a Future for its result."""
+        from concurrent.futures import Future
+
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self.wait_for_state(session_id, target_states, deadline, **kwargs))
+            except Exception as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=run, name=f"wait-{session_id}", daemon=True).start()
+        return future
+
+    def iter_activity_pages(self, session_id, page_token=None, page_size=ACTIVITY_PAGE_SIZE):
+        """Yield ``(page_token, activities)`` for a session, starting at ``page_token``."""
+        while True:
+            params = {"pageSize": page_size}
+            if page_token:
+                params["pageToken"] = page_token
+            data = self._request("GET", f"{session_id}/activities", "activities.list", params=params)
+            yield page_token, data.get("activities", [])
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return
+
+    def list_activities_since(self, session_id, cursor):
+        """Return ``(new_activities, new_cursor)`` for activities after ``cursor``.
+
+        The cursor records the page holding the last mirrored activity, so a
+        poll re-reads that one page plus anything newer instead of the whole
+        history. If the API no longer accepts the stored page token, the
+        listing restarts from the beginning and the same cursor filters it.
+        """
+        cursor = dict(cursor or {})
+        last_time = cursor.get("last_time") or ""
+        seen = cursor.get("last_activity")
+        try:
+            pages = list(self.iter_activity_pages(session_id, cursor.get("page_token")))
+        except requests.HTTPError as exc:
+            if not cursor.get("page_token") or exc.response is None or exc.response.status_code != 400:
+                raise
+            pages = list(self.iter_activity_pages(session_id))
+
+        new_activities = []
+        for page_token, activities in pages:
+            for activity in activities:
+                created = activity.get("createTime") or ""
+                if activity.get("name") == seen or (last_time and created <= last_time):
+                    continue
+                new_activities.append(activity)
+                cursor.update(page_token=page_token, last_activity=activity.get("name"), last_time=created)
+        return new_activities, cursor
 
     def send_message(self, session_id, message):
         """Send a message to an existing Jules session."""
-        url = f"{JULES_API_BASE}/{session_id}:sendMessage"
         payload = {"prompt": message}
+        return self._request(
+            "POST", f"{session_id}:sendMessage", "sessions.sendMessage", payload=payload, replay_safe=False
+        )
 
-        response = requests.post(url, headers=self.headers, json=payload)
-        response.raise_for_status()
-        return response.json()
 
+_github = None
+_github_lock = threading.Lock()
+# Serializes the busy-slot check and session create across concurrent events.
+_session_start_lock = threading.Lock()
+# Serializes comment forwarding so two deliveries cannot send the same comments.
+_forward_lock = threading.Lock()
 
-def run_command(command):
-    """Run a shell command and return the output."""
-    try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as exc:
-        print(f"Error executing command: {command}")
-        print(f"Stderr: {exc.stderr}")
-        return None
 
+def get_github():
+    """Return the shared in-process GitHub client for this invocation."""
+    global _github
+    if _github is None:
+        with _github_lock:
+            if _github is None:
+                _github = github_api.GitHubAPI()
+    return _github
 
-def load_issue(issue_number, fields="title,body,number,comments"):
-    """Load issue data from GitHub via the CLI."""
-    output = run_command(["gh", "issue", "view", str(issue_number), "--json", fields])
-    if not output:
-        return None
 
+_repository_override = threading.local()
+
+
+def current_repository():
+    return getattr(_repository_override, "full_repo", None) or os.environ.get("GITHUB_REPOSITORY", "")
+
+
+@contextmanager
+def repository_context(full_repo):
+    """Point issue reads and comment writes on this thread at ``full_repo``."""
+    previous = getattr(_repository_override, "full_repo", None)
+    _repository_override.full_repo = full_repo
     try:
-        return json.loads(output)
-    except json.JSONDecodeError:
-        print(f"Error parsing issue JSON for #{issue_number}")
+        yield
+    finally:
+        _repository_override.full_repo = previous
+
+
+def run_graphql(query, **variables):
+    """Run a GraphQL query against GitHub and return its ``data`` object."""
+    try:
+        return get_github().graphql(query, variables)
+    except github_api.GitHubAPIError as exc:
+        print(f"GitHub GraphQL request failed: {exc}")
         return None
 
 
+def load_issue(issue_number):
+    """Load an issue with its title, body, author and every comment."""
+    owner, _, name = current_repository().partition("/")
+    issue = None
+    comments = []
+    cursor = None
+    while True:
+        data = run_graphql(
+            ISSUE_WITH_COMMENTS_QUERY, owner=owner, name=name, number=int(issue_number), cursor=cursor
+        )
+        page = ((data or {}).get("repository") or {}).get("issue")
+        if not page:
+            if issue is None:
+                print(f"Error: Could not load issue #{issue_number}")
+            return None
+
+        connection = page.pop("comments", None) or {}
+        comments.extend(node for node in connection.get("nodes") or [] if node)
+        issue = issue or page
+
+        page_info = connection.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            break
+        cursor = page_info.get("endCursor")
+
+    issue["comments"] = comments
+    return issue
+
+
 def get_event_data():
     """Read and parse the GitHub event data."""
     event_path = os.environ.get("GITHUB_EVENT_PATH")
@@ -177,33 +881,307 @@ def extract_session_id_from_comments(comments):
     return None
 
 
+class IssueSnapshot:
+    """One issue's title, body, author and comments, loaded with a single GraphQL query.
+
+    Marker queries are answered from memory. The snapshot only reloads after
+    ``mark_stale``, which ``post_issue_comment`` calls after our own writes.
+    """
+
+    def __init__(self, issue_number):
+        self.number = int(issue_number)
+        self._data = None
+        self._stale = True
+
+    def prime(self, data):
+        """Seed the snapshot from data fetched elsewhere, such as the queue scan."""
+        self._data = data
+        self._stale = False
+
+    def _load(self):
+        if self._stale:
+            self._data = load_issue(self.number)
+            self._stale = self._data is None
+        return self._data
+
+    def mark_stale(self):
+        self._stale = True
+
+    def as_issue(self):
+        data = self._load()
+        if not data:
+            return None
+        return {
+            "number": data.get("number", self.number),
+            "title": data.get("title"),
+            "body": data.get("body"),
+            "author_login": (data.get("author") or {}).get("login"),
+        }
+
+    def is_open(self):
+        data = self._load()
+        return bool(data) and str(data.get("state") or "OPEN").upper() == "OPEN"
+
+    def queue_entry(self):
+        """Return the fields that order this issue in the pending queue."""
+        data = self._load() or {}
+        return {
+            "priority": priority_rank(label_names(data)),
+            "created_at": data.get("createdAt") or "",
+        }
+
+    @property
+    def comments(self):
+        data = self._load()
+        return data.get("comments", []) if data else []
+
+    def session_id(self):
+        return extract_session_id_from_comments(self.comments)
+
+    def has_queue_comment(self):
+        return any(QUEUE_MARKER in comment.get("body", "") for comment in self.comments)
+
+
+_issue_snapshots = {}
+
+
+def issue_snapshot_key(issue_number):
+    return current_repository(), int(issue_number)
+
+
+def get_issue_snapshot(issue_number):
+    """Return the shared snapshot for an issue, creating it on first use."""
+    key = issue_snapshot_key(issue_number)
+    snapshot = _issue_snapshots.get(key)
+    if snapshot is None:
+        snapshot = _issue_snapshots[key] = IssueSnapshot(issue_number)
+    return snapshot
+
+
 def find_session_id(issue_number):
     """Find the Jules Session ID from the issue comments."""
-    issue = load_issue(issue_number, fields="comments")
-    if not issue:
-        return None
-    return extract_session_id_from_comments(issue.get("comments", []))
+    return get_issue_snapshot(issue_number).session_id()
 
 
 def issue_has_queue_comment(issue_number):
     """Check whether the issue already has a queue-status comment."""
-    issue = load_issue(issue_number, fields="comments")
-    if not issue:
-        return False
-
-    for comment in issue.get("comments", []):
-        if QUEUE_MARKER in comment.get("body", ""):
-            return True
-    return False
+    return get_issue_snapshot(issue_number).has_queue_comment()
 
 
 def post_issue_comment(issue_number, body):
     """Post a comment to an issue."""
-    return run_command(["gh", "issue", "comment", str(issue_number), "--body", body])
+    try:
+        result = get_github().post(
+            f"repos/{current_repository()}/issues/{issue_number}/comments", {"body": body}
+        )
+    except github_api.GitHubAPIError as exc:
+        print(f"Error posting comment on issue #{issue_number}: {exc}")
+        result = None
+    snapshot = _issue_snapshots.get(issue_snapshot_key(issue_number))
+    if snapshot is not None:
+        snapshot.mark_stale()
+    return result
+
+
+def label_names(issue):
+    return [node.get("name", "") for node in ((issue.get("labels") or {}).get("nodes") or []) if node]
+
+
+def priority_rank(labels):
+    """Rank an issue by its priority label; lower ranks are started first."""
+    ranks = [PRIORITY_LABEL_RANKS.get(re.sub(r"\s+", "", label.lower())) for label in labels]
+    return min((rank for rank in ranks if rank is not None), default=DEFAULT_PRIORITY_RANK)
+
+
+def is_queue_state_issue(issue):
+    return bool(QUEUE_STATE_PATTERN.search(issue.get("body") or ""))
+
+
+class PendingQueue:
+    """Heap of queued issues ordered by priority rank, then age, then retry count.
+
+    Push and pop are O(log n). Removing or re-pushing an issue leaves its old
+    heap entry behind; stale entries are skipped when they reach the top.
+    """
+
+    def __init__(self, entries=()):
+        self._heap = []
+        self._entries = {}
+        for entry in entries:
+            self.push(
+                entry["number"],
+                entry.get("priority", DEFAULT_PRIORITY_RANK),
+                entry.get("created_at", ""),
+                entry.get("retries", 0),
+            )
 
+    def push(self, number, priority=DEFAULT_PRIORITY_RANK, created_at="", retries=0):
+        entry = (priority, created_at, retries, int(number))
+        self._entries[entry[3]] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _discard_stale(self):
+        while self._heap and self._entries.get(self._heap[0][3]) != self._heap[0]:
+            heapq.heappop(self._heap)
+
+    def remove(self, number):
+        self._entries.pop(int(number), None)
+
+    def pop(self):
+        self._discard_stale()
+        if not self._heap:
+            return None
+        entry = heapq.heappop(self._heap)
+        del self._entries[entry[3]]
+        return self._as_dict(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, number):
+        return int(number) in self._entries
+
+    @staticmethod
+    def _as_dict(entry):
+        priority, created_at, retries, number = entry
+        return {"number": number, "priority": priority, "created_at": created_at, "retries": retries}
+
+    def to_state(self):
+        return {"version": 1, "entries": [self._as_dict(entry) for entry in sorted(self._entries.values())]}
+
+
+class QueueStore:
+    """The pending queue of one repo, kept as a JSON blob in a pinned, labelled tracking issue.
+
+    The serve daemon, the webhook receiver, run-agent and ``drain`` all write
+    the same issue, so ``save`` replays this store's changes onto whatever the
+    issue holds at the time rather than overwriting it.
+    """
+
+    def __init__(self, full_repo):
+        self.full_repo = full_repo
+        self.issue_number = None
+        self.issue_id = None
+        self.queue = None
+        self._saved_state = None
+        self._updated_at = None
+
+    def _fetch(self):
+        """Return ``(node_id, number, body, updated_at)`` of the tracking issue, or None."""
+        owner, name = self.full_repo.split("/")
+        data = run_graphql(QUEUE_STATE_QUERY, owner=owner, name=name, label=QUEUE_STATE_LABEL)
+        nodes = (((data or {}).get("repository") or {}).get("issues") or {}).get("nodes") or []
+        node = nodes[0] if nodes else None
+        return (node["id"], node["number"], node.get("body") or "", node.get("updatedAt")) if node else None
+
+    def _read(self):
+        """Fetch the tracking issue; return it with the queue state it holds, or ``(None, None)``."""
+        found = self._fetch()
+        if not found:
+            return None, None
+        match = QUEUE_STATE_PATTERN.search(found[2])
+        try:
+            state = json.loads(match.group(1)) if match else {}
+        except ValueError:
+            print(f"Ignoring unreadable queue state in issue #{found[1]}.")
+            state = {}
+        return found, PendingQueue(state.get("entries") or []).to_state()
+
+    def load(self):
+        if self.queue is not None:
+            return self.queue
+        found, state = self._read()
+        if found:
+            self.issue_id, self.issue_number, _, self._updated_at = found
+        self.queue = PendingQueue((state or {}).get("entries") or [])
+        self._saved_state = state
+        return self.queue
+
+    def _rebase(self, found, state):
+        """Apply this store's changes since it last read the issue on top of ``state``."""
+        base = {entry["number"]: entry for entry in (self._saved_state or {}).get("entries") or []}
+        local = {entry["number"]: entry for entry in self.queue.to_state()["entries"]}
+        remote = {entry["number"]: entry for entry in state["entries"]}
+        for number, entry in remote.items():
+            removed_here = number in base and number not in local
+            changed_here = number in local and local[number] != base.get(number)
+            if not removed_here and not changed_here:
+                self.queue.push(**entry)
+        for number, entry in local.items():
+            if number not in remote and entry == base.get(number):
+                # Another process started or dropped it.
+                self.queue.remove(number)
+        self.issue_id, self.issue_number, _, self._updated_at = found
+        self._saved_state = state
+
+    @property
+    def exists(self):
+        return self.issue_number is not None
+
+    def render(self, state):
+        lines = [
+            "This issue holds the Jules bridge's queue of pending issues and is updated automatically.",
+            "Leave it open and do not edit the hidden state below.",
+            "",
+        ]
+        for position, entry in enumerate(state["entries"], start=1):
+            retries = f", {entry['retries']} failed starts" if entry["retries"] else ""
+            lines.append(f"{position}. #{entry['number']} (priority {entry['priority']}{retries})")
+        if not state["entries"]:
+            lines.append("_The queue is empty._")
+        lines.extend(["", f"<!-- jules-queue-state\n{json.dumps(state, sort_keys=True)}\n-->"])
+        return "\n".join(lines)
+
+    def save(self):
+        """Write the queue back if it changed; failures are reported, not raised.
+
+        The issue is re-read first. When its ``updatedAt`` moved since this
+        store last read it, local changes are replayed onto the newer state
+        and the check repeats, so concurrent writers do not drop each
+        other's entries.
+        """
+        if self.queue is None or self.queue.to_state() == self._saved_state:
+            return
+        for _ in range(QUEUE_SAVE_ATTEMPTS):
+            found, state = self._read()
+            if found is None or (self.exists and found[3] == self._updated_at):
+                break
+            self._rebase(found, state)
+        state = self.queue.to_state()
+        if state == self._saved_state:
+            return
+        body = self.render(state)
+        try:
+            if self.exists:
+                updated = get_github().patch(f"repos/{self.full_repo}/issues/{self.issue_number}", {"body": body})
+            else:
+                updated = get_github().post(
+                    f"repos/{self.full_repo}/issues",
+                    {"title": QUEUE_STATE_TITLE, "body": body, "labels": [QUEUE_STATE_LABEL]},
+                )
+                self.issue_number, self.issue_id = updated.get("number"), updated.get("node_id")
+                if self.issue_id:
+                    run_graphql(PIN_ISSUE_MUTATION, issueId=self.issue_id)
+        except github_api.GitHubAPIError as exc:
+            print(f"Warning: could not save the Jules issue queue: {exc}")
+            return
+        self._saved_state = state
+        self._updated_at = (updated or {}).get("updated_at")
+
+
+def enqueue_issue(issue_number, queue_store=None):
+    """Add an issue to the persisted pending queue unless it is already there."""
+    store = queue_store or QueueStore(current_repository())
+    queue = store.load()
+    if issue_number in queue:
+        return
+    queue.push(issue_number, **get_issue_snapshot(issue_number).queue_entry())
+    store.save()
 
-def queue_issue(issue_number, busy_session):
-    """Leave a single queue comment when the repository already has an active session."""
+
+def queue_issue(issue_number, busy_session, queue_store=None):
+    """Queue an issue while the repository has no free slot, with a single queue comment."""
+    enqueue_issue(issue_number, queue_store)
     if issue_has_queue_comment(issue_number):
         print(f"Issue #{issue_number} is already marked as queued.")
         return
@@ -226,37 +1204,66 @@ def queue_issue(issue_number, busy_session):
     post_issue_comment(issue_number, "\n".join(comment_lines))
 
 
-def list_open_issues(full_repo):
-    """List open issues for the repository, oldest first."""
-    output = run_command(
-        [
-            "gh",
-            "api",
-            f"repos/{full_repo}/issues?state=open&sort=created&direction=asc&per_page=100",
-        ]
-    )
-    if not output:
-        return []
+def classify_issue_node(node):
+    """Summarize a GraphQL issue node, including its session and queue markers."""
+    comment_connection = node.get("comments") or {}
+    comments = comment_connection.get("nodes") or []
+    complete = comment_connection.get("totalCount", len(comments)) <= len(comments)
+    author_login = (node.get("author") or {}).get("login")
+
+    if complete:
+        get_issue_snapshot(node["number"]).prime(
+            {
+                "number": node["number"],
+                "title": node.get("title"),
+                "body": node.get("body"),
+                "state": "OPEN",
+                "createdAt": node.get("createdAt"),
+                "author": {"login": author_login},
+                "labels": node.get("labels"),
+                "comments": comments,
+            }
+        )
 
-    try:
-        issues = json.loads(output)
-    except json.JSONDecodeError:
-        print("Error parsing repository issues JSON")
-        return []
+    return {
+        "number": node["number"],
+        "title": node.get("title"),
+        "body": node.get("body"),
+        "author_login": author_login,
+        "session_id": extract_session_id_from_comments(comments),
+        "queued": any(QUEUE_MARKER in comment.get("body", "") for comment in comments),
+        "comments_truncated": not complete,
+        "priority": priority_rank(label_names(node)),
+        "created_at": node.get("createdAt") or "",
+        "queue_state": is_queue_state_issue(node),
+    }
 
-    if not isinstance(issues, list):
-        return []
 
-    return [
-        {
-            "number": issue.get("number"),
-            "title": issue.get("title"),
-            "body": issue.get("body"),
-            "author_login": issue.get("user", {}).get("login"),
-        }
-        for issue in issues
-        if "pull_request" not in issue
-    ]
+def iter_issue_queue(full_repo):
+    """Yield open issues oldest first, with markers classified, one GraphQL call per page."""
+    owner, name = full_repo.split("/")
+    cursor = None
+    while True:
+        data = run_graphql(
+            OPEN_ISSUES_WITH_COMMENTS_QUERY,
+            owner=owner,
+            name=name,
+            pageSize=QUEUE_SCAN_PAGE_SIZE,
+            commentLimit=QUEUE_SCAN_COMMENT_LIMIT,
+            cursor=cursor,
+        )
+        issues = ((data or {}).get("repository") or {}).get("issues")
+        if not issues:
+            return
+
+        for node in issues.get("nodes") or []:
+            if node and node.get("number"):
+                yield classify_issue_node(node)
+
+        page_info = issues.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return
+        cursor = page_info.get("endCursor")
 
 
 def is_repo_owner(login, repo_owner):
@@ -264,35 +1271,70 @@ def is_repo_owner(login, repo_owner):
     return bool(login) and login.lower() == repo_owner.lower()
 
 
-def find_next_pending_issue(full_repo, repo_owner):
-    """Return the oldest owner-authored open issue without a Jules session comment."""
-    for issue in list_open_issues(full_repo):
-        issue_number = issue.get("number")
-        if not issue_number:
+def iter_pending_issues(full_repo, repo_owner):
+    """Yield owner-authored open issues without a Jules session comment, oldest first."""
+    for issue in iter_issue_queue(full_repo):
+        issue_number = issue["number"]
+        if not is_repo_owner(issue.get("author_login"), repo_owner) or issue.get("queue_state"):
             continue
-        if not is_repo_owner(issue.get("author_login"), repo_owner):
-            continue
-        if find_session_id(issue_number):
+        session_id = issue.get("session_id")
+        if session_id is None and issue.get("comments_truncated"):
+            # The session comment may be older than the comments the scan fetched.
+            session_id = find_session_id(issue_number)
+        if session_id:
             continue
-        return {
+        yield {
             "number": issue_number,
             "title": issue.get("title"),
             "body": issue.get("body"),
             "author_login": issue.get("author_login"),
+            "priority": issue.get("priority", DEFAULT_PRIORITY_RANK),
+            "created_at": issue.get("created_at", ""),
         }
-    return None
+
+
+def find_next_pending_issue(full_repo, repo_owner):
+    """Return the oldest owner-authored open issue without a Jules session comment."""
+    return next(iter_pending_issues(full_repo, repo_owner), None)
 
 
 def get_issue_from_dispatch(issue_number):
     """Load title and body for a workflow-dispatched issue."""
     print(f"Fetching details for issue #{issue_number}")
-    issue_data = load_issue(issue_number, fields="title,body,number,author")
+    issue_data = get_issue_snapshot(issue_number).as_issue()
     if not issue_data:
         print(f"Error: Could not fetch details for issue #{issue_number}")
         return None
     return issue_data
 
 
+def event_skip_reason(event_name, event_data, repo_owner):
+    """Return why an event needs no work, or None; uses only the payload.
+
+    ``main`` runs this before anything touches the network or loads the HTTP
+    stack, so bot comments and other no-op deliveries exit in milliseconds.
+    """
+    if event_name not in ("issues", "issue_comment"):
+        return None
+    action = event_data.get("action")
+    if action not in ("opened", "created"):
+        return f"Skipping action: {action}"
+    issue = event_data.get("issue") or {}
+    if event_name == "issues":
+        author = (issue.get("user") or {}).get("login")
+        if not is_repo_owner(author, repo_owner):
+            return f"Ignoring issue #{issue.get('number')} from non-owner account: {author}"
+        return None
+    if issue.get("pull_request"):
+        return "Ignoring comment on pull request."
+    sender = (event_data.get("sender") or {}).get("login")
+    if sender and sender.endswith("[bot]"):
+        return "Ignoring comment from bot."
+    if not is_repo_owner(sender, repo_owner):
+        return f"Ignoring comment from non-owner account: {sender}"
+    return None
+
+
 def resolve_issue_for_event(event_name, event_data, full_repo, repo_owner):
     """Resolve the issue payload that should be handled for this invocation."""
     if event_name == "workflow_dispatch":
@@ -305,13 +1347,9 @@ def resolve_issue_for_event(event_name, event_data, full_repo, repo_owner):
         return "opened", get_issue_from_dispatch(issue_number)
 
     if event_name == "schedule":
+        # The hourly run drains the queue into every free slot, not one issue.
         print("Triggered by schedule")
-        pending_issue = find_next_pending_issue(full_repo, repo_owner)
-        if not pending_issue:
-            print("No queued issues without Jules sessions were found.")
-            return None, None
-        print(f"Selected queued issue #{pending_issue['number']} for processing.")
-        return "opened", pending_issue
+        return "drain", None
 
     action = event_data.get("action")
     if action not in ["opened", "created"]:
@@ -327,8 +1365,28 @@ def resolve_issue_for_event(event_name, event_data, full_repo, repo_owner):
     }
 
 
-def start_issue_session(client, issue_number, title, body, owner, repo_name, full_repo):
-    """Start a Jules session for an issue, or queue it when this repo is busy."""
+def start_issue_session(
+    client,
+    issue_number,
+    title,
+    body,
+    owner,
+    repo_name,
+    full_repo,
+    session_index=None,
+    slot_policy=None,
+    queue_store=None,
+):
+    """Start a Jules session for an issue, or queue it when this repo has no free slot.
+
+    Returns ``SESSION_CREATED``, ``SESSION_QUEUED``, ``SESSION_EXISTS`` or
+    ``SESSION_START_FAILED``; ``session_exit_code`` maps it to an exit code.
+
+    With a ``session_index`` the busy check is answered from that shared
+    listing instead of listing sessions again, and a newly created session is
+    added to it. ``slot_policy`` defaults to the environment's, and a queued
+    issue goes into ``queue_store`` when the caller already holds one.
+    """
     print(f"Processing New Issue #{issue_number}: {title} (Repo: {full_repo})")
 
     existing_session_id = find_session_id(issue_number)
@@ -336,7 +1394,7 @@ def start_issue_session(client, issue_number, title, body, owner, repo_name, ful
         print(
             f"Issue #{issue_number} already has a Jules session: {existing_session_id}"
         )
-        return 0
+        return SESSION_EXISTS
 
     try:
         print("Locating Jules Source...")
@@ -351,20 +1409,28 @@ def start_issue_session(client, issue_number, title, body, owner, repo_name, ful
                 f"is not connected to Jules."
             )
             post_issue_comment(issue_number, err_msg)
-            return 1
+            return SESSION_START_FAILED
 
-        busy_session = client.find_busy_session_for_source(source_name)
+        slot_policy = slot_policy or SlotPolicy.from_environment()
+        if session_index is not None:
+            busy_session = session_index.busy_session_for(source_name, slot_policy)
+        else:
+            busy_session = client.find_busy_session_for_source(source_name, slot_policy)
         if busy_session:
             print(
                 "Repository already has an active Jules session: "
                 f"{busy_session.get('name')} ({busy_session.get('state')})"
             )
-            queue_issue(issue_number, busy_session)
-            return 0
+            queue_issue(issue_number, busy_session, queue_store)
+            return SESSION_QUEUED
 
         print(f"Creating Session with Source: {source_name}")
         session = client.create_session(source_name, prompt=body or "", title=title)
         session_id = session.get("name")
+        if session_index is not None:
+            session_index.add(
+                {**session, "state": session.get("state") or "QUEUED", "sourceContext": {"source": source_name}}
+            )
 
         print(f"Session Created: {session_id}")
 
@@ -374,10 +1440,10 @@ def start_issue_session(client, issue_number, title, body, owner, repo_name, ful
             f"- **Session ID:** `{session_id}`\n"
             f"- **Prompt:** {title}\n\n"
             f"I will now analyze the codebase and generate a plan. "
-            f"(Note: Future updates will appear here automatically when implemented)."
+            f"Progress will be mirrored into a single status comment on this issue."
         )
         post_issue_comment(issue_number, comment_body)
-        return 0
+        return SESSION_CREATED
     except Exception as exc:
         print(f"An error occurred: {exc}")
         response_text = ""
@@ -389,12 +1455,342 @@ def start_issue_session(client, issue_number, title, body, owner, repo_name, ful
             issue_number,
             f"❌ An error occurred while starting Jules: {exc}{response_text}",
         )
-        return 1
+        return SESSION_START_FAILED
 
 
-def main():
-    print("Starting Jules Agent Bridge...")
+def session_exit_code(result):
+    return 1 if result == SESSION_START_FAILED else 0
+
+
+def next_poll_interval(busy_session, has_pending, fast=POLL_FAST_SECONDS, slow=POLL_SLOW_SECONDS):
+    """Pick the delay before the next slot check for `jules.py serve`."""
+    if busy_session is None:
+        # A free slot with work waiting is retried quickly (the start may have
+        # failed); with an empty queue only new issues can change anything.
+        return fast if has_pending else slow
+    state = str(busy_session.get("state") or "").upper()
+    return min(max(POLL_INTERVALS_BY_STATE.get(state, fast), fast), slow)
+
 
+class BridgeDaemon:
+    """Keeps this repo's Jules slots busy by starting queued issues as soon as one frees up."""
+
+    def __init__(
+        self,
+        client,
+        full_repo,
+        fast_interval=POLL_FAST_SECONDS,
+        slow_interval=POLL_SLOW_SECONDS,
+        clock=time.monotonic,
+        slot_policy=None,
+    ):
+        self.client = client
+        self.slot_policy = slot_policy or SlotPolicy.from_environment()
+        self.full_repo = full_repo
+        self.owner, self.repo_name = full_repo.split("/")
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.clock = clock
+        self.queue_depth = 0
+        self.free_slots = self.slot_policy.max_sessions
+        self.slot_busy = False
+        self.slot_idle_seconds = 0.0
+        self.polls = 0
+        self.poll_errors = 0
+        self.sessions_started = 0
+        # Issues whose start failed are not retried until restart, so a broken
+        # issue does not collect an error comment on every poll.
+        self.failed_issues = set()
+        self.next_interval = fast_interval
+        self._last_poll = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _start_queued(self, free_slots):
+        """Start issues off the persisted queue; return ``(issue_number, result)`` pairs."""
+        # Every poll must see fresh comments, not what an earlier poll loaded.
+        _issue_snapshots.clear()
+        store = QueueStore(self.full_repo)
+        with repository_context(self.full_repo):
+            results = _drain_queue(
+                self.client, self.full_repo, None, self.slot_policy, free_slots, store=store, skip=self.failed_issues
+            )
+        self.failed_issues.update(number for number, result in results if result == SESSION_START_FAILED)
+        self._count_queued(store)
+        return results
+
+    def _count_queued(self, store):
+        queue = store.load()
+        self.queue_depth = len(queue) - sum(1 for number in self.failed_issues if number in queue)
+
+    def poll_once(self):
+        """Check the slots once, start queued issues into any free ones, and return the delay."""
+        now = self.clock()
+        with self._lock:
+            if self._last_poll is not None and not self.slot_busy and self.queue_depth:
+                # A slot sat free while issues were waiting since the last poll.
+                self.slot_idle_seconds += now - self._last_poll
+            self._last_poll = now
+            self.polls += 1
+
+        source_name = self.client.find_source_for_repo(self.owner, self.repo_name)
+        if not source_name:
+            raise RuntimeError(f"No Jules source found for {self.full_repo}")
+
+        sessions = [s for s in self.client.iter_sessions(source_name) if self.slot_policy.weight(s)]
+        free_slots = self.slot_policy.free_slots(sessions)
+        if free_slots:
+            for _, result in self._start_queued(free_slots):
+                if result == SESSION_CREATED:
+                    self.sessions_started += 1
+                    # Treat the new session as queued until a poll lists it.
+                    sessions.append({"state": "QUEUED"})
+        else:
+            # Issues keep queueing while every slot is busy; keep the gauge current.
+            self._count_queued(QueueStore(self.full_repo))
+
+        with self._lock:
+            self.free_slots = self.slot_policy.free_slots(sessions)
+            self.slot_busy = self.free_slots == 0
+            if sessions:
+                self.next_interval = min(
+                    next_poll_interval(session, False, self.fast_interval, self.slow_interval)
+                    for session in sessions
+                )
+            else:
+                self.next_interval = next_poll_interval(
+                    None, bool(self.queue_depth), self.fast_interval, self.slow_interval
+                )
+        return self.next_interval
+
+    def run(self):
+        print(f"Serving Jules bridge for {self.full_repo}")
+        while not self._stop.is_set():
+            try:
+                delay = self.poll_once()
+            except Exception as exc:
+                print(f"Poll failed: {exc}")
+                with self._lock:
+                    self.poll_errors += 1
+                delay = self.slow_interval
+            self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+
+    def metrics(self):
+        """Render the daemon's gauges and counters in Prometheus text format."""
+        with self._lock:
+            idle = self.slot_idle_seconds
+            if self._last_poll is not None and not self.slot_busy and self.queue_depth:
+                idle += self.clock() - self._last_poll
+            values = [
+                ("jules_bridge_queue_depth", "gauge", "Open issues waiting for a Jules session.", self.queue_depth),
+                ("jules_bridge_slot_busy", "gauge", "1 while every Jules slot is occupied.", int(self.slot_busy)),
+                ("jules_bridge_free_slots", "gauge", "Jules slots free at the last poll.", self.free_slots),
+                (
+                    "jules_bridge_slot_idle_seconds_total",
+                    "counter",
+                    "Time a slot sat free while issues were queued.",
+                    round(idle, 3),
+                ),
+                ("jules_bridge_poll_interval_seconds", "gauge", "Delay before the next poll.", self.next_interval),
+                ("jules_bridge_polls_total", "counter", "Slot checks made.", self.polls),
+                ("jules_bridge_poll_errors_total", "counter", "Slot checks that failed.", self.poll_errors),
+                ("jules_bridge_sessions_started_total", "counter", "Sessions started.", self.sessions_started),
+            ]
+        lines = []
+        for name, kind, help_text, value in values:
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(daemon, port, host="127.0.0.1"):
+    """Serve ``daemon.metrics()`` on ``/metrics`` from a background thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            return None
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = daemon.metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def verify_webhook_signature(secret, body, signature_header):
+    """Check GitHub's ``X-Hub-Signature-256`` header against the raw request body."""
+    if not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header)
+
+
+class WebhookReceiver:
+    """Handles signed GitHub issue webhooks in-process with one warm JulesClient.
+
+    Deliveries are acknowledged immediately and handed to a bounded worker
+    pool; when ``backlog`` events are already waiting, new ones get a 503 so
+    GitHub records the failed delivery instead of the process growing without
+    bound.
+    """
+
+    def __init__(
+        self,
+        client,
+        full_repo,
+        secret,
+        workers=DEFAULT_WEBHOOK_WORKERS,
+        backlog=DEFAULT_WEBHOOK_BACKLOG,
+    ):
+        self.client = client
+        self.full_repo = full_repo
+        self.secret = secret
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jules-webhook")
+        self._slots = threading.BoundedSemaphore(backlog)
+        self.events_handled = 0
+        self.events_failed = 0
+        self._lock = threading.Lock()
+
+    def handle_delivery(self, headers, body):
+        """Validate one delivery and queue it; return ``(status, message)`` for the response."""
+        if not verify_webhook_signature(self.secret, body, headers.get("X-Hub-Signature-256")):
+            return 401, "invalid signature"
+
+        event_name = headers.get("X-GitHub-Event")
+        if event_name == "ping":
+            return 200, "pong"
+        if event_name not in WEBHOOK_EVENTS:
+            return 202, f"ignored event {event_name}"
+
+        try:
+            event_data = json.loads(body)
+        except ValueError:
+            return 400, "invalid JSON payload"
+
+        repository = (event_data.get("repository") or {}).get("full_name") or ""
+        if repository.lower() != self.full_repo.lower():
+            return 202, f"ignored repository {repository}"
+        skip_reason = event_skip_reason(event_name, event_data, self.full_repo.split("/")[0])
+        if skip_reason:
+            return 202, skip_reason
+
+        if not self._slots.acquire(blocking=False):
+            return 503, "too many events in flight"
+        future = self.executor.submit(self._process, event_name, event_data)
+        future.add_done_callback(lambda _: self._slots.release())
+        return 202, "accepted"
+
+    def _process(self, event_name, event_data):
+        issue_number = (event_data.get("issue") or {}).get("number")
+        if issue_number is not None:
+            # Comments may have changed since an earlier event loaded this issue.
+            _issue_snapshots.pop(issue_snapshot_key(issue_number), None)
+        try:
+            exit_code = handle_event(self.client, event_name, event_data, self.full_repo)
+        except Exception as exc:
+            print(f"Error handling {event_name} event for issue #{issue_number}: {exc}")
+            exit_code = 1
+        with self._lock:
+            self.events_handled += 1
+            if exit_code:
+                self.events_failed += 1
+        return exit_code
+
+    def make_server(self, host, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        receiver = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                return None
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self.close_connection = True
+                    self._reply(400, "invalid Content-Length")
+                elif length > MAX_WEBHOOK_BODY_BYTES:
+                    # Refuse before reading so an oversized body is never buffered.
+                    self.close_connection = True
+                    self._reply(413, "payload too large")
+                else:
+                    self._reply(*receiver.handle_delivery(self.headers, self.rfile.read(length)))
+
+            def _reply(self, status, message):
+                body = message.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return ThreadingHTTPServer((host, port), WebhookHandler)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def serve_webhooks(argv):
+    parser = argparse.ArgumentParser(
+        prog="jules.py webhook", description="Receive GitHub issue webhooks and handle them in-process."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument(
+        "--port", type=int, default=int(os.environ.get(WEBHOOK_PORT_ENV) or DEFAULT_WEBHOOK_PORT)
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WEBHOOK_WORKERS)
+    args = parser.parse_args(argv)
+
+    jules_api_key = load_jules_api_key()
+    secret = os.environ.get(WEBHOOK_SECRET_ENV)
+    if not secret:
+        print(f"Error: {WEBHOOK_SECRET_ENV} is not set.")
+        return 1
+    full_repo = os.environ.get("GITHUB_REPOSITORY")
+    if not full_repo:
+        print("Error: GITHUB_REPOSITORY not set.")
+        return 1
+
+    client = JulesClient(
+        jules_api_key,
+        session=build_http_session(pool_maxsize=args.workers),
+        source_cache=SourceMapCache(default_cache_dir()),
+    )
+    receiver = WebhookReceiver(client, full_repo, secret, workers=args.workers)
+    server = receiver.make_server(args.host, args.port)
+    print(f"Listening for GitHub webhooks on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping webhook receiver.")
+    finally:
+        server.server_close()
+        receiver.close()
+        if _github is not None:
+            _github.close()
+    return 0
+
+
+def load_jules_api_key():
+    """Return the Jules API key, letting GITHUB_PAT stand in for a missing GitHub token."""
     jules_api_key = os.environ.get("GOOGLE_JULES_API")
     if not jules_api_key:
         print("Error: GOOGLE_JULES_API is not set.")
@@ -406,79 +1802,546 @@ def main():
         and "GITHUB_PAT" in os.environ
     ):
         os.environ["GITHUB_TOKEN"] = os.environ["GITHUB_PAT"]
+    return jules_api_key
 
-    event_data = get_event_data()
-    if not event_data:
-        print("No event data found. Exiting.")
-        sys.exit(1)
 
+def serve(argv):
+    parser = argparse.ArgumentParser(
+        prog="jules.py serve", description="Start queued issues as soon as the Jules slot frees up."
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.environ.get(METRICS_PORT_ENV) or DEFAULT_METRICS_PORT),
+        help="Port for the local /metrics endpoint (0 disables it)",
+    )
+    parser.add_argument("--fast-interval", type=float, default=POLL_FAST_SECONDS)
+    parser.add_argument("--slow-interval", type=float, default=POLL_SLOW_SECONDS)
+    args = parser.parse_args(argv)
+
+    jules_api_key = load_jules_api_key()
     full_repo = os.environ.get("GITHUB_REPOSITORY")
     if not full_repo:
         print("Error: GITHUB_REPOSITORY not set.")
-        sys.exit(1)
+        return 1
+
+    client = JulesClient(jules_api_key, source_cache=SourceMapCache(default_cache_dir()))
+    daemon = BridgeDaemon(client, full_repo, args.fast_interval, args.slow_interval)
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = start_metrics_server(daemon, args.metrics_port)
+        print(f"Metrics on http://127.0.0.1:{metrics_server.server_address[1]}/metrics")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("Stopping Jules bridge.")
+    finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if _github is not None:
+            _github.close()
+    return 0
+
+
+def summarize_activity(activity):
+    """Describe one Jules activity in a single line for the issue status comment."""
+    if "planGenerated" in activity:
+        steps = ((activity["planGenerated"] or {}).get("plan") or {}).get("steps") or []
+        return f"Plan generated ({len(steps)} steps)"
+    if "planApproved" in activity:
+        return "Plan approved"
+    if "progressUpdated" in activity:
+        progress = activity["progressUpdated"] or {}
+        return progress.get("title") or progress.get("description") or "Progress update"
+    if "agentMessaged" in activity:
+        message = (activity["agentMessaged"] or {}).get("agentMessage") or ""
+        return "Jules: " + (message if len(message) <= 200 else message[:197] + "...")
+    if "userMessaged" in activity:
+        return "Message sent to Jules"
+    if "sessionCompleted" in activity:
+        return "Session completed"
+    if "sessionFailed" in activity:
+        reason = (activity["sessionFailed"] or {}).get("reason")
+        return f"Session failed: {reason}" if reason else "Session failed"
+    return activity.get("description") or "Activity"
+
+
+def find_status_comment(issue_number):
+    """Return the bridge's status comment on an issue, or None."""
+    for comment in get_issue_snapshot(issue_number).comments:
+        if ACTIVITY_STATUS_MARKER in (comment.get("body") or ""):
+            return comment
+    return None
+
+
+def parse_activity_cursor(body):
+    match = ACTIVITY_CURSOR_PATTERN.search(body or "")
+    if not match:
+        return {}
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return {}
+
+
+def render_status_comment(session, cursor):
+    state = session.get("state") or "UNKNOWN"
+    lines = [f"📡 **Jules status:** `{state}`", "", f"- **Session ID:** `{session.get('name')}`"]
+    if session.get("url"):
+        lines.append(f"- **Session URL:** {session['url']}")
+    history = cursor.get("history") or []
+    if history:
+        lines.extend(["", "**Recent activity**", ""])
+        lines.extend(f"- {line}" for line in history)
+    # Activity text is agent-supplied; escaping ">" keeps "-->" in it from
+    # closing the hidden comment early. JSON decodes the escape back.
+    encoded = json.dumps(cursor, sort_keys=True).replace(">", "\\u003e")
+    lines.extend(["", ACTIVITY_STATUS_MARKER, f"<!-- jules-activity-cursor {encoded} -->"])
+    return "\n".join(lines)
+
+
+def mirror_issue_activity(client, issue_number, session):
+    """Fold new activity for one session into its issue's status comment; return True if it changed."""
+    status_comment = find_status_comment(issue_number)
+    cursor = parse_activity_cursor(status_comment.get("body")) if status_comment else {}
+    if status_comment and session.get("updateTime") and cursor.get("update_time") == session.get("updateTime"):
+        return False
+
+    activities, cursor = client.list_activities_since(session["name"], cursor)
+    state_changed = cursor.get("state") != session.get("state")
+    if status_comment and not activities and not state_changed:
+        return False
 
+    history = (cursor.get("history") or []) + [summarize_activity(activity) for activity in activities]
+    cursor.update(
+        history=history[-ACTIVITY_HISTORY_LINES:],
+        state=session.get("state"),
+        update_time=session.get("updateTime"),
+    )
+    body = render_status_comment(session, cursor)
+    repo = current_repository()
+    try:
+        if status_comment and status_comment.get("databaseId"):
+            get_github().patch(f"repos/{repo}/issues/comments/{status_comment['databaseId']}", {"body": body})
+            get_issue_snapshot(issue_number).mark_stale()
+        else:
+            post_issue_comment(issue_number, body)
+    except github_api.GitHubAPIError as exc:
+        print(f"Error updating status comment on issue #{issue_number}: {exc}")
+        return False
+    return True
+
+
+def mirror_activity(client, full_repo, workers=DEFAULT_MIRROR_WORKERS):
+    """Mirror new session activity into one status comment per issue; return how many changed.
+
+    Sessions come from one listing for the repo's source and issues from one
+    queue scan; the per-session activity fetches run on ``workers`` threads.
+    """
     owner, repo_name = full_repo.split("/")
-    event_name = os.environ.get("GITHUB_EVENT_NAME")
-    action, issue_data = resolve_issue_for_event(
-        event_name, event_data, full_repo, owner
+    source_name = client.find_source_for_repo(owner, repo_name)
+    if not source_name:
+        print(f"{full_repo}: no Jules source found; nothing to mirror.")
+        return 0
+    sessions = {session.get("name"): session for session in client.iter_sessions(source_name)}
+    targets = []
+    with repository_context(full_repo):
+        for issue in iter_issue_queue(full_repo):
+            session_id = issue.get("session_id")
+            if session_id is None and issue.get("comments_truncated"):
+                session_id = find_session_id(issue["number"])
+            if session_id in sessions:
+                targets.append((issue["number"], sessions[session_id]))
+
+    def mirror(target):
+        with repository_context(full_repo):
+            try:
+                return mirror_issue_activity(client, *target)
+            except Exception as exc:
+                print(f"Error mirroring activity for issue #{target[0]}: {exc}")
+                return False
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="jules-mirror") as executor:
+        updated = sum(executor.map(mirror, targets))
+    print(f"{full_repo}: mirrored activity for {len(targets)} sessions, {updated} status comments updated.")
+    return updated
+
+
+def parse_repository_list(value):
+    """Split a comma- or whitespace-separated list of owner/name repositories."""
+    return [repo for repo in re.split(r"[\s,]+", value or "") if repo]
+
+
+def drain_repository(client, full_repo, session_index=None, slot_policy=None):
+    """Start queued issues for one repo until its free slots are used; return the failure count.
+
+    Issues come off the persisted queue in priority order; the open-issue scan
+    only runs when that queue is empty. Without a shared ``session_index`` the
+    repo's sessions are listed once here.
+    """
+    owner, repo_name = full_repo.split("/")
+    slot_policy = slot_policy or SlotPolicy.from_environment()
+    source_name = client.find_source_for_repo(owner, repo_name)
+    if not source_name:
+        print(f"{full_repo}: no Jules source found; is the Jules GitHub App installed?")
+        return 1
+    if session_index is None:
+        session_index = SessionIndex(client.iter_sessions(source_name))
+
+    free_slots = slot_policy.free_slots(session_index.sessions_for(source_name))
+    if not free_slots:
+        busy_session = session_index.busy_session_for(source_name, slot_policy)
+        print(f"{full_repo}: no free slot; busy with {busy_session.get('name')} ({busy_session.get('state')})")
+        return 0
+
+    with repository_context(full_repo):
+        results = _drain_queue(client, full_repo, session_index, slot_policy, free_slots)
+    return sum(1 for _, result in results if result == SESSION_START_FAILED)
+
+
+def _drain_queue(client, full_repo, session_index, slot_policy, free_slots, store=None, skip=()):
+    """Start up to ``free_slots`` issues off the persisted queue; return ``(issue_number, result)`` pairs.
+
+    Entries in ``skip`` stay queued without being started.
+    """
+    owner, repo_name = full_repo.split("/")
+    store = store or QueueStore(full_repo)
+    queue = store.load()
+    # The scan catches issues that never reached the queue: a lost write, or
+    # issues opened before the persisted queue existed.
+    for issue in iter_pending_issues(full_repo, owner):
+        if issue["number"] not in queue and issue["number"] not in skip:
+            queue.push(issue["number"], issue["priority"], issue["created_at"])
+
+    results = []
+    held = []
+    attempted = 0
+    try:
+        while attempted < free_slots:
+            entry = queue.pop()
+            if entry is None:
+                break
+            if entry["number"] in skip:
+                held.append(entry)
+                continue
+            snapshot = get_issue_snapshot(entry["number"])
+            issue = snapshot.as_issue()
+            if not issue or not snapshot.is_open() or snapshot.session_id():
+                print(f"{full_repo}: dropping #{entry['number']} from the queue; it is closed or already started.")
+                continue
+
+            attempted += 1
+            print(f"{full_repo}: starting queued issue #{issue['number']} ({attempted}/{free_slots} free slots)")
+            with _session_start_lock:
+                result = start_issue_session(
+                    client,
+                    issue["number"],
+                    issue.get("title"),
+                    issue.get("body"),
+                    owner,
+                    repo_name,
+                    full_repo,
+                    session_index=session_index,
+                    slot_policy=slot_policy,
+                    queue_store=store,
+                )
+            results.append((issue["number"], result))
+            if result == SESSION_START_FAILED and entry["retries"] + 1 < MAX_QUEUE_RETRIES:
+                queue.push(entry["number"], entry["priority"], entry["created_at"], entry["retries"] + 1)
+    finally:
+        for entry in held:
+            queue.push(entry["number"], entry["priority"], entry["created_at"], entry["retries"])
+        store.save()
+    if not attempted:
+        print(f"{full_repo}: no queued issues.")
+    return results
+
+
+def drain_repositories(client, repositories, slot_policy=None):
+    """Start pending issues in every listed repo, up to each repo's free slot count.
+
+    Sessions are listed once and the source map resolved once for the whole
+    pass, so Jules API calls stay flat as repositories are added. Returns the
+    number of failed starts.
+    """
+    slot_policy = slot_policy or SlotPolicy.from_environment()
+    session_index = client.build_session_index()
+    failures = 0
+    for full_repo in repositories:
+        with repository_context(full_repo):
+            failures += drain_repository(client, full_repo, session_index, slot_policy)
+    return failures
+
+
+def drain(argv):
+    parser = argparse.ArgumentParser(
+        prog="jules.py drain", description="Start queued issues across several repositories in one pass."
     )
-    if action is None:
-        sys.exit(0)
-    if not issue_data:
-        sys.exit(1)
+    parser.add_argument(
+        "repos",
+        nargs="*",
+        help=f"owner/name repositories (default: {REPOSITORIES_ENV}, comma- or space-separated)",
+    )
+    args = parser.parse_args(argv)
+    repositories = args.repos or parse_repository_list(os.environ.get(REPOSITORIES_ENV))
+    if not repositories:
+        print(f"Error: no repositories given. Pass them as arguments or set {REPOSITORIES_ENV}.")
+        return 1
 
-    issue_number = issue_data.get("number")
-    title = issue_data.get("title")
-    body = issue_data.get("body")
-    issue_author_login = issue_data.get("author_login")
+    jules_api_key = load_jules_api_key()
+    client = JulesClient(jules_api_key, source_cache=SourceMapCache(default_cache_dir()))
+    try:
+        failures = drain_repositories(client, repositories)
+    finally:
+        if client.latency.snapshot():
+            print("Jules API latency:")
+            print(client.latency.summary())
+        if _github is not None:
+            print(f"GitHub API: requests={_github.request_count}, {_github.cache_summary()}")
+            _github.close()
+    print(f"Summary: repositories={len(repositories)}, failures={failures}")
+    return 1 if failures else 0
+
+
+def forward_debounce_seconds():
+    try:
+        return max(0.0, float(os.environ.get(FORWARD_DEBOUNCE_ENV) or 0))
+    except ValueError:
+        return 0.0
 
-    client = JulesClient(jules_api_key)
 
-    if action == "created" and "comment" in event_data:
-        if event_data.get("issue", {}).get("pull_request"):
-            print("Ignoring comment on pull request.")
-            sys.exit(0)
+def is_bridge_comment(body):
+    """Return True for comments the bridge wrote itself, even under the owner's token."""
+    return (
+        any(marker in body for marker in (FORWARD_MARKER, QUEUE_MARKER, ACTIVITY_STATUS_MARKER))
+        or SESSION_ID_PATTERN.search(body) is not None
+    )
 
-        comment = event_data.get("comment", {})
-        comment_body = comment.get("body")
-        sender = event_data.get("sender", {}).get("login")
 
-        print(f"Processing Comment on Issue #{issue_number} by {sender}")
+def pending_owner_comments(comments, owner):
+    """Return ``(cursor_comment, cursor, pending)`` for an issue's comments.
 
-        if sender and sender.endswith("[bot]"):
-            print("Ignoring comment from bot.")
-            sys.exit(0)
+    ``pending`` holds the owner comments posted after the last forwarded one.
+    Without a cursor, the session-start comment marks where forwarding begins.
+    """
+    cursor_comment = None
+    cursor = {}
+    for comment in comments:
+        body = comment.get("body") or ""
+        if FORWARD_MARKER in body:
+            cursor_comment = comment
+            match = FORWARD_CURSOR_PATTERN.search(body)
+            if match:
+                try:
+                    cursor = json.loads(match.group(1))
+                except ValueError:
+                    cursor = {}
+
+    last_id = cursor.get("last_comment_id")
+    if last_id is None:
+        start = next(
+            (comment for comment in comments if SESSION_ID_PATTERN.search(comment.get("body") or "")), None
+        )
+        last_id = (start or {}).get("databaseId") or 0
+
+    pending = [
+        comment
+        for comment in comments
+        if (comment.get("databaseId") or 0) > last_id
+        and is_repo_owner((comment.get("author") or {}).get("login"), owner)
+        and not is_bridge_comment(comment.get("body") or "")
+    ]
+    return cursor_comment, cursor, pending
 
-        if not is_repo_owner(sender, owner):
-            print(f"Ignoring comment from non-owner account: {sender}")
-            sys.exit(0)
 
-        session_id = find_session_id(issue_number)
+def combine_comments(comments):
+    bodies = [(comment.get("body") or "").strip() for comment in comments]
+    if len(bodies) == 1:
+        return bodies[0]
+    parts = [f"The issue owner added {len(bodies)} comments:"]
+    parts.extend(f"--- Comment {index} ---\n{body}" for index, body in enumerate(bodies, 1))
+    return "\n\n".join(parts)
+
+
+def forward_owner_comments(client, issue_number, owner, debounce=None, sleep=time.sleep):
+    """Send every owner comment not yet forwarded as one message; return the exit code.
+
+    Waits ``debounce`` seconds first so a burst of comments lands in one
+    message. The id of the last forwarded comment is kept in a hidden marker,
+    so a later run for a comment that was already sent does nothing.
+    """
+    debounce = forward_debounce_seconds() if debounce is None else debounce
+    if debounce:
+        sleep(debounce)
+
+    with _forward_lock:
+        snapshot = get_issue_snapshot(issue_number)
+        snapshot.mark_stale()
+        session_id = snapshot.session_id()
         if not session_id:
             print("No active Jules session found for this issue.")
-            sys.exit(0)
+            return 0
 
-        print(f"Forwarding comment to Session: {session_id}")
+        cursor_comment, cursor, pending = pending_owner_comments(snapshot.comments, owner)
+        if not pending:
+            print("No new owner comments to forward; an earlier run already sent them.")
+            return 0
+
+        print(f"Forwarding {len(pending)} comment(s) to Session: {session_id}")
         try:
-            client.send_message(session_id, comment_body)
+            client.send_message(session_id, combine_comments(pending))
             print("Comment forwarded successfully.")
         except Exception as exc:
             print(f"Error forwarding comment: {exc}")
             if hasattr(exc, "response") and exc.response is not None:
                 print(f"Response Text: {exc.response.text}")
-            sys.exit(1)
+            return 1
+
+        last_id = max((comment.get("databaseId") or 0) for comment in pending)
+        if not last_id:
+            return 0
+        cursor.update(last_comment_id=last_id, forwarded=cursor.get("forwarded", 0) + len(pending))
+        body = (
+            f"📨 Forwarded {cursor['forwarded']} owner comment(s) to Jules session `{session_id}`.\n\n"
+            f"{FORWARD_MARKER}\n<!-- jules-forward-cursor {json.dumps(cursor, sort_keys=True)} -->"
+        )
+        if cursor_comment and cursor_comment.get("databaseId"):
+            try:
+                get_github().patch(
+                    f"repos/{current_repository()}/issues/comments/{cursor_comment['databaseId']}", {"body": body}
+                )
+            except github_api.GitHubAPIError as exc:
+                print(f"Error updating forward cursor on issue #{issue_number}: {exc}")
+            snapshot.mark_stale()
+        else:
+            post_issue_comment(issue_number, body)
+    return 0
+
+
+def mirror(argv):
+    parser = argparse.ArgumentParser(
+        prog="jules.py mirror", description="Mirror new Jules session activity into issue status comments."
+    )
+    parser.add_argument(
+        "repos",
+        nargs="*",
+        help=f"owner/name repositories (default: {REPOSITORIES_ENV}, or GITHUB_REPOSITORY)",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_MIRROR_WORKERS)
+    args = parser.parse_args(argv)
+    repositories = args.repos or parse_repository_list(
+        os.environ.get(REPOSITORIES_ENV) or os.environ.get("GITHUB_REPOSITORY")
+    )
+    if not repositories:
+        print(f"Error: no repositories given. Pass them as arguments or set {REPOSITORIES_ENV}.")
+        return 1
+
+    jules_api_key = load_jules_api_key()
+    client = JulesClient(jules_api_key, source_cache=SourceMapCache(default_cache_dir()))
+    failures = 0
+    try:
+        for full_repo in repositories:
+            try:
+                mirror_activity(client, full_repo, workers=args.workers)
+            except Exception as exc:
+                print(f"{full_repo}: error mirroring session activity: {exc}")
+                failures += 1
+    finally:
+        if client.latency.snapshot():
+            print("Jules API latency:")
+            print(client.latency.summary())
+        if _github is not None:
+            print(f"GitHub API: requests={_github.request_count}, {_github.cache_summary()}")
+            _github.close()
+    return 1 if failures else 0
+
+
+def handle_event(client, event_name, event_data, full_repo):
+    """Handle one GitHub event for this repo and return the process exit code."""
+    owner, repo_name = full_repo.split("/")
+    skip_reason = event_skip_reason(event_name, event_data, owner)
+    if skip_reason:
+        print(skip_reason)
+        return 0
+    action, issue_data = resolve_issue_for_event(
+        event_name, event_data, full_repo, owner
+    )
+    if action is None:
+        return 0
+    if action == "drain":
+        failures = drain_repository(client, full_repo)
+        try:
+            mirror_activity(client, full_repo)
+        except Exception as exc:
+            print(f"Error mirroring session activity: {exc}")
+        return 1 if failures else 0
+    if not issue_data:
+        return 1
+
+    issue_number = issue_data.get("number")
+    title = issue_data.get("title")
+    body = issue_data.get("body")
+
+    if action == "created" and "comment" in event_data:
+        sender = event_data.get("sender", {}).get("login")
+        print(f"Processing Comment on Issue #{issue_number} by {sender}")
+        return forward_owner_comments(client, issue_number, owner)
 
     if action == "opened":
-        if event_name == "issues" and not is_repo_owner(issue_author_login, owner):
-            print(
-                f"Ignoring issue #{issue_number} from non-owner account: {issue_author_login}"
-            )
-            sys.exit(0)
-        sys.exit(
-            start_issue_session(
-                client, issue_number, title, body, owner, repo_name, full_repo
+        if is_queue_state_issue(issue_data):
+            print(f"Issue #{issue_number} holds the Jules queue state; ignoring it.")
+            return 0
+        # Long-running modes handle events concurrently; the busy-slot check
+        # and the create must not interleave, or the repo gets two sessions.
+        with _session_start_lock:
+            return session_exit_code(
+                start_issue_session(client, issue_number, title, body, owner, repo_name, full_repo)
             )
-        )
+    return 0
+
+
+def main():
+    if sys.argv[1:2] == ["serve"]:
+        sys.exit(serve(sys.argv[2:]))
+    if sys.argv[1:2] == ["webhook"]:
+        sys.exit(serve_webhooks(sys.argv[2:]))
+    if sys.argv[1:2] == ["drain"]:
+        sys.exit(drain(sys.argv[2:]))
+    if sys.argv[1:2] == ["mirror"]:
+        sys.exit(mirror(sys.argv[2:]))
+
+    print("Starting Jules Agent Bridge...")
+
+    event_data = get_event_data()
+    if not event_data:
+        print("No event data found. Exiting.")
+        sys.exit(1)
+
+    full_repo = os.environ.get("GITHUB_REPOSITORY")
+    if not full_repo:
+        print("Error: GITHUB_REPOSITORY not set.")
+        sys.exit(1)
+
+    event_name = os.environ.get("GITHUB_EVENT_NAME")
+    skip_reason = event_skip_reason(event_name, event_data, full_repo.split("/")[0])
+    if skip_reason:
+        print(skip_reason)
+        sys.exit(0)
+
+    jules_api_key = load_jules_api_key()
+    client = JulesClient(jules_api_key, source_cache=SourceMapCache(default_cache_dir()))
+    try:
+        exit_code = handle_event(client, event_name, event_data, full_repo)
+    finally:
+        if client.latency.snapshot():
+            print("Jules API latency:")
+            print(client.latency.summary())
+        if _github is not None:
+            print(f"GitHub API: requests={_github.request_count}, {_github.cache_summary()}")
+            _github.close()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
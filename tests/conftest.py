@@ -0,0 +1,199 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class FakeGitHubServer:
+    """Local stand-in for the handful of GitHub endpoints the scripts use."""
+
+    def __init__(self, pr_count=0, issue_count=0, rate_limit=None):
+        self.prs = {
+            number: {
+                "number": number,
+                "title": f"PR {number}",
+                "url": f"https://example/pr/{number}",
+                "mergeable": "MERGEABLE",
+                "isDraft": False,
+                "state": "OPEN",
+            }
+            for number in range(1, pr_count + 1)
+        }
+        self.issues = [
+            {"number": 1000 + index, "title": f"Issue {index}", "body": ""} for index in range(issue_count)
+        ]
+        self.requests = []
+        self.not_modified = 0
+        # PR number -> how many more reads report its mergeability as UNKNOWN.
+        self.unknown_reads = {}
+        # Issue number -> comments, oldest first.
+        self.issue_comments = {}
+        # Shared by REST and GraphQL here; GitHub tracks them separately.
+        self.rate_limit = rate_limit
+        self.rate_remaining = rate_limit
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                return None
+
+            def _reply(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                if server.rate_limit is not None:
+                    server.rate_remaining -= 1
+                    headers = {
+                        **(headers or {}),
+                        "X-RateLimit-Limit": str(server.rate_limit),
+                        "X-RateLimit-Remaining": str(server.rate_remaining),
+                        "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                        "X-RateLimit-Resource": "graphql" if self.path == "/graphql" else "core",
+                    }
+                if self.command == "GET" and status == 200:
+                    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                    headers = {**(headers or {}), "ETag": etag}
+                    if self.headers.get("If-None-Match") == etag:
+                        server.not_modified += 1
+                        self.send_response(304)
+                        for name, value in headers.items():
+                            self.send_header(name, value)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                server.requests.append(("GET", self.path, self.headers.get("Authorization")))
+                self._reply(*server.handle_get(self.path))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                server.requests.append(("POST", self.path, self.headers.get("Authorization")))
+                self._reply(*server.handle_post(self.path, payload))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def handle_get(self, path):
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        if parsed.path == "/repos/owner/repo/pulls":
+            return 200, [{"number": number} for number in self.prs]
+        if parsed.path == "/repos/owner/repo/issues":
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            items = self.issues[(page - 1) * per_page : page * per_page]
+            headers = {}
+            if page * per_page < len(self.issues):
+                headers["Link"] = (
+                    f'<{self.base_url}/repos/owner/repo/issues?per_page={per_page}&page={page + 1}>; rel="next"'
+                )
+            return 200, items, headers
+        if parsed.path == "/repos/owner/repo":
+            return 200, {"default_branch": "main"}
+        return 404, {"message": "Not Found"}
+
+    def handle_post(self, path, payload):
+        if path != "/graphql":
+            return 404, {"message": "Not Found"}
+        variables = payload["variables"]
+        contexts = [{"__typename": "CheckRun", "name": "ci", "status": "IN_PROGRESS", "conclusion": None}]
+        rollup = {"statusCheckRollup": {"contexts": {"nodes": contexts}}}
+        if "pullRequests(" in payload["query"]:
+            offset = int(variables.get("cursor") or 0)
+            page = [self.read_pr(pr) for pr in list(self.prs.values())[offset : offset + variables["pageSize"]]]
+            end = offset + len(page)
+            connection = {
+                "pageInfo": {"hasNextPage": end < len(self.prs), "endCursor": str(end)},
+                "nodes": [{**pr, **rollup} for pr in page],
+            }
+            return 200, {"data": {"repository": {"pullRequests": connection}}}
+        aliases = re.findall(r"pr(\d+): pullRequest", payload["query"])
+        if aliases:
+            repository = {f"pr{n}": {"mergeable": self.read_pr(self.prs[int(n)])["mergeable"]} for n in aliases}
+            return 200, {"data": {"repository": repository}}
+        issue_aliases = re.findall(r"issue(\d+): issue", payload["query"])
+        if issue_aliases:
+            repository = {f"issue{n}": self.comments_page(int(n), None) for n in issue_aliases}
+            return 200, {"data": {"repository": repository}}
+        if "issue(number: $number)" in payload["query"]:
+            issue = self.comments_page(variables["number"], variables.get("cursor"))
+            return 200, {"data": {"repository": {"issue": issue}}}
+        pr = self.prs.get(variables.get("number"))
+        if "statusCheckRollup" in payload["query"]:
+            return 200, {"data": {"repository": {"pullRequest": rollup}}}
+        return 200, {"data": {"repository": {"pullRequest": pr}}}
+
+    def comments_page(self, issue_number, before):
+        comments = self.issue_comments.get(issue_number, [])
+        end = int(before) if before is not None else len(comments)
+        start = max(0, end - 100)
+        page_info = {"hasPreviousPage": start > 0, "startCursor": str(start)}
+        return {"comments": {"pageInfo": page_info, "nodes": comments[start:end]}}
+
+    def read_pr(self, pr):
+        remaining = self.unknown_reads.get(pr["number"], 0)
+        if not remaining:
+            return pr
+        self.unknown_reads[pr["number"]] = remaining - 1
+        return {**pr, "mergeable": "UNKNOWN"}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def github_server():
+    """Start ``FakeGitHubServer`` instances for one test and stop them afterwards."""
+    servers = []
+
+    def start(**kwargs):
+        server = FakeGitHubServer(**kwargs).__enter__()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
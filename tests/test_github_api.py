@@ -0,0 +1,253 @@
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import github_api
+
+
+def test_token_discovery_prefers_gh_token(monkeypatch):
+    monkeypatch.setenv("GH_TOKEN", "gh-token")
+    monkeypatch.setenv("GITHUB_TOKEN", "actions-token")
+    assert github_api.discover_token() == "gh-token"
+
+    monkeypatch.delenv("GH_TOKEN")
+    assert github_api.discover_token() == "actions-token"
+
+
+def test_graphql_endpoint_follows_enterprise_server_layout(monkeypatch):
+    monkeypatch.delenv("GITHUB_GRAPHQL_URL", raising=False)
+    enterprise = github_api.GitHubAPI(token="secret", base_url="https://ghe.example.com/api/v3")
+    assert enterprise.graphql_url == "https://ghe.example.com/api/graphql"
+    assert github_api.GitHubAPI(token="secret", base_url="https://api.github.com").graphql_path == "/graphql"
+
+    monkeypatch.setenv("GITHUB_API_URL", "https://ghe.example.com/api/v3")
+    monkeypatch.setenv("GITHUB_GRAPHQL_URL", "https://ghe.example.com/custom/graphql")
+    assert github_api.GitHubAPI(token="secret").graphql_path == "/custom/graphql"
+
+    ok = github_api.GitHubResponse(200, {}, b'{"data": {"viewer": {}}}')
+    with patch.object(enterprise.pool, "request", return_value=ok) as mock_request:
+        enterprise.graphql("query { viewer { login } }")
+    assert mock_request.call_args.args[:2] == ("POST", "/api/graphql")
+
+
+def test_requests_share_one_keep_alive_connection(github_server):
+    server = github_server()
+    api = github_api.GitHubAPI(token="secret", base_url=server.base_url)
+    for _ in range(20):
+        assert api.get("repos/owner/repo") == {"default_branch": "main"}
+
+    assert api.pool.connections_opened == 1
+    assert api.request_count == 20
+    assert all(auth == "Bearer secret" for _, _, auth in server.requests)
+
+
+def stale_connection():
+    connection = MagicMock()
+    connection.getresponse.side_effect = http.client.RemoteDisconnected("closed")
+    return connection
+
+
+def test_dropped_keep_alive_connection_replays_only_idempotent_requests():
+    pool = github_api.ConnectionPool("http://127.0.0.1:1")
+    fresh = MagicMock()
+    fresh.getresponse.return_value.status = 200
+    fresh.getresponse.return_value.read.return_value = b"{}"
+    fresh.getresponse.return_value.will_close = False
+    with patch.object(pool, "_new_connection", return_value=fresh):
+        pool._idle = [stale_connection()]
+        assert pool.request("GET", "/repos/owner/repo").status == 200
+
+        # The server may have created the issue before dropping the connection.
+        pool._idle = [stale_connection()]
+        with pytest.raises(http.client.RemoteDisconnected):
+            pool.request("POST", "/repos/owner/repo/issues", body=b"{}")
+
+    assert fresh.request.call_count == 1
+
+
+def test_error_status_raises_with_status_code(github_server):
+    server = github_server()
+    api = github_api.GitHubAPI(token="secret", base_url=server.base_url)
+    with pytest.raises(github_api.GitHubAPIError) as excinfo:
+        api.get("repos/owner/missing")
+
+    assert excinfo.value.status == 404
+    assert "Not Found" in str(excinfo.value)
+
+
+def test_paginate_follows_link_headers(github_server):
+    server = github_server(issue_count=250)
+    api = github_api.GitHubAPI(token="secret", base_url=server.base_url)
+    issues = list(api.paginate("repos/owner/repo/issues", params={"state": "open"}))
+
+    assert [issue["number"] for issue in issues] == list(range(1000, 1250))
+    assert len(server.requests) == 3
+
+
+def test_unchanged_listing_is_revalidated_from_disk_cache(tmp_path, github_server):
+    server = github_server(issue_count=150)
+    first = github_api.GitHubAPI(
+        token="secret", base_url=server.base_url, cache=github_api.ResponseCache(str(tmp_path))
+    )
+    original = list(first.paginate("repos/owner/repo/issues"))
+    first.close()
+
+    second = github_api.GitHubAPI(
+        token="secret", base_url=server.base_url, cache=github_api.ResponseCache(str(tmp_path))
+    )
+    replayed = list(second.paginate("repos/owner/repo/issues"))
+
+    assert replayed == original
+    assert (first.cache.hits, first.cache.misses) == (0, 2)
+    assert (second.cache.hits, second.cache.misses) == (2, 0)
+    assert server.not_modified == 2
+    assert second.cache_summary() == "cache_hits=2, cache_misses=0"
+
+
+def test_response_cache_counts_concurrent_hits_and_misses(tmp_path):
+    cache = github_api.ResponseCache(str(tmp_path))
+
+    def record():
+        for _ in range(500):
+            cache.record_hit()
+            cache.record_miss()
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (cache.hits, cache.misses) == (4000, 4000)
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    cache = github_api.ResponseCache(str(tmp_path), max_entries=2)
+    for name in ("a", "b"):
+        cache.store(f"/{name}", {"ETag": f'"{name}"'}, name.encode())
+    assert cache.lookup("/a") is not None
+    cache.store("/c", {"ETag": '"c"'}, b"c")
+    cache.save()
+
+    reloaded = github_api.ResponseCache(str(tmp_path), max_entries=2)
+    assert reloaded.lookup("/b") is None
+    assert reloaded.lookup("/a") == ({"ETag": '"a"'}, b"a")
+    assert reloaded.lookup("/c") == ({"ETag": '"c"'}, b"c")
+
+
+def test_recheck_queue_waits_once_per_batch(fake_clock):
+    clock = fake_clock
+    queue = github_api.RecheckQueue(delay=2, attempts=2, clock=clock, sleep=clock.sleep)
+    for number in (3, 1, 2):
+        assert queue.park(number, {"number": number})
+    clock.now += 0.5
+    assert queue.park(9, None)
+
+    assert [number for number, _, _ in queue.next_batch()] == [3, 1, 2]
+    assert clock.sleeps == [1.5]
+    assert queue.pending() == [9]
+    assert not queue.park(4, None, attempt=2)
+
+
+def budget_headers(remaining, limit=100, resource="core"):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": "5000",
+        "X-RateLimit-Resource": resource,
+    }
+
+
+def test_budget_reserves_headroom_for_writes():
+    budget = github_api.RateLimitBudget(fraction=0.8, write_reserve=0.1, clock=lambda: 1000, sleep=lambda _: None)
+    # The floor is 20 of 100 calls; reads must also leave 8 for writes.
+    budget.update(budget_headers(28))
+
+    with pytest.raises(github_api.BudgetExhausted) as excinfo:
+        budget.before_request("core", "low")
+    budget.before_request("core", "high")
+    assert excinfo.value.resource == "core"
+
+    # GraphQL is budgeted on its own.
+    budget.before_request("graphql", "low")
+
+
+def test_budget_paces_calls_when_headroom_is_small():
+    pauses = []
+    budget = github_api.RateLimitBudget(fraction=1.0, clock=lambda: 1000, sleep=pauses.append)
+    budget.update(budget_headers(6))
+
+    budget.before_request("core", "high")
+    budget.before_request("core", "high")
+
+    # 5 calls left over 4000s until the reset, capped at max_pause.
+    assert pauses == [budget.max_pause]
+    assert budget.remaining("core") == 4
+
+
+def test_budget_resets_after_the_window():
+    now = [1000]
+    budget = github_api.RateLimitBudget(clock=lambda: now[0], sleep=lambda _: None)
+    budget.update(budget_headers(0))
+    now[0] = 5000
+    budget.before_request("core", "low")
+
+
+def test_secondary_rate_limit_is_retried_after_short_wait():
+    first = github_api.GitHubResponse(403, {"Retry-After": "3"}, b'{"message": "secondary rate limit"}')
+    second = github_api.GitHubResponse(200, {}, b'{"ok": true}')
+    waits = []
+    api = github_api.GitHubAPI(
+        token="secret",
+        base_url="http://127.0.0.1:1",
+        cache=None,
+        budget=github_api.RateLimitBudget(sleep=waits.append),
+    )
+    with patch.object(api.pool, "request", side_effect=[first, second]) as mock_request:
+        assert api.post("repos/owner/repo/issues", {"title": "t"}) == {"ok": True}
+
+    assert waits == [3.0]
+    assert mock_request.call_count == 2
+
+
+def test_long_rate_limit_wait_raises_budget_exhausted():
+    limited = github_api.GitHubResponse(429, {"Retry-After": "600"}, b"{}")
+    api = github_api.GitHubAPI(token="secret", base_url="http://127.0.0.1:1", cache=None)
+    with patch.object(api.pool, "request", return_value=limited):
+        with pytest.raises(github_api.BudgetExhausted):
+            api.get("repos/owner/repo")
+
+
+def test_benchmark_pooled_client_against_process_per_call(github_server):
+    calls = 10
+    server = github_server()
+    url = f"{server.base_url}/repos/owner/repo"
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        # Mirrors the old `gh` pattern: a new process and a new connection per call.
+        subprocess.run(
+            [sys.executable, "-c", f"import urllib.request; urllib.request.urlopen({url!r}).read()"],
+            check=True,
+        )
+    process_per_call = time.perf_counter() - started
+
+    api = github_api.GitHubAPI(token="secret", base_url=server.base_url)
+    started = time.perf_counter()
+    for _ in range(calls):
+        api.get("repos/owner/repo")
+    pooled = time.perf_counter() - started
+
+    print(
+        f"{calls} GitHub calls: process-per-call {process_per_call * 1000:.1f}ms, "
+        f"pooled in-process {pooled * 1000:.1f}ms"
+    )
+    assert pooled < process_per_call
@@ -0,0 +1,219 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jules
+
+FULL_REPO = "owner/repo"
+SOURCE = "sources/github/owner/repo"
+
+
+def session_comment(session_id):
+    return {"databaseId": 1, "body": f"- **Session ID:** `{session_id}`", "author": {"login": "bot"}}
+
+
+class FakeGitHub:
+    """Open issues whose first comment names a Jules session; status comments are stored and edited."""
+
+    def __init__(self, issue_count):
+        self.comments = {number: [session_comment(f"sessions/{number}")] for number in range(1, issue_count + 1)}
+        self.posts = []
+        self.patches = []
+        self._next_id = 100
+
+    def graphql(self, query, variables):
+        if "issues(" in query:
+            nodes = [
+                {
+                    "number": number,
+                    "title": f"Issue {number}",
+                    "body": "body",
+                    "author": {"login": "owner"},
+                    "comments": {"totalCount": len(comments), "nodes": list(comments)},
+                }
+                for number, comments in self.comments.items()
+            ]
+            return {"repository": {"issues": {"pageInfo": {"hasNextPage": False}, "nodes": nodes}}}
+        number = variables["number"]
+        issue = {
+            "number": number,
+            "title": f"Issue {number}",
+            "body": "body",
+            "state": "OPEN",
+            "author": {"login": "owner"},
+            "comments": {"pageInfo": {"hasNextPage": False}, "nodes": list(self.comments[number])},
+        }
+        return {"repository": {"issue": issue}}
+
+    def post(self, path, body):
+        number = int(path.rsplit("/", 2)[-2])
+        self._next_id += 1
+        self.comments[number].append({"databaseId": self._next_id, "body": body["body"]})
+        self.posts.append(number)
+        return {"id": self._next_id}
+
+    def patch(self, path, body):
+        comment_id = int(path.rsplit("/", 1)[-1])
+        for comments in self.comments.values():
+            for comment in comments:
+                if comment["databaseId"] == comment_id:
+                    comment["body"] = body["body"]
+        self.patches.append(comment_id)
+        return {}
+
+    def status_comments(self, number):
+        return [c for c in self.comments[number] if jules.ACTIVITY_STATUS_MARKER in c["body"]]
+
+
+class FakeJulesAPI:
+    """Serves one session per issue and a paginated activity log for each."""
+
+    def __init__(self, session_count, page_size=2):
+        self.page_size = page_size
+        self.sessions = {
+            f"sessions/{number}": {
+                "name": f"sessions/{number}",
+                "state": "IN_PROGRESS",
+                "updateTime": "2026-01-01T00:00:00Z",
+                "sourceContext": {"source": SOURCE},
+            }
+            for number in range(1, session_count + 1)
+        }
+        self.activities = {name: [] for name in self.sessions}
+        self.calls = []
+        self.lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                return None
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path.split("/v1alpha/", 1)[1]
+                query = parse_qs(url.query)
+                with api.lock:
+                    api.calls.append((path, query.get("pageToken", [None])[0]))
+                if path == "sources":
+                    payload = {"sources": [{"name": SOURCE, "githubRepo": {"owner": "owner", "repo": "repo"}}]}
+                elif path == "sessions":
+                    payload = {"sessions": list(api.sessions.values())}
+                else:
+                    payload = api.activity_page(path.removesuffix("/activities"), query)
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def activity_page(self, session_id, query):
+        offset = int(query.get("pageToken", ["0"])[0])
+        activities = self.activities[session_id]
+        payload = {"activities": activities[offset : offset + self.page_size]}
+        if offset + self.page_size < len(activities):
+            payload["nextPageToken"] = str(offset + self.page_size)
+        return payload
+
+    def add_activity(self, session_id, minute, **kind):
+        activities = self.activities[session_id]
+        activities.append(
+            {"name": f"{session_id}/activities/{len(activities)}", "createTime": f"2026-01-01T00:{minute:02d}:00Z", **kind}
+        )
+        self.sessions[session_id]["updateTime"] = f"2026-01-01T00:{minute:02d}:00Z"
+
+    def activity_calls(self):
+        return [call for call in self.calls if call[0].endswith("/activities")]
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1alpha"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshots():
+    jules._issue_snapshots.clear()
+    yield
+    jules._issue_snapshots.clear()
+
+
+def test_mirror_keeps_one_status_comment_and_fetches_only_new_activity():
+    github = FakeGitHub(issue_count=1)
+    with FakeJulesAPI(session_count=1) as api, patch("jules.get_github", return_value=github):
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        for minute in range(1, 6):
+            api.add_activity("sessions/1", minute, progressUpdated={"title": f"Step {minute}"})
+
+        assert jules.mirror_activity(client, FULL_REPO) == 1
+        assert len(api.activity_calls()) == 3
+
+        api.add_activity("sessions/1", 6, planApproved={})
+        api.calls.clear()
+        jules._issue_snapshots.clear()
+        assert jules.mirror_activity(client, FULL_REPO) == 1
+
+    # The second pass resumed at the page holding the last mirrored activity.
+    assert api.activity_calls() == [("sessions/1/activities", "4")]
+    assert github.posts == [1] and len(github.patches) == 1
+    [status] = github.status_comments(1)
+    assert "Step 5" in status["body"] and "Plan approved" in status["body"]
+    assert status["body"].count("- Step 5\n") == 1
+    cursor = jules.parse_activity_cursor(status["body"])
+    assert cursor["last_activity"] == "sessions/1/activities/5"
+
+
+def test_mirror_skips_sessions_whose_update_time_is_unchanged():
+    github = FakeGitHub(issue_count=3)
+    with FakeJulesAPI(session_count=3) as api, patch("jules.get_github", return_value=github):
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        for name in api.sessions:
+            api.add_activity(name, 1, planGenerated={"plan": {"steps": [{}, {}]}})
+        assert jules.mirror_activity(client, FULL_REPO, workers=3) == 3
+
+        api.calls.clear()
+        jules._issue_snapshots.clear()
+        assert jules.mirror_activity(client, FULL_REPO, workers=3) == 0
+
+    assert api.activity_calls() == []
+    assert github.patches == []
+    assert all(len(github.status_comments(number)) == 1 for number in (1, 2, 3))
+    assert "Plan generated (2 steps)" in github.status_comments(2)[0]["body"]
+
+
+def test_summarize_activity():
+    assert jules.summarize_activity({"sessionCompleted": {}}) == "Session completed"
+    assert jules.summarize_activity({"sessionFailed": {"reason": "boom"}}) == "Session failed: boom"
+    assert jules.summarize_activity({"agentMessaged": {"agentMessage": "x" * 300}}).endswith("...")
+    assert jules.summarize_activity({"description": "Something"}) == "Something"
+
+
+def test_status_cursor_survives_comment_terminators_in_activity_text():
+    cursor = {"last_activity": "sessions/1/activities/3", "history": ["Ran `a --> b`", "then --!> c"]}
+    body = jules.render_status_comment({"name": "sessions/1", "state": "IN_PROGRESS"}, cursor)
+
+    hidden = body.split("<!-- jules-activity-cursor ", 1)[1]
+    assert hidden.count("-->") == 1 and hidden.endswith(" -->")
+    assert jules.parse_activity_cursor(body) == cursor
@@ -1,6 +1,9 @@
+import copy
 import os
 import sys
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -8,6 +11,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import jules
 
 
+@pytest.fixture(autouse=True)
+def clear_issue_snapshots(monkeypatch):
+    monkeypatch.setenv("GITHUB_REPOSITORY", "owner/repo")
+    jules._issue_snapshots.clear()
+    yield
+    jules._issue_snapshots.clear()
+
+
 def test_extract_session_id_from_comments():
     comments = [
         {"body": "No session here"},
@@ -24,9 +35,10 @@ def test_is_session_busy_only_for_non_terminal_states():
     assert not jules.is_session_busy({"state": "FAILED"})
 
 
+@patch("jules.enqueue_issue")
 @patch("jules.post_issue_comment")
 @patch("jules.issue_has_queue_comment", return_value=False)
-def test_queue_issue_posts_single_queue_comment(mock_has_queue_comment, mock_post_issue_comment):
+def test_queue_issue_posts_single_queue_comment(mock_has_queue_comment, mock_post_issue_comment, mock_enqueue):
     jules.queue_issue(
         42,
         {
@@ -37,29 +49,337 @@ def test_queue_issue_posts_single_queue_comment(mock_has_queue_comment, mock_pos
     )
 
     mock_has_queue_comment.assert_called_once_with(42)
+    mock_enqueue.assert_called_once_with(42, None)
     mock_post_issue_comment.assert_called_once()
     body = mock_post_issue_comment.call_args.args[1]
     assert "sessions/999" in body
     assert jules.QUEUE_MARKER in body
 
 
-@patch("jules.find_session_id", side_effect=["sessions/existing", None])
-@patch(
-    "jules.list_open_issues",
-    return_value=[
-        {"number": 1, "title": "Foreign issue", "body": "body", "author_login": "someone-else"},
-        {"number": 2, "title": "Has session", "body": "body", "author_login": "owner"},
-        {"number": 3, "title": "Next pending", "body": "body", "author_login": "owner"},
-    ],
-)
-def test_find_next_pending_issue_skips_issues_with_existing_sessions(mock_list_open_issues, mock_find_session_id):
-    issue = jules.find_next_pending_issue("owner/repo", "owner")
+def issue_node(number, author, comments=(), total_comments=None):
+    return {
+        "number": number,
+        "title": f"Issue {number}",
+        "body": "body",
+        "author": {"login": author},
+        "comments": {
+            "totalCount": len(comments) if total_comments is None else total_comments,
+            "nodes": [{"body": body} for body in comments],
+        },
+    }
+
+
+class FakeGraphQL:
+    """Serves pre-built GraphQL issue pages in place of the GitHub client."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def graphql(self, query, variables):
+        assert "issues(" in query
+        self.calls.append(variables)
+        index = len(self.calls) - 1
+        has_next = index + 1 < len(self.pages)
+        return {
+            "repository": {
+                "issues": {
+                    "pageInfo": {"hasNextPage": has_next, "endCursor": f"cursor-{index}"},
+                    "nodes": self.pages[index],
+                }
+            }
+        }
+
+
+def test_find_next_pending_issue_skips_issues_with_existing_sessions():
+    session_comment = "- **Session ID:** `sessions/existing`"
+    fake = FakeGraphQL(
+        [
+            [issue_node(1, "someone-else"), issue_node(2, "owner", [session_comment])],
+            [issue_node(3, "owner", ["<!-- jules-queue -->"]), issue_node(4, "owner")],
+        ]
+    )
+
+    with patch("jules.get_github", return_value=fake):
+        issue = jules.find_next_pending_issue("owner/repo", "owner")
 
     assert issue == {
         "number": 3,
-        "title": "Next pending",
+        "title": "Issue 3",
         "body": "body",
         "author_login": "owner",
+        "priority": jules.DEFAULT_PRIORITY_RANK,
+        "created_at": "",
+    }
+    assert len(fake.calls) == 2
+    assert fake.calls[1]["cursor"] == "cursor-0"
+
+
+def test_issue_queue_scan_costs_one_call_per_page():
+    session_comment = "- **Session ID:** `sessions/done`"
+    pages = [
+        [issue_node(page * 50 + index, "owner", [session_comment]) for index in range(1, 51)]
+        for page in range(4)
+    ]
+    fake = FakeGraphQL(pages)
+
+    with patch("jules.get_github", return_value=fake):
+        assert jules.find_next_pending_issue("owner/repo", "owner") is None
+
+    assert len(fake.calls) == 4
+
+
+def test_scan_primes_issue_snapshots_for_the_selected_issue():
+    fake = FakeGraphQL([[issue_node(7, "owner", ["<!-- jules-queue -->"])]])
+
+    with patch("jules.get_github", return_value=fake):
+        issue = jules.find_next_pending_issue("owner/repo", "owner")
+        assert issue["number"] == 7
+        assert jules.issue_has_queue_comment(7)
+        assert jules.find_session_id(7) is None
+
+    assert len(fake.calls) == 1
+
+
+@patch("jules.find_session_id", return_value="sessions/old")
+def test_truncated_comments_fall_back_to_full_issue_lookup(mock_find_session_id):
+    fake = FakeGraphQL([[issue_node(8, "owner", ["latest"], total_comments=150)]])
+
+    with patch("jules.get_github", return_value=fake):
+        assert jules.find_next_pending_issue("owner/repo", "owner") is None
+
+    mock_find_session_id.assert_called_once_with(8)
+
+
+class FakeGitHub:
+    """Stand-in GitHub client that serves one issue and records comment writes."""
+
+    def __init__(self, issue):
+        self.issue = issue
+        self.views = 0
+        self.comments_posted = []
+        self.comments_patched = []
+        self.queue_state = None
+        self.queue_writes = 0
+
+    def _write_queue_state(self, body):
+        self.queue_writes += 1
+        updated_at = f"2026-01-01T00:00:{self.queue_writes:02d}Z"
+        self.queue_state = {"id": "I_state", "number": 900, "body": body, "updatedAt": updated_at}
+        return {"number": 900, "node_id": "I_state", "updated_at": updated_at}
+
+    def graphql(self, query, variables):
+        if "pinIssue" in query:
+            return {}
+        if "labels: [$label]" in query:
+            nodes = [self.queue_state] if self.queue_state else []
+            return {"repository": {"issues": {"nodes": nodes}}}
+        assert "issue(number:" in query
+        assert variables["number"] == self.issue["number"]
+        self.views += 1
+        issue = copy.deepcopy(self.issue)
+        issue["comments"] = {
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "nodes": issue["comments"],
+        }
+        return {"repository": {"issue": issue}}
+
+    def post(self, path, body):
+        if path == "repos/owner/repo/issues":
+            return self._write_queue_state(body["body"])
+        assert path == f"repos/owner/repo/issues/{self.issue['number']}/comments"
+        self.comments_posted.append(body["body"])
+        comment_id = 1000 + len(self.comments_posted)
+        self.issue["comments"].append({"databaseId": comment_id, "body": body["body"], "author": {"login": "bot"}})
+        return {"id": comment_id}
+
+    def patch(self, path, body):
+        if "/issues/comments/" in path:
+            comment_id = int(path.rsplit("/", 1)[1])
+            for comment in self.issue["comments"]:
+                if comment.get("databaseId") == comment_id:
+                    comment["body"] = body["body"]
+            self.comments_patched.append(comment_id)
+            return {}
+        assert path == f"repos/owner/repo/issues/{self.queue_state['number']}"
+        return self._write_queue_state(body["body"])
+
+
+def make_issue(comments=None):
+    return {
+        "number": 42,
+        "title": "Add feature",
+        "body": "Please add it",
+        "author": {"login": "owner"},
+        "comments": comments or [],
+    }
+
+
+def test_dispatched_issue_that_gets_queued_loads_issue_once():
+    fake_gh = FakeGitHub(make_issue())
+    client = MagicMock()
+    client.find_source_for_repo.return_value = "sources/github/owner/repo"
+    client.find_busy_session_for_source.return_value = {"name": "sessions/busy", "state": "IN_PROGRESS"}
+
+    with patch("jules.get_github", return_value=fake_gh):
+        action, issue = jules.resolve_issue_for_event(
+            "workflow_dispatch", {"inputs": {"issue_number": "42"}}, "owner/repo", "owner"
+        )
+        result = jules.start_issue_session(
+            client, issue["number"], issue["title"], issue["body"], "owner", "repo", "owner/repo"
+        )
+
+    assert action == "opened"
+    assert issue["author_login"] == "owner"
+    assert result == jules.SESSION_QUEUED
+    assert jules.session_exit_code(result) == 0
+    assert fake_gh.views == 1
+    assert len(fake_gh.comments_posted) == 1
+    assert jules.QUEUE_MARKER in fake_gh.comments_posted[0]
+    assert '"number": 42' in fake_gh.queue_state["body"]
+
+
+def test_snapshot_refreshes_only_after_our_own_comment():
+    fake_gh = FakeGitHub(make_issue())
+
+    with patch("jules.get_github", return_value=fake_gh):
+        assert not jules.issue_has_queue_comment(42)
+        assert jules.find_session_id(42) is None
+        assert fake_gh.views == 1
+
+        jules.post_issue_comment(42, "🚀 **Jules Session Started!**\n- **Session ID:** `sessions/new`")
+
+        assert jules.find_session_id(42) == "sessions/new"
+        assert fake_gh.views == 2
+
+
+def test_handle_event_returns_exit_codes_instead_of_exiting():
+    client = MagicMock()
+    event = {
+        "action": "opened",
+        "issue": {"number": 5, "title": "t", "body": "b", "user": {"login": "stranger"}},
+    }
+    assert jules.handle_event(client, "issues", event, "owner/repo") == 0
+    assert jules.handle_event(client, "issues", {"action": "closed"}, "owner/repo") == 0
+    client.create_session.assert_not_called()
+
+
+@patch("jules.mirror_activity")
+@patch("jules.drain_repository", return_value=0)
+def test_schedule_event_drains_into_free_slots(mock_drain, mock_mirror):
+    client = MagicMock()
+    assert jules.handle_event(client, "schedule", {"schedule": "0 * * * *"}, "owner/repo") == 0
+    mock_drain.assert_called_once_with(client, "owner/repo")
+    mock_mirror.assert_called_once_with(client, "owner/repo")
+
+
+def test_pending_queue_orders_by_priority_age_and_retries():
+    queue = jules.PendingQueue()
+    queue.push(2, jules.DEFAULT_PRIORITY_RANK, "2026-01-02T00:00:00Z")
+    queue.push(3, jules.priority_rank(["Priority: High"]), "2026-01-03T00:00:00Z")
+    queue.push(4, jules.DEFAULT_PRIORITY_RANK, "2026-01-01T00:00:00Z", retries=1)
+    queue.push(2, jules.DEFAULT_PRIORITY_RANK, "2026-01-02T00:00:00Z", retries=2)
+
+    restored = jules.PendingQueue(queue.to_state()["entries"])
+
+    assert [restored.pop()["number"] for _ in range(len(restored))] == [3, 4, 2]
+    assert restored.pop() is None
+
+
+def test_queue_store_round_trips_through_tracking_issue():
+    fake_gh = FakeGitHub(make_issue())
+    with patch("jules.get_github", return_value=fake_gh):
+        store = jules.QueueStore("owner/repo")
+        store.load().push(7, 1, "2026-01-01T00:00:00Z")
+        store.save()
+
+        reloaded = jules.QueueStore("owner/repo")
+        assert reloaded.load().pop() == {"number": 7, "priority": 1, "created_at": "2026-01-01T00:00:00Z", "retries": 0}
+        reloaded.save()
+
+    assert reloaded.issue_number == 900
+    assert jules.is_queue_state_issue(fake_gh.queue_state)
+
+
+def test_concurrent_queue_saves_keep_each_others_changes():
+    fake_gh = FakeGitHub(make_issue())
+    with patch("jules.get_github", return_value=fake_gh):
+        seed = jules.QueueStore("owner/repo")
+        seed.load().push(1, 1, "2026-01-01T00:00:00Z")
+        seed.save()
+
+        # Both stores read the same state before either writes.
+        drain, webhook = jules.QueueStore("owner/repo"), jules.QueueStore("owner/repo")
+        assert drain.load().pop()["number"] == 1
+        webhook.load().push(2, 1, "2026-01-02T00:00:00Z")
+        drain.save()
+        webhook.save()
+
+        assert drain.issue_number == webhook.issue_number == 900
+        entries = jules.QueueStore("owner/repo").load().to_state()["entries"]
+
+    assert [entry["number"] for entry in entries] == [2]
+
+
+def owner_comment(comment_id, body):
+    return {"databaseId": comment_id, "body": body, "author": {"login": "owner"}}
+
+
+def comment_event(comment_id, body):
+    return {
+        "action": "created",
+        "issue": {"number": 42, "title": "Add feature", "body": "Please add it", "user": {"login": "owner"}},
+        "comment": {"id": comment_id, "body": body},
+        "sender": {"login": "owner"},
     }
-    mock_list_open_issues.assert_called_once_with("owner/repo")
-    assert mock_find_session_id.call_count == 2
+
+
+def test_comment_burst_is_forwarded_once_as_one_message():
+    fake_gh = FakeGitHub(
+        make_issue(
+            [
+                owner_comment(1, "Before the session started"),
+                {"databaseId": 2, "body": "- **Session ID:** `sessions/abc`", "author": {"login": "bot"}},
+                owner_comment(3, "Use the new API"),
+                owner_comment(4, "And add tests"),
+                {"databaseId": 5, "body": "+1", "author": {"login": "stranger"}},
+                owner_comment(6, "Also update the docs"),
+            ]
+        )
+    )
+    client = MagicMock()
+
+    with patch("jules.get_github", return_value=fake_gh):
+        # Three runs were triggered by the burst; only the first one forwards.
+        for comment_id in (3, 4, 6):
+            event = comment_event(comment_id, "ignored")
+            assert jules.handle_event(client, "issue_comment", event, "owner/repo") == 0
+
+        client.send_message.assert_called_once()
+        session_id, message = client.send_message.call_args.args
+        assert session_id == "sessions/abc"
+        assert "3 comments" in message
+        assert "Use the new API" in message and "Also update the docs" in message
+        assert "Before the session started" not in message and "+1" not in message
+        assert len(fake_gh.comments_posted) == 1 and jules.FORWARD_MARKER in fake_gh.comments_posted[0]
+
+        fake_gh.issue["comments"].append(owner_comment(2000, "One more thing"))
+        assert jules.handle_event(client, "issue_comment", comment_event(2000, "One more thing"), "owner/repo") == 0
+
+    assert client.send_message.call_args.args == ("sessions/abc", "One more thing")
+    # The cursor comment was edited in place rather than posting a second one.
+    assert len(fake_gh.comments_posted) == 1 and fake_gh.comments_patched == [1001]
+    [cursor_comment] = [c for c in fake_gh.issue["comments"] if jules.FORWARD_MARKER in c["body"]]
+    assert '"last_comment_id": 2000' in cursor_comment["body"]
+
+
+def test_forward_waits_for_the_debounce_before_gathering_comments():
+    fake_gh = FakeGitHub(make_issue([{"databaseId": 1, "body": "- **Session ID:** `sessions/abc`"}]))
+    client = MagicMock()
+    sleep = MagicMock(side_effect=lambda seconds: fake_gh.issue["comments"].append(owner_comment(2, "late")))
+
+    with patch("jules.get_github", return_value=fake_gh):
+        assert jules.forward_owner_comments(client, 42, "owner", debounce=5, sleep=sleep) == 0
+
+    sleep.assert_called_once_with(5)
+    client.send_message.assert_called_once_with("sessions/abc", "late")
@@ -1,12 +1,31 @@
 import unittest
 from unittest.mock import MagicMock
+import json
 import sys
 import os
+import tempfile
+import time
 
 # Add the root directory to sys.path so we can import jules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from jules import JulesClient
+import requests
+
+from jules import JulesClient, SourceMapCache
+
+
+def page(sessions, next_page_token=None):
+    response = MagicMock()
+    response.status_code = 200
+    payload = {"sessions": sessions}
+    if next_page_token:
+        payload["nextPageToken"] = next_page_token
+    response.json.return_value = payload
+    return response
+
+
+def session(name, state, source="sources/github/owner/repo"):
+    return {"name": name, "state": state, "sourceContext": {"source": source}}
 
 class TestJulesClient(unittest.TestCase):
     def test_find_source_for_repo(self):
@@ -62,24 +81,14 @@ class TestJulesClient(unittest.TestCase):
 
     def test_find_busy_session_for_source(self):
         client = JulesClient("fake_key")
-        client.list_sessions = MagicMock(
-            return_value=[
-                {
-                    "name": "sessions/completed",
-                    "state": "COMPLETED",
-                    "sourceContext": {"source": "sources/github/owner/repo"},
-                },
-                {
-                    "name": "sessions/busy",
-                    "state": "IN_PROGRESS",
-                    "sourceContext": {"source": "sources/github/owner/repo"},
-                },
-                {
-                    "name": "sessions/other",
-                    "state": "IN_PROGRESS",
-                    "sourceContext": {"source": "sources/github/other/repo"},
-                },
-            ]
+        client.session.request = MagicMock(
+            return_value=page(
+                [
+                    session("sessions/completed", "COMPLETED"),
+                    session("sessions/busy", "IN_PROGRESS"),
+                    session("sessions/other", "IN_PROGRESS", source="sources/github/other/repo"),
+                ]
+            )
         )
 
         self.assertEqual(
@@ -90,6 +99,110 @@ class TestJulesClient(unittest.TestCase):
                 "sourceContext": {"source": "sources/github/owner/repo"},
             },
         )
+        params = client.session.request.call_args.kwargs["params"]
+        self.assertEqual(
+            params["filter"],
+            'archived = false AND sourceContext.source = "sources/github/owner/repo"',
+        )
+
+    def test_find_busy_session_follows_pages_and_stops_at_first_match(self):
+        client = JulesClient("fake_key")
+        client.session.request = MagicMock(
+            side_effect=[
+                page([session("sessions/done", "COMPLETED")], next_page_token="p2"),
+                page([session("sessions/busy", "PLANNING")], next_page_token="p3"),
+                page([session("sessions/never", "QUEUED")]),
+            ]
+        )
+
+        busy = client.find_busy_session_for_source("sources/github/owner/repo")
+
+        self.assertEqual(busy["name"], "sessions/busy")
+        self.assertEqual(client.session.request.call_count, 2)
+        self.assertEqual(client.session.request.call_args.kwargs["params"]["pageToken"], "p2")
+
+    def test_iter_sessions_falls_back_to_client_side_source_filter(self):
+        client = JulesClient("fake_key")
+        rejected = MagicMock(status_code=400)
+        rejected.raise_for_status.side_effect = requests.HTTPError("bad filter", response=rejected)
+        client.session.request = MagicMock(
+            side_effect=[
+                rejected,
+                page(
+                    [
+                        session("sessions/other", "IN_PROGRESS", source="sources/github/other/repo"),
+                        session("sessions/mine", "IN_PROGRESS"),
+                    ]
+                ),
+            ]
+        )
+
+        sessions = list(client.iter_sessions("sources/github/owner/repo"))
+
+        self.assertEqual([item["name"] for item in sessions], ["sessions/mine"])
+        self.assertEqual(client.session.request.call_args.kwargs["params"]["filter"], "archived = false")
+        self.assertFalse(client._source_filter_supported)
+
+
+class TestSourceMapCache(unittest.TestCase):
+    SOURCES = [
+        {
+            "githubRepo": {"owner": "TestOwner", "repo": "TestRepo"},
+            "name": "sources/github/TestOwner/TestRepo",
+        }
+    ]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def make_client(self, sources=None):
+        client = JulesClient("fake_key", source_cache=SourceMapCache(self.tmpdir.name))
+        client.list_sources = MagicMock(return_value=sources if sources is not None else self.SOURCES)
+        return client
+
+    def test_second_run_skips_sources_call(self):
+        first = self.make_client()
+        self.assertEqual(first.find_source_for_repo("TestOwner", "TestRepo"), "sources/github/TestOwner/TestRepo")
+        first.list_sources.assert_called_once()
+
+        second = self.make_client()
+        self.assertEqual(second.find_source_for_repo("testowner", "testrepo"), "sources/github/TestOwner/TestRepo")
+        second.list_sources.assert_not_called()
+
+    def test_cache_miss_invalidates_and_refetches(self):
+        self.make_client().find_source_for_repo("TestOwner", "TestRepo")
+
+        newly_connected = self.SOURCES + [
+            {"githubRepo": {"owner": "TestOwner", "repo": "NewRepo"}, "name": "sources/github/TestOwner/NewRepo"}
+        ]
+        client = self.make_client(sources=newly_connected)
+
+        self.assertEqual(client.find_source_for_repo("TestOwner", "NewRepo"), "sources/github/TestOwner/NewRepo")
+        client.list_sources.assert_called_once()
+        self.assertIn(("testowner", "newrepo"), SourceMapCache(self.tmpdir.name).load())
+
+    def test_expired_cache_is_ignored(self):
+        cache = SourceMapCache(self.tmpdir.name, ttl_seconds=60)
+        with open(cache.path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"fetched_at": time.time() - 120, "sources": {"testowner/testrepo": "sources/stale"}},
+                handle,
+            )
+
+        self.assertIsNone(cache.load())
+
+        client = self.make_client()
+        client.source_cache = cache
+        self.assertEqual(client.find_source_for_repo("TestOwner", "TestRepo"), "sources/github/TestOwner/TestRepo")
+        client.list_sources.assert_called_once()
+
+    def test_corrupt_cache_is_ignored(self):
+        cache = SourceMapCache(self.tmpdir.name)
+        with open(cache.path, "w", encoding="utf-8") as handle:
+            handle.write("{not json")
+
+        self.assertIsNone(cache.load())
 
 if __name__ == '__main__':
     unittest.main()
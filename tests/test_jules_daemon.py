@@ -0,0 +1,247 @@
+import os
+import sys
+import urllib.request
+from unittest.mock import ANY, patch
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jules
+
+
+class FakeGitHub:
+    """Every issue is open with no comments; keeps the queue-state issue."""
+
+    def __init__(self):
+        self.queue_state = None
+
+    def graphql(self, query, variables):
+        if "pinIssue" in query:
+            return {}
+        if "labels: [$label]" in query:
+            return {"repository": {"issues": {"nodes": [self.queue_state] if self.queue_state else []}}}
+        issue = {
+            "number": variables["number"],
+            "title": f"Issue {variables['number']}",
+            "body": "body",
+            "state": "OPEN",
+            "author": {"login": "owner"},
+            "comments": {"pageInfo": {"hasNextPage": False}, "nodes": []},
+        }
+        return {"repository": {"issue": issue}}
+
+    def post(self, path, body):
+        self.queue_state = {"id": "I_queue", "number": 900, "body": body["body"]}
+        return {"number": 900, "node_id": "I_queue"}
+
+    def patch(self, path, body):
+        self.queue_state["body"] = body["body"]
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def fake_github():
+    jules._issue_snapshots.clear()
+    fake = FakeGitHub()
+    with patch("jules.get_github", return_value=fake):
+        yield fake
+    jules._issue_snapshots.clear()
+
+
+class FakeClient:
+    """Returns one queued listing per poll; an exhausted queue means no sessions."""
+
+    def __init__(self, listings):
+        self.listings = list(listings)
+        self.list_calls = 0
+
+    def find_source_for_repo(self, owner, repo_name):
+        return "sources/github/owner/repo"
+
+    def iter_sessions(self, source_name):
+        self.list_calls += 1
+        return iter(self.listings.pop(0) if self.listings else [])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def pending(*numbers):
+    return [
+        {
+            "number": n,
+            "title": f"Issue {n}",
+            "body": "body",
+            "author_login": "owner",
+            "priority": jules.DEFAULT_PRIORITY_RANK,
+            "created_at": f"2026-01-{n:02d}T00:00:00Z",
+        }
+        for n in numbers
+    ]
+
+
+def test_next_poll_interval_follows_session_state():
+    assert jules.next_poll_interval({"state": "IN_PROGRESS"}, False) == jules.POLL_FAST_SECONDS
+    assert jules.next_poll_interval({"state": "AWAITING_USER_FEEDBACK"}, True) == jules.POLL_SLOW_SECONDS
+    assert jules.next_poll_interval({"state": "PLANNING"}, False) == 60.0
+    assert jules.next_poll_interval(None, True) == jules.POLL_FAST_SECONDS
+    assert jules.next_poll_interval(None, False) == jules.POLL_SLOW_SECONDS
+
+
+@patch("jules.start_issue_session", return_value=0)
+@patch("jules.iter_pending_issues")
+def test_daemon_starts_next_issue_once_slot_frees(mock_pending, mock_start):
+    mock_pending.return_value = pending(7, 8)
+    client = FakeClient([[{"name": "sessions/1", "state": "IN_PROGRESS"}]])
+    clock = FakeClock()
+    daemon = jules.BridgeDaemon(client, "owner/repo", clock=clock, slot_policy=jules.SlotPolicy())
+
+    assert daemon.poll_once() == jules.POLL_FAST_SECONDS
+    mock_start.assert_not_called()
+    mock_pending.assert_not_called()
+
+    clock.now = 15.0
+    daemon.poll_once()
+
+    mock_start.assert_called_once_with(
+        client,
+        7,
+        "Issue 7",
+        "body",
+        "owner",
+        "repo",
+        "owner/repo",
+        session_index=None,
+        slot_policy=daemon.slot_policy,
+        queue_store=ANY,
+    )
+    assert daemon.sessions_started == 1
+    assert daemon.queue_depth == 1
+    assert daemon.slot_busy
+
+
+@patch("jules.start_issue_session", return_value=1)
+@patch("jules.iter_pending_issues")
+def test_daemon_does_not_retry_issue_that_failed_to_start(mock_pending, mock_start):
+    mock_pending.side_effect = lambda *args: iter(pending(7))
+    daemon = jules.BridgeDaemon(FakeClient([]), "owner/repo", clock=FakeClock(), slot_policy=jules.SlotPolicy())
+
+    daemon.poll_once()
+    assert daemon.poll_once() == jules.POLL_SLOW_SECONDS
+
+    mock_start.assert_called_once()
+    assert daemon.failed_issues == {7}
+    assert daemon.queue_depth == 0
+
+
+@patch("jules.start_issue_session", return_value=jules.SESSION_QUEUED)
+@patch("jules.iter_pending_issues")
+def test_daemon_does_not_count_a_queued_issue_as_started(mock_pending, mock_start):
+    mock_pending.side_effect = lambda *args: iter(pending(7))
+    daemon = jules.BridgeDaemon(FakeClient([]), "owner/repo", clock=FakeClock(), slot_policy=jules.SlotPolicy())
+
+    daemon.poll_once()
+
+    mock_start.assert_called_once()
+    assert daemon.sessions_started == 0
+    assert daemon.failed_issues == set()
+    assert "jules_bridge_sessions_started_total 0" in daemon.metrics()
+
+
+@patch("jules.start_issue_session", return_value=1)
+@patch("jules.iter_pending_issues")
+def test_metrics_endpoint_reports_queue_depth_and_slot_idle_time(mock_pending, mock_start):
+    mock_pending.side_effect = lambda *args: iter(pending(1, 2, 3))
+    clock = FakeClock()
+    daemon = jules.BridgeDaemon(FakeClient([]), "owner/repo", clock=clock, slot_policy=jules.SlotPolicy())
+    daemon.poll_once()
+    clock.now = 12.5
+
+    server = jules.start_metrics_server(daemon, 0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            text = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "jules_bridge_queue_depth 2" in text
+    assert "jules_bridge_slot_busy 0" in text
+    assert "jules_bridge_slot_idle_seconds_total 12.5" in text
+    assert "jules_bridge_free_slots 1" in text
+
+
+@patch("jules.start_issue_session", return_value=0)
+@patch("jules.iter_pending_issues")
+def test_daemon_starts_one_issue_per_free_slot(mock_pending, mock_start):
+    mock_pending.side_effect = lambda *args: iter(pending(1, 2, 3, 4))
+    listing = [{"name": "sessions/1", "state": "IN_PROGRESS"}]
+    daemon = jules.BridgeDaemon(
+        FakeClient([listing]), "owner/repo", clock=FakeClock(), slot_policy=jules.SlotPolicy(max_sessions=3)
+    )
+
+    assert daemon.poll_once() == jules.POLL_FAST_SECONDS
+
+    assert [call.args[1] for call in mock_start.call_args_list] == [1, 2]
+    assert daemon.free_slots == 0
+    assert daemon.queue_depth == 2
+
+
+@patch("jules.start_issue_session", return_value=0)
+@patch("jules.iter_pending_issues")
+def test_daemon_starts_issues_from_the_persisted_queue(mock_pending, mock_start):
+    store = jules.QueueStore("owner/repo")
+    store.load().push(5, jules.DEFAULT_PRIORITY_RANK, "2026-01-05T00:00:00Z")
+    store.save()
+    daemon = jules.BridgeDaemon(FakeClient([]), "owner/repo", clock=FakeClock(), slot_policy=jules.SlotPolicy())
+
+    daemon.poll_once()
+
+    assert [call.args[1] for call in mock_start.call_args_list] == [5]
+    assert daemon.sessions_started == 1
+    assert daemon.queue_depth == 0
+
+
+@patch("jules.start_issue_session")
+def test_queue_depth_tracks_the_queue_while_every_slot_is_busy(mock_start):
+    busy = [{"name": "sessions/1", "state": "IN_PROGRESS"}]
+    clock = FakeClock()
+    daemon = jules.BridgeDaemon(FakeClient([busy] * 3), "owner/repo", clock=clock, slot_policy=jules.SlotPolicy())
+    daemon.poll_once()
+    assert daemon.queue_depth == 0
+
+    for number in (5, 6):
+        # Run-agent queues new issues while the slot stays busy.
+        store = jules.QueueStore("owner/repo")
+        store.load().push(number, jules.DEFAULT_PRIORITY_RANK, f"2026-01-0{number}T00:00:00Z")
+        store.save()
+        clock.now += 15.0
+        daemon.poll_once()
+        assert daemon.queue_depth == number - 4
+
+    mock_start.assert_not_called()
+    assert "jules_bridge_queue_depth 2" in daemon.metrics()
+    assert daemon.slot_idle_seconds == 0
+
+
+def test_daemon_run_backs_off_after_poll_error():
+    daemon = jules.BridgeDaemon(FakeClient([]), "owner/repo", slow_interval=0.01)
+    calls = []
+
+    def failing_poll():
+        calls.append(1)
+        if len(calls) == 2:
+            daemon.stop()
+        raise RuntimeError("boom")
+
+    daemon.poll_once = failing_poll
+    daemon.run()
+
+    assert daemon.poll_errors == 2
@@ -0,0 +1,254 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jules
+
+
+class FakeGitHub:
+    """Every issue is open with no comments; keeps one queue-state issue per repo."""
+
+    def __init__(self):
+        self.queue_states = {}
+        self.comments_posted = []
+
+    def graphql(self, query, variables):
+        if "pinIssue" in query:
+            return {}
+        repo = f"{variables['owner']}/{variables['name']}"
+        if "labels: [$label]" in query:
+            state = self.queue_states.get(repo)
+            return {"repository": {"issues": {"nodes": [state] if state else []}}}
+        issue = {
+            "number": variables["number"],
+            "title": f"Issue {variables['number']}",
+            "body": "body",
+            "state": "OPEN",
+            "author": {"login": "owner"},
+            "comments": {"pageInfo": {"hasNextPage": False}, "nodes": []},
+        }
+        return {"repository": {"issue": issue}}
+
+    def post(self, path, body):
+        if path.endswith("/comments"):
+            self.comments_posted.append((path, body["body"]))
+            return {}
+        repo = path.removeprefix("repos/").removesuffix("/issues")
+        self.queue_states[repo] = {"id": f"I_{repo}", "number": 900, "body": body["body"]}
+        return {"number": 900, "node_id": f"I_{repo}"}
+
+    def patch(self, path, body):
+        repo = path.removeprefix("repos/").rsplit("/issues/", 1)[0]
+        self.queue_states[repo]["body"] = body["body"]
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def fake_github():
+    jules._issue_snapshots.clear()
+    fake = FakeGitHub()
+    with patch("jules.get_github", return_value=fake):
+        yield fake
+    jules._issue_snapshots.clear()
+
+
+def source_for(index):
+    return f"sources/github/owner/repo-{index}"
+
+
+class FakeJulesAPI:
+    """Jules API for many repos; every even-numbered repo has a busy session."""
+
+    def __init__(self, repo_count):
+        self.sources = [
+            {"name": source_for(index), "githubRepo": {"owner": "owner", "repo": f"repo-{index}"}}
+            for index in range(repo_count)
+        ]
+        self.sessions = [
+            {"name": f"sessions/busy-{index}", "state": "IN_PROGRESS", "sourceContext": {"source": source_for(index)}}
+            for index in range(0, repo_count, 2)
+        ]
+        self.calls = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                return None
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0].split("/v1alpha/", 1)[1]
+                api.calls.append(("GET", path))
+                if path == "sources":
+                    self._reply({"sources": api.sources})
+                elif path == "sessions":
+                    self._reply({"sessions": api.sessions})
+                else:
+                    self._reply({"name": path, "state": "QUEUED"})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                api.calls.append(("POST", "sessions"))
+                self._reply({"name": f"sessions/new-{len(api.calls)}", "title": payload["title"]})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1alpha"
+
+    def count(self, method, path):
+        return sum(1 for call in self.calls if call == (method, path))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def pending_issues(full_repo, repo_owner, count=1):
+    return iter(
+        {
+            "number": number,
+            "title": f"Work on {full_repo}",
+            "body": "body",
+            "author_login": repo_owner,
+            "priority": jules.DEFAULT_PRIORITY_RANK,
+            "created_at": f"2026-01-0{number}T00:00:00Z",
+        }
+        for number in range(1, count + 1)
+    )
+
+
+@pytest.mark.parametrize("repo_count", [4, 40])
+@patch("jules.iter_pending_issues", side_effect=pending_issues)
+def test_drain_lists_sessions_once_regardless_of_repo_count(mock_pending, fake_github, repo_count):
+    repositories = [f"owner/repo-{index}" for index in range(repo_count)]
+    with FakeJulesAPI(repo_count) as api:
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        failures = jules.drain_repositories(client, repositories)
+
+    assert failures == 0
+    assert api.count("GET", "sources") == 1
+    assert api.count("GET", "sessions") == 1
+    # Only repos with a free slot were scanned and started.
+    assert mock_pending.call_count == repo_count // 2
+    assert api.count("POST", "sessions") == repo_count // 2
+    assert len(fake_github.comments_posted) == repo_count // 2
+
+
+def test_session_index_blocks_a_second_start_for_the_same_repo(fake_github, monkeypatch):
+    monkeypatch.setenv("GITHUB_REPOSITORY", "owner/repo-1")
+    with FakeJulesAPI(repo_count=2) as api:
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        index = jules.SessionIndex()
+        for number in (1, 2):
+            jules.start_issue_session(
+                client, number, f"Issue {number}", "body", "owner", "repo-1", "owner/repo-1", session_index=index
+            )
+
+    assert api.count("POST", "sessions") == 1
+    assert api.count("GET", "sessions") == 0
+    assert index.busy_session_for(source_for(1))["state"] == "QUEUED"
+    path, queued_comment = fake_github.comments_posted[-1]
+    assert path == "repos/owner/repo-1/issues/2/comments" and jules.QUEUE_MARKER in queued_comment
+    assert '"number": 2' in fake_github.queue_states["owner/repo-1"]["body"]
+
+
+def test_repository_context_scopes_comment_target(monkeypatch):
+    monkeypatch.setenv("GITHUB_REPOSITORY", "owner/default")
+    with jules.repository_context("owner/other"):
+        assert jules.current_repository() == "owner/other"
+        assert jules.issue_snapshot_key(3) == ("owner/other", 3)
+    assert jules.current_repository() == "owner/default"
+
+
+def test_parse_repository_list():
+    assert jules.parse_repository_list("owner/a, owner/b\nowner/c") == ["owner/a", "owner/b", "owner/c"]
+    assert jules.parse_repository_list(None) == []
+
+
+@patch("jules.iter_pending_issues", side_effect=lambda repo, owner: pending_issues(repo, owner, count=5))
+def test_drain_fills_every_free_slot(_pending, fake_github):
+    with FakeJulesAPI(repo_count=1) as api:
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        # repo-0 already runs one session; parked sessions do not hold a slot.
+        api.sessions.append(
+            {"name": "sessions/parked", "state": "AWAITING_USER_FEEDBACK", "sourceContext": {"source": source_for(0)}}
+        )
+        policy = jules.SlotPolicy(max_sessions=3, weights={"AWAITING_USER_FEEDBACK": 0})
+        failures = jules.drain_repository(client, "owner/repo-0", slot_policy=policy)
+
+    assert failures == 0
+    assert api.count("GET", "sessions") == 1
+    assert api.count("POST", "sessions") == 2
+    assert [path for path, _ in fake_github.comments_posted] == [
+        "repos/owner/repo-0/issues/1/comments",
+        "repos/owner/repo-0/issues/2/comments",
+    ]
+    # The rest stay queued for the next run.
+    state = jules.QUEUE_STATE_PATTERN.search(fake_github.queue_states["owner/repo-0"]["body"]).group(1)
+    assert [entry["number"] for entry in json.loads(state)["entries"]] == [3, 4, 5]
+
+
+def test_slot_policy_counts_weighted_busy_sessions(monkeypatch):
+    monkeypatch.setenv(jules.MAX_SESSIONS_ENV, "2")
+    monkeypatch.setenv(jules.SLOT_WEIGHTS_ENV, "AWAITING_USER_FEEDBACK=0, PAUSED=0.5")
+    policy = jules.SlotPolicy.from_environment()
+    sessions = [
+        {"name": "a", "state": "AWAITING_USER_FEEDBACK"},
+        {"name": "b", "state": "PAUSED"},
+        {"name": "c", "state": "COMPLETED"},
+        {"name": "d", "state": "IN_PROGRESS"},
+    ]
+
+    assert policy.used_slots(sessions) == 1.5
+    assert policy.free_slots(sessions) == 1
+    assert policy.blocking_session(iter(sessions)) is None
+    assert policy.blocking_session(iter(sessions + [{"name": "e", "state": "QUEUED"}]))["name"] == "e"
+    assert jules.SlotPolicy().blocking_session(iter(sessions))["name"] == "a"
+
+
+@patch("jules.iter_pending_issues")
+def test_drain_takes_the_persisted_queue_head_and_requeues_missing_issues(mock_pending, fake_github):
+    # Issue 10 is pending but its queue write was lost to a concurrent save.
+    mock_pending.return_value = iter(
+        [{"number": 10, "priority": jules.DEFAULT_PRIORITY_RANK, "created_at": "2026-03-01T00:00:00Z"}]
+    )
+    store = jules.QueueStore("owner/repo-1")
+    queue = store.load()
+    queue.push(8, jules.DEFAULT_PRIORITY_RANK, "2026-01-01T00:00:00Z")
+    queue.push(9, jules.priority_rank(["priority:critical"]), "2026-02-01T00:00:00Z")
+    store.save()
+
+    with FakeJulesAPI(repo_count=2) as api:
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        with jules.repository_context("owner/repo-1"):
+            assert jules.drain_repository(client, "owner/repo-1", slot_policy=jules.SlotPolicy()) == 0
+
+    assert fake_github.comments_posted[0][0] == "repos/owner/repo-1/issues/9/comments"
+    assert '"number": 8' in fake_github.queue_states["owner/repo-1"]["body"]
+    assert '"number": 10' in fake_github.queue_states["owner/repo-1"]["body"]
+    assert '"number": 9' not in fake_github.queue_states["owner/repo-1"]["body"]
@@ -2,34 +2,41 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import threading
 
 # Add root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from jules import JulesClient, JULES_API_BASE
+import requests
+
+from jules import JulesClient, JULES_API_BASE, DEFAULT_TIMEOUT, LatencyHistogram
+
+
+def make_response(status_code, payload=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload if payload is not None else {}
+    response.headers = headers or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"HTTP {status_code}", response=response)
+    return response
 
 class TestJulesSession(unittest.TestCase):
     def setUp(self):
         self.client = JulesClient("fake_key")
 
-    @patch('requests.post')
-    @patch('requests.get')
-    def test_create_session(self, mock_get, mock_post):
-        # Mock create response
-        mock_create_response = MagicMock()
-        mock_create_response.json.return_value = {"name": "sessions/123"}
-        mock_create_response.status_code = 200
-
-        # Mock get response (verification)
-        mock_get_response = MagicMock()
-        mock_get_response.json.return_value = {"name": "sessions/123", "state": "running"}
-        mock_get_response.status_code = 200
-
-        mock_post.return_value = mock_create_response
-        mock_get.return_value = mock_get_response
+    def test_create_session(self):
+        # Mock create response, then the verification GET
+        mock_request = MagicMock(side_effect=[
+            make_response(200, {"name": "sessions/123"}),
+            make_response(200, {"name": "sessions/123", "state": "running"}),
+        ])
+        self.client.session.request = mock_request
 
         # Call method
-        session = self.client.create_session("sources/github/owner/repo", "Test Prompt", "Test Title")
+        session = self.client.create_session(
+            "sources/github/owner/repo", "Test Prompt", "Test Title", verify=True
+        )
 
         # Verify create call
         expected_url = f"{JULES_API_BASE}/sessions"
@@ -45,24 +52,21 @@ class TestJulesSession(unittest.TestCase):
             "title": "Test Title"
         }
 
-        mock_post.assert_called_with(expected_url, headers=self.client.headers, json=expected_payload)
+        create_call, get_call = mock_request.call_args_list
+        self.assertEqual(
+            create_call,
+            (("POST", expected_url), {"params": None, "json": expected_payload, "timeout": DEFAULT_TIMEOUT}),
+        )
 
-        # Verify get call (which will be added in Step 2)
-        # Note: If I run this test against current code, it will fail on this assertion if I uncomment it.
-        # But since I'm implementing TDD, I'll expect the get call.
-        # However, since I can't change code yet, I'll comment out the get assertion or accept failure?
-        # I'll include it.
+        # Verify get call
         expected_get_url = f"{JULES_API_BASE}/sessions/123"
-        mock_get.assert_called_with(expected_get_url, headers=self.client.headers)
+        self.assertEqual(get_call.args, ("GET", expected_get_url))
 
         self.assertEqual(session, {"name": "sessions/123"})
 
-    @patch('requests.post')
-    def test_send_message(self, mock_post):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {}
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+    def test_send_message(self):
+        mock_request = MagicMock(return_value=make_response(200, {}))
+        self.client.session.request = mock_request
 
         session_id = "sessions/123"
         message = "Hello"
@@ -75,7 +79,156 @@ class TestJulesSession(unittest.TestCase):
             "prompt": message
         }
 
-        mock_post.assert_called_with(expected_url, headers=self.client.headers, json=expected_payload)
+        mock_request.assert_called_with(
+            "POST", expected_url, params=None, json=expected_payload, timeout=DEFAULT_TIMEOUT
+        )
+
+    def test_api_key_header_is_set_on_pooled_session(self):
+        self.assertEqual(self.client.session.headers["x-goog-api-key"], "fake_key")
+
+    @patch('jules.time.sleep')
+    def test_get_retries_transient_errors_and_honours_retry_after(self, mock_sleep):
+        self.client.session.request = MagicMock(side_effect=[
+            make_response(503, headers={"Retry-After": "7"}),
+            requests.ConnectionError("reset"),
+            make_response(200, {"name": "sessions/123"}),
+        ])
+
+        self.assertEqual(self.client.get_session("sessions/123"), {"name": "sessions/123"})
+
+        self.assertEqual(self.client.session.request.call_count, 3)
+        self.assertGreaterEqual(mock_sleep.call_args_list[0].args[0], 7)
+        self.assertEqual(self.client.latency.snapshot()["sessions.get"]["count"], 3)
+
+    @patch('jules.time.sleep')
+    def test_get_gives_up_after_max_retries(self, mock_sleep):
+        self.client.max_retries = 2
+        self.client.session.request = MagicMock(return_value=make_response(502))
+
+        with self.assertRaises(requests.HTTPError):
+            self.client.get_session("sessions/123")
+
+        self.assertEqual(self.client.session.request.call_count, 3)
+
+    @patch('jules.time.sleep')
+    def test_send_message_is_not_replayed_after_ambiguous_failure(self, mock_sleep):
+        self.client.session.request = MagicMock(return_value=make_response(500))
+
+        with self.assertRaises(requests.HTTPError):
+            self.client.send_message("sessions/123", "Hello")
+
+        self.assertEqual(self.client.session.request.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @patch('jules.time.sleep')
+    def test_send_message_is_replayed_after_rate_limit(self, mock_sleep):
+        self.client.session.request = MagicMock(side_effect=[
+            make_response(429, headers={"Retry-After": "1"}),
+            make_response(200, {}),
+        ])
+
+        self.client.send_message("sessions/123", "Hello")
+
+        self.assertEqual(self.client.session.request.call_count, 2)
+
+    @patch('jules.time.sleep')
+    def test_create_session_recovers_session_created_by_ambiguous_post(self, mock_sleep):
+        created = {
+            "name": "sessions/landed",
+            "title": "Test Title",
+            "state": "QUEUED",
+            "sourceContext": {"source": "sources/github/owner/repo"},
+        }
+        self.client.session.request = MagicMock(side_effect=[
+            make_response(504),
+            make_response(200, {"sessions": [created]}),
+        ])
+
+        session = self.client.create_session("sources/github/owner/repo", "Test Prompt", "Test Title")
+
+        self.assertEqual(session, created)
+        methods = [call.args[0] for call in self.client.session.request.call_args_list]
+        self.assertEqual(methods, ["POST", "GET"])
+
+    def test_create_session_skips_verification_by_default(self):
+        self.client.session.request = MagicMock(return_value=make_response(200, {"name": "sessions/123"}))
+
+        session = self.client.create_session("sources/github/owner/repo", "Test Prompt", "Test Title")
+
+        self.assertEqual(session, {"name": "sessions/123"})
+        self.assertEqual(self.client.session.request.call_count, 1)
+
+    def test_wait_for_state_backs_off_until_target_state(self):
+        mock_sleep = MagicMock()
+        self.client.session.request = MagicMock(side_effect=[
+            make_response(200, {"name": "sessions/1", "state": "QUEUED"}),
+            make_response(200, {"name": "sessions/1", "state": "QUEUED"}),
+            make_response(200, {"name": "sessions/1", "state": "PLANNING"}),
+        ])
+
+        session = self.client.wait_for_state(
+            "sessions/1", {"PLANNING", "IN_PROGRESS"}, deadline=60.0, clock=lambda: 0.0, sleep=mock_sleep
+        )
+
+        self.assertEqual(session["state"], "PLANNING")
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [1.0, 2.0])
+
+    def test_wait_for_state_returns_none_at_deadline(self):
+        mock_sleep = MagicMock()
+        self.client.session.request = MagicMock(
+            return_value=make_response(200, {"name": "sessions/1", "state": "QUEUED"})
+        )
+        clock = iter([0.5, 2.0])
+        session = self.client.wait_for_state(
+            "sessions/1", {"IN_PROGRESS"}, deadline=1.5, clock=lambda: next(clock), sleep=mock_sleep
+        )
+
+        self.assertIsNone(session)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [1.0])
+
+    def test_wait_for_states_polls_many_sessions_with_one_listing(self):
+        def listing(*states):
+            sessions = [{"name": f"sessions/{i}", "state": state} for i, state in enumerate(states)]
+            return make_response(200, {"sessions": sessions})
+
+        self.client.session.request = MagicMock(side_effect=[
+            listing("QUEUED", "IN_PROGRESS", "QUEUED"),
+            listing("IN_PROGRESS", "IN_PROGRESS", "QUEUED"),
+            listing("IN_PROGRESS", "IN_PROGRESS", "COMPLETED"),
+        ])
+
+        reached = self.client.wait_for_states(
+            ["sessions/0", "sessions/1", "sessions/2"],
+            {"IN_PROGRESS", "COMPLETED"},
+            deadline=60.0,
+            clock=lambda: 0.0,
+            sleep=lambda _: None,
+        )
+
+        self.assertEqual(sorted(reached), ["sessions/0", "sessions/1", "sessions/2"])
+        self.assertEqual(self.client.session.request.call_count, 3)
+
+    def test_wait_for_state_async_returns_future(self):
+        self.client.session.request = MagicMock(
+            return_value=make_response(200, {"name": "sessions/1", "state": "IN_PROGRESS"})
+        )
+
+        future = self.client.wait_for_state_async("sessions/1", {"IN_PROGRESS"}, deadline=float("inf"))
+
+        self.assertEqual(future.result(timeout=5)["state"], "IN_PROGRESS")
+
+    def test_latency_histogram_counts_concurrent_records(self):
+        histogram = LatencyHistogram()
+        threads = [
+            threading.Thread(target=lambda: [histogram.record("sessions.get", 0.01) for _ in range(500)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(histogram.snapshot()["sessions.get"]["count"], 4000)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jules
+
+TOTAL_SESSIONS = 10_000
+TARGET_SOURCE = "sources/github/owner/repo"
+SOURCE_FILTER_PREFIX = 'sourceContext.source = "'
+
+
+def build_sessions():
+    sessions = []
+    for index in range(TOTAL_SESSIONS):
+        sessions.append(
+            {
+                "name": f"sessions/{index}",
+                "state": "COMPLETED" if index % 3 else "IN_PROGRESS",
+                "sourceContext": {"source": f"sources/github/other/repo-{index % 50}"},
+            }
+        )
+    # The only busy session for this repo sits deep in the global listing,
+    # well past the first page the old single-page listing looked at.
+    sessions[9_500] = {
+        "name": "sessions/target",
+        "state": "IN_PROGRESS",
+        "sourceContext": {"source": TARGET_SOURCE},
+    }
+    return sessions
+
+
+class FakeJulesAPI:
+    def __init__(self, supports_source_filter):
+        self.sessions = build_sessions()
+        self.supports_source_filter = supports_source_filter
+        self.requests = 0
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                return None
+
+            def do_GET(self):
+                api.requests += 1
+                query = parse_qs(urlparse(self.path).query)
+                status, payload = api.list_sessions(query)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1alpha"
+
+    def list_sessions(self, query):
+        page_size = int(query.get("pageSize", ["100"])[0])
+        offset = int(query.get("pageToken", ["0"])[0])
+        expression = query.get("filter", [""])[0]
+
+        matching = self.sessions
+        if SOURCE_FILTER_PREFIX in expression:
+            if not self.supports_source_filter:
+                return 400, {"error": {"message": "unsupported filter field"}}
+            source = expression.split(SOURCE_FILTER_PREFIX, 1)[1].split('"', 1)[0]
+            matching = [s for s in matching if s["sourceContext"]["source"] == source]
+
+        page = matching[offset : offset + page_size]
+        payload = {"sessions": page}
+        if offset + page_size < len(matching):
+            payload["nextPageToken"] = str(offset + page_size)
+        return 200, payload
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.mark.parametrize("supports_source_filter", [True, False])
+def test_find_busy_session_scans_all_pages_of_10k_sessions(supports_source_filter):
+    with FakeJulesAPI(supports_source_filter) as api:
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+
+        started = time.perf_counter()
+        busy = client.find_busy_session_for_source(TARGET_SOURCE)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert busy and busy["name"] == "sessions/target"
+    label = "server-side" if supports_source_filter else "client-side"
+    print(f"find_busy_session_for_source over {TOTAL_SESSIONS} sessions ({label} filter): "
+          f"{api.requests} requests in {elapsed_ms:.1f}ms")
+
+    if supports_source_filter:
+        assert api.requests == 1
+    else:
+        # One rejected filtered call, then pages up to and including the match.
+        assert api.requests == 1 + 9_500 // jules.SESSION_PAGE_SIZE + 1
+
+
+def test_find_busy_session_stops_paging_at_first_match():
+    with FakeJulesAPI(supports_source_filter=False) as api:
+        api.sessions[150] = {
+            "name": "sessions/early",
+            "state": "QUEUED",
+            "sourceContext": {"source": TARGET_SOURCE},
+        }
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        client._source_filter_supported = False
+
+        busy = client.find_busy_session_for_source(TARGET_SOURCE)
+
+    assert busy["name"] == "sessions/early"
+    assert api.requests == 2
@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+JULES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "jules.py"))
+# Modules that only a run which talks to an API should pay for.
+HEAVY_MODULES = {"requests", "urllib3", "github_api", "http.client", "http.server", "ssl"}
+# Import time spent after interpreter startup, before the event is decided.
+IMPORT_BUDGET_MS = 100
+
+OWNER_ISSUE = {"number": 7, "title": "t", "body": "b", "user": {"login": "owner"}}
+EVENTS = {
+    "issue opened by owner": ("issues", {"action": "opened", "issue": OWNER_ISSUE}, 1),
+    "issue opened by stranger": (
+        "issues",
+        {"action": "opened", "issue": {**OWNER_ISSUE, "user": {"login": "stranger"}}},
+        0,
+    ),
+    "issue closed": ("issues", {"action": "closed", "issue": OWNER_ISSUE}, 0),
+    "owner comment": ("issue_comment", {"action": "created", "issue": OWNER_ISSUE, "sender": {"login": "owner"}}, 1),
+    "bot comment": (
+        "issue_comment",
+        {"action": "created", "issue": OWNER_ISSUE, "sender": {"login": "github-actions[bot]"}},
+        0,
+    ),
+    "stranger comment": ("issue_comment", {"action": "created", "issue": OWNER_ISSUE, "sender": {"login": "x"}}, 0),
+    "pull request comment": (
+        "issue_comment",
+        {"action": "created", "issue": {**OWNER_ISSUE, "pull_request": {"url": "pr"}}, "sender": {"login": "owner"}},
+        0,
+    ),
+    "schedule": ("schedule", {"schedule": "0 * * * *"}, 1),
+}
+
+
+def parse_importtime(stderr):
+    """Return ``(modules, ms)`` imported after interpreter startup, from ``-X importtime`` output."""
+    modules = set()
+    top_level_us = 0
+    after_site = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if name == "site":
+            after_site = True
+            continue
+        if not after_site:
+            continue
+        modules.add(name)
+        if not line.rsplit("|", 1)[1].startswith("  "):
+            top_level_us += int(cumulative)
+    return modules, top_level_us / 1000
+
+
+def run_bridge(tmp_path, event_name, payload):
+    event_path = tmp_path / f"{event_name}.json"
+    event_path.write_text(json.dumps(payload))
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("GOOGLE_JULES_API", "GITHUB_TOKEN", "GH_TOKEN", "GITHUB_PAT")
+    }
+    env.update(GITHUB_EVENT_NAME=event_name, GITHUB_EVENT_PATH=str(event_path), GITHUB_REPOSITORY="owner/repo")
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", JULES_PATH], env=env, capture_output=True, text=True, timeout=60
+    )
+    return result, (time.perf_counter() - started) * 1000
+
+
+@pytest.mark.parametrize("label", list(EVENTS))
+def test_event_is_decided_before_the_http_stack_loads(tmp_path, label):
+    event_name, payload, expected_exit = EVENTS[label]
+    result, wall_ms = run_bridge(tmp_path, event_name, payload)
+    modules, import_ms = parse_importtime(result.stderr)
+    print(f"{label}: decided in {wall_ms:.1f}ms wall, {import_ms:.1f}ms of imports, {len(modules)} modules")
+
+    # Skipped events exit cleanly; events that need work get as far as the
+    # missing API key, which is the first step that needs credentials.
+    assert result.returncode == expected_exit, result.stdout
+    if expected_exit:
+        assert "GOOGLE_JULES_API is not set" in result.stdout
+    assert not modules & HEAVY_MODULES
+    assert import_ms < IMPORT_BUDGET_MS
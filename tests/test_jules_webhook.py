@@ -0,0 +1,237 @@
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jules
+
+SECRET = "webhook-secret"
+SOURCE = "sources/github/owner/repo"
+
+
+@pytest.fixture(autouse=True)
+def clear_issue_snapshots(monkeypatch):
+    monkeypatch.setenv("GITHUB_REPOSITORY", "owner/repo")
+    jules._issue_snapshots.clear()
+    yield
+    jules._issue_snapshots.clear()
+
+
+def sign(body, secret=SECRET):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def delivery_headers(event_name, body, secret=SECRET):
+    return {"X-GitHub-Event": event_name, "X-Hub-Signature-256": sign(body, secret)}
+
+
+def issue_opened_payload(number=42, author="owner", repository="owner/repo"):
+    return {
+        "action": "opened",
+        "repository": {"full_name": repository},
+        "issue": {"number": number, "title": "Add feature", "body": "Please add it", "user": {"login": author}},
+    }
+
+
+class FakeJulesAPI:
+    """Local Jules API with no sessions, recording created sessions."""
+
+    def __init__(self):
+        self.created = []
+        self.session_created = threading.Event()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                return None
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path.endswith("/sources"):
+                    self._reply({"sources": [{"name": SOURCE, "githubRepo": {"owner": "owner", "repo": "repo"}}]})
+                elif path.endswith("/sessions"):
+                    self._reply({"sessions": []})
+                else:
+                    self._reply({"name": path.split("/v1alpha/", 1)[1], "state": "QUEUED"})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                api.created.append(payload)
+                self._reply({"name": f"sessions/{len(api.created)}", "state": "QUEUED"})
+                api.session_created.set()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/v1alpha"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeGitHub:
+    """Serves issues without comments and records comment writes."""
+
+    def __init__(self):
+        self.comments_posted = []
+
+    def graphql(self, query, variables):
+        issue = {
+            "number": variables["number"],
+            "title": "Add feature",
+            "body": "Please add it",
+            "author": {"login": "owner"},
+            "comments": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": []},
+        }
+        return {"repository": {"issue": issue}}
+
+    def post(self, path, body):
+        self.comments_posted.append((path, body["body"]))
+        return {"id": len(self.comments_posted)}
+
+
+def test_verify_webhook_signature():
+    body = b'{"action": "opened"}'
+    assert jules.verify_webhook_signature(SECRET, body, sign(body))
+    assert not jules.verify_webhook_signature(SECRET, body, sign(body, "other"))
+    assert not jules.verify_webhook_signature(SECRET, body, None)
+    assert not jules.verify_webhook_signature(SECRET, body + b" ", sign(body))
+
+
+@patch("jules.handle_event")
+def test_receiver_rejects_bad_signatures_and_ignores_other_events(mock_handle_event):
+    receiver = jules.WebhookReceiver(object(), "owner/repo", SECRET)
+    body = json.dumps(issue_opened_payload()).encode()
+    try:
+        assert receiver.handle_delivery(delivery_headers("issues", body, "wrong"), body)[0] == 401
+        assert receiver.handle_delivery(delivery_headers("ping", b"{}"), b"{}") == (200, "pong")
+        assert receiver.handle_delivery(delivery_headers("push", b"{}"), b"{}")[0] == 202
+        other_repo = json.dumps(issue_opened_payload(repository="someone/else")).encode()
+        assert receiver.handle_delivery(delivery_headers("issues", other_repo), other_repo)[0] == 202
+    finally:
+        receiver.close()
+
+    mock_handle_event.assert_not_called()
+
+
+def test_receiver_returns_503_when_backlog_is_full():
+    release = threading.Event()
+    receiver = jules.WebhookReceiver(object(), "owner/repo", SECRET, workers=1, backlog=1)
+    body = json.dumps(issue_opened_payload()).encode()
+    with patch("jules.handle_event", side_effect=lambda *args: release.wait(5) and 0):
+        try:
+            assert receiver.handle_delivery(delivery_headers("issues", body), body) == (202, "accepted")
+            assert receiver.handle_delivery(delivery_headers("issues", body), body)[0] == 503
+        finally:
+            release.set()
+            receiver.close()
+
+    assert receiver.events_handled == 1
+
+
+def test_issue_opened_webhook_starts_session_within_one_second():
+    fake_gh = FakeGitHub()
+    with FakeJulesAPI() as api, patch("jules.get_github", return_value=fake_gh):
+        client = jules.JulesClient("fake_key", base_url=api.base_url)
+        receiver = jules.WebhookReceiver(client, "owner/repo", SECRET)
+        server = receiver.make_server("127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            # Warm the client the way a long-running receiver would be.
+            client.find_source_for_repo("owner", "repo")
+
+            body = json.dumps(issue_opened_payload()).encode()
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.server_address[1]}/",
+                data=body,
+                headers={**delivery_headers("issues", body), "Content-Type": "application/json"},
+            )
+            started = time.perf_counter()
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 202
+            assert api.session_created.wait(5)
+            latency = time.perf_counter() - started
+        finally:
+            server.shutdown()
+            server.server_close()
+            receiver.close()
+
+    print(f"webhook event to Jules session: {latency * 1000:.1f}ms")
+    assert latency < 1.0
+    assert api.created[0]["sourceContext"]["source"] == SOURCE
+    assert api.created[0]["title"] == "Add feature"
+    assert receiver.events_handled == 1
+    assert receiver.events_failed == 0
+    assert fake_gh.comments_posted[0][0] == "repos/owner/repo/issues/42/comments"
+
+
+def test_unsigned_delivery_over_http_is_rejected():
+    receiver = jules.WebhookReceiver(object(), "owner/repo", SECRET)
+    server = receiver.make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/",
+            data=b"{}",
+            headers={"X-GitHub-Event": "issues"},
+        )
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+    finally:
+        server.shutdown()
+        server.server_close()
+        receiver.close()
+
+    assert excinfo.value.code == 401
+
+
+def test_oversized_delivery_is_refused_before_reading_the_body():
+    receiver = jules.WebhookReceiver(object(), "owner/repo", SECRET)
+    server = receiver.make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    try:
+        # Only the headers are sent; a server that tried to read the body would time out.
+        connection.putrequest("POST", "/")
+        connection.putheader("X-GitHub-Event", "issues")
+        connection.putheader("Content-Length", str(jules.MAX_WEBHOOK_BODY_BYTES + 1))
+        connection.endheaders()
+        response = connection.getresponse()
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
+        receiver.close()
+
+    assert response.status == 413
@@ -1,5 +1,14 @@
+import os
+import sys
 from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import github_api
 
 
 MODULE_PATH = Path(__file__).resolve().parents[1] / ".github" / "scripts" / "reconcile_prs.py"
@@ -37,7 +46,7 @@ class FakeClient:
     def list_open_pr_numbers(self):
         return [self.pr["number"]]
 
-    def get_pr(self, pr_number):
+    def get_pr(self, pr_number, refresh=False):
         if pr_number != self.pr["number"]:
             return None
         return self.pr
@@ -62,6 +71,9 @@ class FakeClient:
     def get_issue_jules_state(self, issue_number):
         return self.issue_states.get(issue_number, reconcile_prs.IssueJulesState())
 
+    def load_issue_jules_states(self, issue_numbers):
+        return None
+
     def trigger_jules_session(self, issue_number):
         self.triggered_sessions.append(issue_number)
         return self.trigger_result
@@ -106,6 +118,40 @@ def test_waiting_checks_detects_non_terminal_states():
     assert [check["name"] for check in waiting] == ["queued", "running"]
 
 
+def check_run(name, conclusion, started_at):
+    return {
+        "__typename": "CheckRun",
+        "name": name,
+        "status": "COMPLETED",
+        "conclusion": conclusion,
+        "startedAt": started_at,
+        "checkSuite": {"workflowRun": {"workflow": {"name": "Verify Codebase"}}},
+    }
+
+
+def test_rerun_check_hides_failed_attempt_and_rollup_is_paged():
+    client = reconcile_prs.GitHubCLI("owner/repo", api=object())
+    first_page = {
+        "pageInfo": {"hasNextPage": True, "endCursor": "c1"},
+        "nodes": [
+            check_run("tests", "SUCCESS", "2026-01-01T00:10:00Z"),
+            check_run("tests", "FAILURE", "2026-01-01T00:00:00Z"),
+        ],
+    }
+    second_page = {
+        "pageInfo": {"hasNextPage": False, "endCursor": "c2"},
+        "nodes": [check_run("lint", "SUCCESS", "2026-01-01T00:00:00Z")],
+    }
+    client._pr_snapshot[7] = {"number": 7, "statusCheckRollup": {"contexts": first_page}}
+    rollup = {"repository": {"pullRequest": {"statusCheckRollup": {"contexts": second_page}}}}
+    with patch.object(client, "graphql", return_value=rollup) as mock_graphql:
+        checks = client.get_pr_checks(7)
+
+    mock_graphql.assert_called_once_with(reconcile_prs.PR_CHECKS_QUERY, number=7, cursor="c1")
+    assert [(check["name"], check["state"]) for check in checks] == [("tests", "SUCCESS"), ("lint", "SUCCESS")]
+    assert reconcile_prs.blocking_checks(checks) == []
+
+
 def test_conflicting_pr_creates_issue_and_triggers_jules():
     client = FakeClient(
         pr={
@@ -359,3 +405,295 @@ def test_closed_pr_canonical_automation_issue_is_closed_during_recovery():
     assert client.closed_issues == [
         (701, "Closing automatically because PR #71 is no longer open.")
     ]
+
+
+class FakeIssueAPI:
+    def __init__(self, issues):
+        self.issues = issues
+        self.listings = 0
+
+    def paginate(self, path, params=None, item_key=None):
+        self.listings += 1
+        yield from self.issues
+
+    def request_json(self, method, path, params=None, body=None):
+        return {"number": 500}
+
+    def post(self, path, body):
+        return {}
+
+    def patch(self, path, body):
+        return {}
+
+
+def test_issue_index_is_built_once_and_kept_current_by_writes():
+    api = FakeIssueAPI(
+        [
+            {"number": 10, "title": "CI Failure: PR #1", "body": ""},
+            {"number": 11, "title": "Tracking", "body": "<!-- pr-automation:pr=1 -->"},
+            {"number": 12, "title": "Merge Conflict: PR #2", "body": "<!-- pr-automation:pr=3 -->"},
+            {"number": 13, "title": "Unrelated", "body": ""},
+        ]
+    )
+    client = reconcile_prs.GitHubCLI("owner/repo", api=api)
+
+    assert client.find_open_issue_numbers_for_pr(1) == [10, 11]
+    assert client.find_open_issue_numbers_for_pr(2) == [12]
+    assert client.find_open_issue_numbers_for_pr(3) == [12]
+    assert [issue["number"] for issue in client.list_open_automation_issues()] == [10, 11, 12]
+
+    title = reconcile_prs.issue_title_for_pr(4)
+    assert client.create_issue(title, "<!-- pr-automation:pr=4 -->") == 500
+    assert client.find_open_issue_by_title(title) == 500
+    assert client.find_open_issue_numbers_for_pr(4) == [500]
+
+    assert client.close_issue(10, "done")
+    assert client.find_open_issue_numbers_for_pr(1) == [11]
+    assert client.find_open_issue_by_title("CI Failure: PR #1") is None
+    assert api.listings == 1
+
+
+class FakeCommitClient:
+    def __init__(self, prs_by_sha):
+        self.prs_by_sha = prs_by_sha
+
+    def open_pr_numbers_for_commit(self, sha):
+        return self.prs_by_sha.get(sha, [])
+
+
+def test_affected_pr_numbers_from_event_payloads():
+    client = FakeCommitClient({"abc": [7]})
+    affected = reconcile_prs.affected_pr_numbers
+
+    assert affected("pull_request", {"action": "synchronize", "pull_request": {"number": 3}}, client) == [3]
+    assert affected("pull_request", {"action": "labeled", "pull_request": {"number": 3}}, client) == []
+    suite = {"action": "completed", "check_suite": {"head_sha": "abc", "pull_requests": [{"number": 5}, {"number": 4}]}}
+    assert affected("check_suite", suite, client) == [4, 5]
+    # Fork PRs are missing from the payload and are looked up by head SHA.
+    fork_run = {"action": "completed", "check_run": {"pull_requests": [], "check_suite": {"head_sha": "abc"}}}
+    assert affected("check_run", fork_run, client) == [7]
+    assert affected("check_run", {"action": "created", "check_run": {}}, client) == []
+    assert affected("status", {"state": "success", "sha": "abc"}, client) == [7]
+    assert affected("status", {"state": "pending", "sha": "abc"}, client) == []
+    assert affected("schedule", {"schedule": "15 * * * *"}, client) is None
+
+
+def test_budget_exhausted_during_recheck_fetch_keeps_batch_parked():
+    client = FakeClient(pr={"number": 5, "state": "OPEN"}, checks=[])
+
+    def exhausted(pr_numbers):
+        raise reconcile_prs.BudgetExhausted("out of budget")
+
+    client.get_mergeable_states = exhausted
+    rechecks = reconcile_prs.RecheckQueue(delay=0, sleep=lambda _: None)
+    reconciler = reconcile_prs.PrReconciler(client, rechecks=rechecks)
+    rechecks.park(5, (client.pr, "evaluate"))
+    rechecks.park(6, ({"number": 6, "state": "OPEN"}, "evaluate"))
+
+    with pytest.raises(reconcile_prs.BudgetExhausted):
+        reconciler.process_rechecks()
+
+    assert rechecks.pending() == [5, 6]
+
+
+def test_unchanged_prs_count_as_processed_during_recovery():
+    pr = {"number": 21, "title": "Waiting PR", "url": "u", "mergeable": "MERGEABLE", "isDraft": False, "state": "OPEN"}
+    checks = [{"name": "ci", "state": "IN_PROGRESS"}]
+    client = FakeClient(pr=pr, checks=checks)
+    client.automation_issues = [{"number": 701, "title": "CI Failure: PR #21", "body": ""}]
+    state = reconcile_prs.ReconcileState()
+    state.record(
+        21,
+        reconcile_prs.pr_fingerprint(pr, "MERGEABLE", checks),
+        reconcile_prs.DECISION_WAITING,
+        reconcile_prs.datetime.now(reconcile_prs.timezone.utc) + reconcile_prs.timedelta(hours=1),
+    )
+
+    stats = reconcile_prs.PrReconciler(client, state=state).reconcile()
+
+    assert (stats.scanned, stats.unchanged) == (0, 1)
+    assert client.triggered_sessions == []
+
+
+def github_client(server, **api_kwargs):
+    """A ``GitHubCLI`` talking to the shared fake GitHub server."""
+    api = github_api.GitHubAPI(token="secret", base_url=server.base_url, **api_kwargs)
+    return reconcile_prs.GitHubCLI("owner/repo", api=api)
+
+
+def test_issue_lookups_stream_past_the_first_page_of_5000_issues(github_server):
+    server = github_server(issue_count=5000)
+    server.issues[4321]["title"] = reconcile_prs.issue_title_for_pr(7)
+    server.issues[10]["title"] = reconcile_prs.conflict_issue_title_for_pr(9)
+    client = github_client(server)
+
+    # An early match stops after the first page.
+    assert client.find_open_issue_by_title(reconcile_prs.conflict_issue_title_for_pr(9)) == 1010
+    assert len(server.requests) == 1
+
+    server.requests.clear()
+    assert sum(1 for _ in client.iter_open_issues()) == 5000
+    assert len(server.requests) == 50
+
+    server.requests.clear()
+    assert client.find_open_issue_numbers_for_pr(7) == [5321]
+    assert client.find_open_issue_by_title(reconcile_prs.issue_title_for_pr(7)) == 5321
+    # Both lookups share one full listing.
+    assert len(server.requests) == 50
+
+
+def test_reconcile_pass_over_50_prs_makes_no_subprocess_calls(github_server):
+    server = github_server(pr_count=50)
+    client = github_client(server)
+    with patch("subprocess.run", side_effect=AssertionError("subprocess call")) as mock_run:
+        stats = reconcile_prs.PrReconciler(client).reconcile()
+
+    mock_run.assert_not_called()
+    assert stats.scanned == 50
+    assert stats.errors == 0
+    assert client.api.pool.connections_opened == 1
+
+
+def test_reconcile_reads_prs_and_checks_from_one_paginated_snapshot(github_server):
+    server = github_server(pr_count=120)
+    client = github_client(server)
+    stats = reconcile_prs.PrReconciler(client).reconcile()
+
+    assert stats.scanned == 120
+    graphql_calls = [request for request in server.requests if request[1] == "/graphql"]
+    # Three snapshot pages; no per-PR view or checks queries.
+    assert len(graphql_calls) == 3
+    assert len(server.requests) == 4
+
+
+def test_concurrent_reconcile_matches_serial_output_and_stats(capsys, github_server):
+    results = []
+    for workers in (1, 4):
+        server = github_server(pr_count=40)
+        client = github_client(server)
+        stats = reconcile_prs.PrReconciler(client, workers=workers).reconcile(pr_numbers=list(server.prs))
+        results.append((stats, capsys.readouterr().out))
+
+    (serial_stats, serial_out), (concurrent_stats, concurrent_out) = results
+    assert concurrent_stats == serial_stats
+    assert concurrent_stats.scanned == 40
+    assert concurrent_out == serial_out
+    assert sys.stdout is not None and not isinstance(sys.stdout, reconcile_prs.ThreadOutput)
+
+
+def test_unknown_mergeability_is_rechecked_in_batches_not_per_pr(github_server, fake_clock):
+    clock = fake_clock
+    server = github_server(pr_count=20)
+    server.unknown_reads = {number: 3 for number in server.prs}
+    rechecks = reconcile_prs.RecheckQueue(delay=2, clock=clock, sleep=clock.sleep)
+    reconciler = reconcile_prs.PrReconciler(github_client(server), rechecks=rechecks)
+    stats = reconciler.reconcile()
+
+    assert stats.scanned == 20 and stats.errors == 0
+    # The snapshot and two re-polls report UNKNOWN; each re-poll covers all 20 PRs in one query.
+    assert clock.sleeps == [2, 2, 2]
+    batched = [request for request in server.requests if request[1] == "/graphql"]
+    assert len(batched) == 1 + 3
+    assert not any(server.unknown_reads.values())
+
+
+def test_issue_comment_states_load_in_batches(github_server):
+    session = {"body": "- **Session ID:** `sessions/1`", "createdAt": "2026-01-01T00:00:00Z"}
+    queued = [
+        {"body": "<!-- jules-queue -->", "createdAt": f"2026-01-0{day}T00:00:00Z"} for day in (1, 2)
+    ]
+    filler = [{"body": "chatter", "createdAt": "2026-01-03T00:00:00Z"}] * 150
+    server = github_server()
+    server.issue_comments = {number: list(queued) for number in range(1, 31)}
+    # The session comment sits two pages back, behind 150 newer comments.
+    server.issue_comments[7] = [session] + filler + queued
+    client = github_client(server)
+    client.load_issue_jules_states(range(1, 31))
+    states = {number: client.get_issue_jules_state(number) for number in range(1, 31)}
+
+    # Two batches of aliased issues, plus one older page for the issue whose session is further back.
+    assert len(server.requests) == 3
+    assert states[7].has_session
+    assert not states[8].has_session and states[8].queued
+    assert states[8].last_queue_comment_at.day == 2
+
+
+def test_failed_issue_state_batch_does_not_trigger_jules(github_server):
+    server = github_server()
+    client = github_client(server)
+    automation_issues = [
+        {"number": number, "title": reconcile_prs.issue_title_for_pr(number), "body": ""} for number in (1, 2, 3)
+    ]
+    with (
+        patch.object(client, "list_open_automation_issues", return_value=automation_issues),
+        patch.object(client, "get_pr", return_value={"number": 1, "state": "OPEN"}),
+        patch.object(client, "graphql", return_value=None),
+        patch.object(client, "trigger_jules_session") as mock_trigger,
+    ):
+        reconciler = reconcile_prs.PrReconciler(client)
+        reconciler.recover_automation_issues(set())
+        assert client.get_issue_jules_state(1) is None
+
+    mock_trigger.assert_not_called()
+    assert reconciler.stats.errors == 3
+
+
+def test_unchanged_prs_are_skipped_using_persisted_fingerprints(tmp_path, github_server):
+    state_path = str(tmp_path / "reconcile-state.json")
+
+    def run(server):
+        server.requests.clear()
+        state = reconcile_prs.ReconcileState(state_path)
+        stats = reconcile_prs.PrReconciler(github_client(server), state=state).reconcile()
+        state.save()
+        return stats
+
+    server = github_server(pr_count=5)
+    # Every PR's checks are still running, so each pass decides to wait.
+    first = run(server)
+    quiet = run(server)
+    quiet_requests = list(server.requests)
+    server.prs[3]["headRefOid"] = "new-head"
+    changed = run(server)
+
+    assert (first.scanned, first.unchanged) == (5, 0)
+    assert (quiet.scanned, quiet.unchanged) == (0, 5)
+    # A quiet repository costs the one snapshot listing.
+    assert [request[1] for request in quiet_requests] == ["/graphql"]
+    assert (changed.scanned, changed.unchanged) == (1, 4)
+
+
+def test_check_suite_event_reconciles_only_its_pr(github_server):
+    payload = {"action": "completed", "check_suite": {"head_sha": "abc", "pull_requests": [{"number": 2}]}}
+    server = github_server(pr_count=50)
+    client = github_client(server)
+    pr_numbers = reconcile_prs.affected_pr_numbers("check_suite", payload, client)
+    stats = reconcile_prs.PrReconciler(client).reconcile(pr_numbers)
+
+    assert pr_numbers == [2]
+    assert stats.scanned == 1 and stats.errors == 0
+    # The PR and its checks; no listing of open PRs or issues.
+    assert len(server.requests) == 2
+
+
+def test_reconcile_stops_at_budget_and_resumes_from_cursor(github_server):
+    server = github_server(pr_count=30, rate_limit=60)
+    # Pacing would otherwise sleep for real as the budget runs low.
+    budget = github_api.RateLimitBudget(fraction=0.5, write_reserve=0, sleep=lambda _: None)
+    first = reconcile_prs.PrReconciler(github_client(server, budget=budget))
+    # Explicit PR numbers skip the snapshot, so every PR costs its own reads.
+    stats = first.reconcile(pr_numbers=list(server.prs))
+
+    assert stats.budget_exhausted
+    assert stats.errors == 0
+    cursor = first.resume_cursor
+    assert 0 < cursor < 30
+
+    server.rate_remaining = server.rate_limit
+    budget = github_api.RateLimitBudget(sleep=lambda _: None)
+    second = reconcile_prs.PrReconciler(github_client(server, budget=budget))
+    stats = second.reconcile(pr_numbers=list(server.prs), resume_after=cursor)
+
+    assert not stats.budget_exhausted
+    assert second.resume_cursor is None
+    assert stats.scanned == 30 - cursor